@@ -5,7 +5,7 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
-from app.core.settings import get_settings
+from app.core.settings import get_settings, parse_csv
 from app.models import Base  # важно: тут должна быть твоя Declarative Base
 
 # Alembic Config object, provides access to values within the .ini file.
@@ -19,49 +19,68 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
-def get_sqlalchemy_url() -> str:
+def include_name(name, type_, parent_names) -> bool:
+    # Полнотекстовый индекс (FTS5 / tsvector) живёт вне моделей — см. app/models.py.
+    if type_ == "table":
+        return not (name or "").startswith("notifications_fts")
+    if type_ == "column":
+        return name != "message_tsv"
+    if type_ == "index":
+        return name != "ix_notifications_message_tsv"
+    return True
+
+
+def get_sqlalchemy_urls() -> list[str]:
     # ЕДИНСТВЕННЫЙ источник правды: settings (и env vars)
-    return get_settings().database_url
+    # Шарды (DATABASE_SHARD_URLS) получают ту же схему, что и основная БД.
+    # Не импортируем app.sharding: он создаёт движки и метрики пула при импорте.
+    settings = get_settings()
+    urls = [settings.database_url, *parse_csv(settings.database_shard_urls)]
+    return list(dict.fromkeys(urls))
 
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
-    url = get_sqlalchemy_url()
-    context.configure(
-        url=url,
-        target_metadata=target_metadata,
-        literal_binds=True,
-        compare_type=True,
-        dialect_opts={"paramstyle": "named"},
-    )
-
-    with context.begin_transaction():
-        context.run_migrations()
-
-
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
-    # Подставляем URL в alembic config на лету
-    configuration = config.get_section(config.config_ini_section) or {}
-    configuration["sqlalchemy.url"] = get_sqlalchemy_url()
-
-    connectable = engine_from_config(
-        configuration,
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
+    for url in get_sqlalchemy_urls():
         context.configure(
-            connection=connection,
+            url=url,
             target_metadata=target_metadata,
+            literal_binds=True,
             compare_type=True,
+            include_name=include_name,
+            dialect_opts={"paramstyle": "named"},
         )
 
         with context.begin_transaction():
             context.run_migrations()
 
 
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
+    for url in get_sqlalchemy_urls():
+        # Подставляем URL в alembic config на лету
+        configuration = config.get_section(config.config_ini_section) or {}
+        configuration["sqlalchemy.url"] = url
+
+        connectable = engine_from_config(
+            configuration,
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
+
+        with connectable.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                compare_type=True,
+                include_name=include_name,
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+        connectable.dispose()
+
+
 if context.is_offline_mode():
     run_migrations_offline()
 else:
@@ -0,0 +1,48 @@
+"""notification ids bigint
+
+Revision ID: 2958874087b6
+Revises: bfad87cd8fc8
+Create Date: 2026-10-19 18:18:02.854641
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2958874087b6"
+down_revision: Union[str, Sequence[str], None] = "bfad87cd8fc8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite INTEGER is already 64-bit (and must stay INTEGER PRIMARY KEY to autoincrement).
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.alter_column("notifications", "id", type_=sa.BigInteger(), existing_type=sa.Integer())
+    op.alter_column(
+        "notification_outbox",
+        "notification_id",
+        type_=sa.BigInteger(),
+        existing_type=sa.Integer(),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.alter_column(
+        "notification_outbox",
+        "notification_id",
+        type_=sa.Integer(),
+        existing_type=sa.BigInteger(),
+        existing_nullable=False,
+    )
+    op.alter_column("notifications", "id", type_=sa.Integer(), existing_type=sa.BigInteger())
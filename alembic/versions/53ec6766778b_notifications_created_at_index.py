@@ -0,0 +1,31 @@
+"""notifications created_at index
+
+Revision ID: 53ec6766778b
+Revises: 2725d2374a6d
+Create Date: 2026-10-19 18:07:04.019789
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "53ec6766778b"
+down_revision: Union[str, Sequence[str], None] = "2725d2374a6d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # created_at range filters on GET /notifications; keyset order itself uses the PK.
+    op.create_index(
+        op.f("ix_notifications_created_at"), "notifications", ["created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_notifications_created_at"), table_name="notifications")
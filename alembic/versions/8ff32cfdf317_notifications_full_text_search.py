@@ -0,0 +1,44 @@
+"""notifications full text search
+
+Revision ID: 8ff32cfdf317
+Revises: 2958874087b6
+Create Date: 2026-10-19 18:20:32.673682
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.fts import (
+    POSTGRES_FTS_DDL,
+    POSTGRES_FTS_DROP,
+    SQLITE_FTS_DDL,
+    SQLITE_FTS_DROP,
+    SQLITE_FTS_REBUILD,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8ff32cfdf317"
+down_revision: Union[str, Sequence[str], None] = "2958874087b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _run(sqlite: tuple[str, ...], postgres: tuple[str, ...]) -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": sqlite, "postgresql": postgres}.get(dialect, ())
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same DDL as app.models' create_all(), plus indexing the rows that already exist.
+    _run((*SQLITE_FTS_DDL, SQLITE_FTS_REBUILD), POSTGRES_FTS_DDL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run(SQLITE_FTS_DROP, POSTGRES_FTS_DROP)
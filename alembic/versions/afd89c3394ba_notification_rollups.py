@@ -0,0 +1,48 @@
+"""notification rollups
+
+Revision ID: afd89c3394ba
+Revises: 8ff32cfdf317
+Create Date: 2026-10-19 18:26:40.878485
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "afd89c3394ba"
+down_revision: Union[str, Sequence[str], None] = "8ff32cfdf317"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Backfill minute buckets from existing rows. The SQLite format matches how
+# SQLAlchemy stores DateTime there, so later upserts hit the same keys.
+BACKFILL = {
+    "sqlite": "INSERT INTO notification_rollups (bucket_start, count) "
+    "SELECT strftime('%Y-%m-%d %H:%M:00.000000', created_at), count(*) "
+    "FROM notifications GROUP BY 1",
+    "postgresql": "INSERT INTO notification_rollups (bucket_start, count) "
+    "SELECT date_trunc('minute', created_at), count(*) FROM notifications GROUP BY 1",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "notification_rollups",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("bucket_start"),
+    )
+    backfill = BACKFILL.get(op.get_bind().dialect.name)
+    if backfill is not None:
+        op.execute(backfill)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("notification_rollups")
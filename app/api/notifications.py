@@ -0,0 +1,503 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from typing import Any, TypeVar
+
+import anyio
+from datetime import datetime, timedelta, timezone
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketException,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.types import Receive, Scope, Send
+
+from app import rollups
+from app.auth import auth_error_responses, require_auth, require_auth_ws
+from app.broadcast import Event, NotificationHub, Subscription, get_hub
+from app.core import db as db_core
+from app.core.db import get_db
+from app.core.executors import run_in_executor
+from app.core.settings import get_settings
+from app.export import EXPORT_FORMATS, encode_event, encode_export, encode_page
+from app.notification import (
+    NotificationRecord,
+    bulk_create_notifications,
+    create_notification,
+    get_notification_cached,
+    iter_notification_rows,
+    list_notifications_after,
+    list_notifications_page,
+)
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas import (
+    ErrorResponse,
+    NotificationBulkRequest,
+    NotificationBulkResponse,
+    NotificationCreateResponse,
+    NotificationOut,
+    NotificationPage,
+    NotificationSearchPage,
+    NotificationStats,
+    NotifyRequest,
+)
+from app.search import SearchNotSupported, search_notifications
+from app.sharding import get_shard_store
+from app.write_behind import get_write_behind
+
+router = APIRouter(prefix="/notifications")
+
+T = TypeVar("T")
+
+
+def _before_id_from_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        before_id = decode_cursor(cursor)["before_id"]
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if not isinstance(before_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return before_id
+
+
+@router.get(
+    "",
+    response_model=NotificationPage,
+    responses={**auth_error_responses, 400: {"model": ErrorResponse}},
+)
+async def list_page(
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    _: str | None = Depends(require_auth),
+):
+    page_args = {
+        "limit": limit,
+        "before_id": _before_id_from_cursor(cursor),
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    store = get_shard_store()
+    if store is not None:
+        items, next_before_id = await run_in_executor("db", store.list_page, **page_args)
+    else:
+        items, next_before_id = await run_in_executor(
+            "db", _in_session, list_notifications_page, **page_args
+        )
+    next_cursor = None
+    if next_before_id is not None:
+        next_cursor = encode_cursor({"before_id": next_before_id})
+    # Records are already the response shape; skip validating them into models.
+    return Response(encode_page(items, next_cursor), media_type="application/json")
+
+
+@router.post(
+    "",
+    status_code=201,
+    response_model=NotificationCreateResponse,
+    responses=auth_error_responses,
+)
+async def create(
+    payload: NotifyRequest,
+    _: str | None = Depends(require_auth),
+):
+    # No get_db: the sharded and write-behind paths need no session, and a sync
+    # dependency would cost two threadpool hops per request for nothing.
+    store = get_shard_store()
+    if store is not None:
+        record = await run_in_executor("db", store.create, payload.message)
+        return {"id": record.id}
+
+    writer = get_write_behind()
+    if writer is not None:
+        # Group commit: resolves with our id once the batch holding the row is committed.
+        return {"id": await writer.submit(payload.message)}
+
+    return {"id": await run_in_executor("db", _create_one, payload.message)}
+
+
+def _create_one(message: str) -> int:
+    with db_core.session_scope() as db:
+        return create_notification(db, message=message).id
+
+
+def _in_session(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    # Routes that read/write through the "db" executor open their session on its thread,
+    # instead of resolving get_db on AnyIO's shared default limiter.
+    with db_core.session_scope() as db:
+        return fn(db, *args, **kwargs)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        **auth_error_responses,
+        200: {"content": {media: {} for media in (*EXPORT_FORMATS.values(), "application/gzip")}},
+    },
+)
+def export(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    after_id: int | None = Query(default=None, ge=0),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    db: Session = Depends(get_db),
+    _: str | None = Depends(require_auth),
+):
+    range_args = {
+        "after_id": after_id,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    store = get_shard_store()
+    if store is not None:
+        chunks = store.iter_rows(**range_args)
+    else:
+        # The session from get_db stays open until the response is fully sent, so export
+        # stays a sync route: its body is iterated on AnyIO's default limiter, not "db".
+        chunks = iter_notification_rows(db, **range_args)
+    body = encode_export(chunks, fmt=format, compress=gzip)
+
+    filename = f"notifications.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=NotificationBulkResponse,
+    responses={**auth_error_responses, 413: {"model": ErrorResponse}},
+)
+async def bulk_create(
+    payload: NotificationBulkRequest,
+    _: str | None = Depends(require_auth),
+):
+    s = get_settings()
+    if len(payload.messages) > s.notify_bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many messages (max {s.notify_bulk_max_items})",
+        )
+
+    # Both paths validate every message before writing any, so a bad one writes nothing.
+    store = get_shard_store()
+    try:
+        if store is not None:
+            records = await run_in_executor("db", store.bulk_create, payload.messages)
+            ids = [record.id for record in records]
+        else:
+            ids = await run_in_executor(
+                "db",
+                _in_session,
+                bulk_create_notifications,
+                payload.messages,
+                batch_size=s.notify_bulk_batch_size,
+            )
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", "messages", *err["loc"])} for err in exc.errors()]
+        ) from exc
+    return {"count": len(ids), "ids": ids}
+
+
+def _search_after_from_cursor(cursor: str | None) -> tuple[float, int] | None:
+    if cursor is None:
+        return None
+    try:
+        data = decode_cursor(cursor)
+        rank, last_id = data["rank"], data["id"]
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if not isinstance(rank, (int, float)) or not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(rank), last_id
+
+
+@router.get(
+    "/search",
+    response_model=NotificationSearchPage,
+    responses={
+        **auth_error_responses,
+        400: {"model": ErrorResponse},
+        501: {"model": ErrorResponse},
+    },
+)
+async def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    _: str | None = Depends(require_auth),
+):
+    after = _search_after_from_cursor(cursor)
+    store = get_shard_store()
+    try:
+        if store is not None:
+            hits, after = await run_in_executor("db", store.search, q, limit=limit, after=after)
+        else:
+            hits, after = await run_in_executor(
+                "db", _in_session, search_notifications, q, limit=limit, after=after
+            )
+    except SearchNotSupported as exc:
+        raise HTTPException(
+            status_code=501, detail="Search is not supported on this database"
+        ) from exc
+    next_cursor = None
+    if after is not None:
+        next_cursor = encode_cursor({"rank": after[0], "id": after[1]})
+    return {"items": hits, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/stats",
+    response_model=NotificationStats,
+    responses={**auth_error_responses, 400: {"model": ErrorResponse}},
+)
+async def stats(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    granularity: str = Query(default="hour", pattern="^(minute|hour|day)$"),
+    _: str | None = Depends(require_auth),
+):
+    # Reads only the rollup table, never the notifications themselves.
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    store = get_shard_store()
+    range_args = {"start": start, "end": end, "granularity": granularity}
+    if store is not None:
+        buckets = await run_in_executor("db", store.stats, **range_args)
+    else:
+        buckets = await run_in_executor("db", _in_session, rollups.read_stats, **range_args)
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "total": sum(n for _, n in buckets),
+        "buckets": [{"bucket_start": b, "count": n} for b, n in buckets],
+    }
+
+
+_BACKFILL_CHUNK = 500
+# Backfilled ids remembered to drop their live duplicates (see _stream_events).
+_SEEN_WINDOW = 4 * _BACKFILL_CHUNK
+# Yielded by _stream_events after NOTIFY_STREAM_PING_S of quiet (SSE keep-alive comment).
+_PING: Event = (0, "")
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _backfill_page(after_id: int) -> list[NotificationRecord]:
+    store = get_shard_store()
+    if store is not None:
+        chunks = store.iter_rows(after_id=after_id, chunk_size=_BACKFILL_CHUNK)
+        try:
+            return [NotificationRecord(*row) for row in next(chunks, [])]
+        finally:
+            chunks.close()
+    with db_core.SessionLocal() as db:
+        return list_notifications_after(db, after_id=after_id, limit=_BACKFILL_CHUNK)
+
+
+async def _stream_events(
+    sub: Subscription, after_id: int | None, *, ping_s: float | None = None
+) -> AsyncIterator[Event | None]:
+    """
+    Rows after `after_id` from the DB, then live events from the hub.
+
+    The subscription is taken before the backfill, so nothing committed in between is
+    missed; live events the backfill already sent are skipped. Yields None once if
+    the subscriber was cut off for lagging, and _PING after every `ping_s` of quiet.
+
+    Duplicates are matched by id, not by "id <= last backfilled id": ids are allocated
+    before commit, so with concurrent writers a lower id can commit, and reach the hub,
+    after the backfill has read past it.
+    """
+    # Insertion-ordered, trimmed to the newest _SEEN_WINDOW ids.
+    seen: dict[int, None] = {}
+    if after_id is not None:
+        backfilled_to = after_id
+        while True:
+            page = await run_in_executor("db", _backfill_page, backfilled_to)
+            for record in page:
+                seen[record.id] = None
+                yield record.id, encode_event(record)
+            for stale in list(seen)[:-_SEEN_WINDOW]:
+                del seen[stale]
+            if page:
+                backfilled_to = page[-1].id
+            if len(page) < _BACKFILL_CHUNK:
+                break
+
+    while True:
+        try:
+            event = await asyncio.wait_for(sub.queue.get(), ping_s)
+        except TimeoutError:
+            yield _PING
+            continue
+        if event is None:
+            yield None
+            return
+        if event[0] in seen:
+            continue
+        yield event
+
+
+class _SubscribedStream(StreamingResponse):
+    """
+    StreamingResponse that releases its hub subscription however the response ends.
+    A finally in the body generator is not enough: a client gone before the first
+    iteration means the generator never starts, and its finally never runs.
+    """
+
+    def __init__(
+        self, content: AsyncIterator[str], hub: NotificationHub, sub: Subscription, **kwargs: Any
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self._hub = hub
+        self._sub = sub
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._hub.unsubscribe(self._sub)
+
+
+def _subscribe() -> tuple[NotificationHub, Subscription]:
+    hub = get_hub()
+    if hub is None:
+        raise HTTPException(status_code=503, detail="Notification stream is not running")
+    sub = hub.subscribe()
+    if sub is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many stream subscribers",
+            headers={"Retry-After": str(get_settings().notify_retry_after_s)},
+        )
+    return hub, sub
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        **auth_error_responses,
+        400: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+        200: {"content": {"text/event-stream": {}}},
+    },
+)
+async def stream(
+    last_event_id: int | None = Query(default=None, ge=0),
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+    _: str | None = Depends(require_auth),
+):
+    """
+    Server-Sent Events: one `notification` event per new row, `id:` = notification id.
+
+    EventSource sends Last-Event-ID when it reconnects, and the rows missed in between
+    are replayed from the database first. A client that falls behind gets a `lagged`
+    event and the stream ends; reconnecting resumes from the last id it received.
+    """
+    after_id = last_event_id
+    if last_event_id_header is not None:
+        try:
+            after_id = int(last_event_id_header)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID") from exc
+    hub, sub = _subscribe()
+    ping_s = get_settings().notify_stream_ping_s
+
+    async def body() -> AsyncIterator[str]:
+        async for event in _stream_events(sub, after_id, ping_s=ping_s):
+            if event is None:
+                yield "event: lagged\ndata: {}\n\n"
+                return
+            if event is _PING:
+                yield ": ping\n\n"
+                continue
+            yield f"id: {event[0]}\nevent: notification\ndata: {event[1]}\n\n"
+
+    return _SubscribedStream(body(), hub, sub, media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
+@router.websocket("/ws")
+async def stream_ws(
+    websocket: WebSocket,
+    last_event_id: int | None = Query(default=None, ge=0),
+    _: None = Depends(require_auth_ws),
+):
+    """WebSocket twin of /stream: one JSON text frame per notification."""
+    try:
+        hub, sub = _subscribe()
+    except HTTPException as exc:
+        raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason=exc.detail) from exc
+    await websocket.accept()
+
+    async def pump(cancel_scope: anyio.CancelScope) -> None:
+        async for event in _stream_events(sub, last_event_id):
+            if event is None:
+                await websocket.send_json({"event": "lagged"})
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+            await websocket.send_text(event[1])
+        cancel_scope.cancel()
+
+    async def until_disconnect(cancel_scope: anyio.CancelScope) -> None:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        cancel_scope.cancel()
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(pump, tg.cancel_scope)
+            tg.start_soon(until_disconnect, tg.cancel_scope)
+    finally:
+        hub.unsubscribe(sub)
+
+
+# Keep last: the path parameter would otherwise shadow the fixed routes above.
+@router.get(
+    "/{notification_id}",
+    response_model=NotificationOut,
+    responses={**auth_error_responses, 404: {"model": ErrorResponse}},
+)
+async def get_one(
+    notification_id: int,
+    _: str | None = Depends(require_auth),
+):
+    store = get_shard_store()
+    if store is not None:
+        record = await run_in_executor("db", store.get, notification_id)
+    else:
+        record = await run_in_executor("db", _in_session, get_notification_cached, notification_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return record
@@ -10,12 +10,27 @@ from app.auth import (
     require_auth,
     require_basic_auth,
 )
-from app.notification import deliver_notification
+from app.core import db as db_core
+from app.core.executors import inline, run_in_executor
+from app.core.responses import trusted
+from app.dedup import DedupKey, cached_original, dedup_key
+from app.delivery import get_dispatcher
+from app.notification import (
+    deliver_notification,
+    deliver_notification_async,
+    deliver_notification_batch,
+    deliver_notification_batch_async,
+    get_delivery_mode,
+    validate_messages,
+)
+from app.outbox import enqueue_notification, enqueue_notification_once, enqueue_notifications
 from app.schemas import (
     ErrorResponse,
     HealthResponse,
+    NotifyBatchRequest,
+    NotifyBatchResponse,
     NotifyRequest,
-    OkResponse,
+    NotifyResponse,
     ResultResponse,
     TokenResponse,
 )
@@ -31,21 +46,29 @@ router = APIRouter()
 
 
 @router.get("/", response_model=dict)
+@inline
+@trusted
 def root():
     return {"message": "hello"}
 
 
 @router.get("/health", response_model=HealthResponse)
+@inline
+@trusted
 def health():
     return {"status": "ok"}
 
 
 @router.get("/add", response_model=ResultResponse)
+@inline
+@trusted
 def add(a: int, b: int):
     return {"result": float(a + b)}
 
 
 @router.get("/mul", response_model=ResultResponse)
+@inline
+@trusted
 def mul(a: int, b: int):
     return {"result": float(a * b)}
 
@@ -55,6 +78,8 @@ def mul(a: int, b: int):
     response_model=ResultResponse,
     responses={400: {"model": ErrorResponse}},
 )
+@inline
+@trusted
 def sub(a: int, b: int):
     return {"result": float(a - b)}
 
@@ -64,13 +89,20 @@ def sub(a: int, b: int):
     response_model=ResultResponse,
     responses={400: {"model": ErrorResponse}},
 )
+@inline
+@trusted
 def div(a: int, b: int):
     if b == 0:
         raise HTTPException(status_code=400, detail="Division by zero")
     return {"result": a / b}
 
 
-@router.post("/notify", response_model=OkResponse)
+@router.post(
+    "/notify",
+    response_model=NotifyResponse,
+    response_model_exclude_none=True,
+    responses={503: {"model": ErrorResponse}},
+)
 async def notify(
     payload: NotifyRequest,
     background_tasks: BackgroundTasks,
@@ -78,21 +110,125 @@ async def notify(
     _: str | None = Depends(require_auth),
 ):
     request_id = request.headers.get("x-request-id")
-    background_tasks.add_task(deliver_notification, payload.message, request_id)
+    mode = get_delivery_mode()
+    if mode == "async":
+        dispatcher = get_dispatcher()
+        if dispatcher is None:
+            # No lifespan (e.g. bare TestClient): still async, still off the threadpool.
+            background_tasks.add_task(deliver_notification_async, payload.message, request_id)
+        elif not dispatcher.try_submit(payload.message, request_id):
+            raise HTTPException(
+                status_code=503,
+                detail="Delivery queue is full",
+                headers={"Retry-After": str(get_settings().notify_retry_after_s)},
+            )
+        return {"ok": True}
+
+    if mode == "outbox":
+        window_s = get_settings().notify_dedup_window_s
+        if window_s > 0:
+            key = dedup_key(payload.message, window_s)
+            # Repeats this process has seen are answered without touching the DB.
+            original = cached_original(key)
+            if original is not None:
+                return {"ok": True, "id": original, "duplicate": True}
+            notification_id, duplicate = await run_in_executor(
+                "db", _enqueue_once, payload.message, request_id, key
+            )
+            return {"ok": True, "id": notification_id, "duplicate": duplicate}
+
+        # Durable: the row and its delivery job commit together; workers deliver later.
+        await run_in_executor("db", _enqueue_one, payload.message, request_id)
+        return {"ok": True}
+
+    background_tasks.add_task(
+        run_in_executor, "delivery", deliver_notification, payload.message, request_id
+    )
     return {"ok": True}
 
 
+# Outbox writes open their own session on the db executor: the background and async
+# modes never touch the DB, so /notify takes no get_db dependency (and its threadpool hops).
+def _enqueue_one(message: str, request_id: str | None) -> None:
+    with db_core.session_scope() as db:
+        enqueue_notification(db, message=message, request_id=request_id)
+
+
+def _enqueue_once(message: str, request_id: str | None, key: DedupKey) -> tuple[int, bool]:
+    with db_core.session_scope() as db:
+        return enqueue_notification_once(db, message=message, request_id=request_id, key=key)
+
+
+def _enqueue_many(messages: list[str], request_id: str | None) -> None:
+    with db_core.session_scope() as db:
+        enqueue_notifications(db, messages=messages, request_id=request_id)
+
+
+@router.post(
+    "/notify/batch",
+    response_model=NotifyBatchResponse,
+    responses={413: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def notify_batch(
+    payload: NotifyBatchRequest,
+    background_tasks: BackgroundTasks,
+    request: Request,
+    _: str | None = Depends(require_auth),
+):
+    s = get_settings()
+    if len(payload.messages) > s.notify_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many messages (max {s.notify_batch_max_items})",
+        )
+
+    request_id = request.headers.get("x-request-id")
+    accepted, errors = validate_messages(payload.messages)
+    items = [
+        {"index": i, "accepted": i not in errors, "error": errors.get(i)}
+        for i in range(len(payload.messages))
+    ]
+    result = {"accepted": len(accepted), "rejected": len(errors), "items": items}
+    if not accepted:
+        return result
+
+    mode = get_delivery_mode()
+    if mode == "async":
+        dispatcher = get_dispatcher()
+        if dispatcher is None:
+            background_tasks.add_task(deliver_notification_batch_async, accepted, request_id)
+        elif not dispatcher.try_submit_many(accepted, request_id):
+            raise HTTPException(
+                status_code=503,
+                detail="Delivery queue is full",
+                headers={"Retry-After": str(s.notify_retry_after_s)},
+            )
+        return result
+
+    if mode == "outbox":
+        await run_in_executor("db", _enqueue_many, accepted, request_id)
+        return result
+
+    # One task for the whole batch, not one per message.
+    background_tasks.add_task(
+        run_in_executor, "delivery", deliver_notification_batch, accepted, request_id
+    )
+    return result
+
+
 @router.post(
     "/token",
     response_model=TokenResponse,
     responses=auth_error_responses,
 )
+@inline
 def token(subject: str = Depends(require_basic_auth)):
     access_token = create_access_token(subject)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/_debug/request-id", response_model=dict)
+@inline
 def debug_request_id(request: Request):
     # Convenience endpoint for local verification (can be removed later)
     return {"request_id": request.headers.get("x-request-id") or str(uuid4())}
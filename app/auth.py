@@ -7,7 +7,7 @@ import json
 from datetime import datetime, timedelta, timezone
 from secrets import compare_digest
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException, status
 from fastapi.security import (
     HTTPAuthorizationCredentials,
     HTTPBasic,
@@ -15,6 +15,7 @@ from fastapi.security import (
     HTTPBearer,
 )
 
+from app.core.executors import inline
 from app.core.settings import get_settings
 from app.schemas import ErrorResponse
 
@@ -194,6 +195,17 @@ async def require_auth(request: Request) -> None:
     return None
 
 
+async def require_auth_ws(websocket: WebSocket) -> None:
+    """require_auth for WebSocket routes: a failed check rejects the handshake (1008)."""
+    try:
+        # Only headers are read, which a WebSocket carries just like a Request.
+        await require_auth(websocket)  # type: ignore[arg-type]
+    except HTTPException as exc:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail)
+        ) from exc
+
+
 # FastAPI responses schema for auth-protected endpoints
 auth_error_responses = {
     401: {"model": ErrorResponse},
@@ -203,6 +215,7 @@ auth_error_responses = {
 _basic_auth_scheme = HTTPBasic(auto_error=False)
 
 
+@inline
 def require_basic_auth(
     credentials: HTTPBasicCredentials | None = Depends(_basic_auth_scheme),
 ) -> str:
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from typing import Any
+
+from app.core.settings import get_settings
+from app.export import encode_event
+from app.observability import metrics
+
+metrics.describe("stream_subscribers", "gauge", "Open notification stream subscribers.")
+metrics.describe("stream_events_total", "counter", "Notifications published to the stream hub.")
+metrics.describe(
+    "stream_lagged_total",
+    "counter",
+    "Subscribers cut off because their buffer was full (they resume via Last-Event-ID).",
+)
+
+# (notification id, JSON payload); encoded once per event, shared by every subscriber.
+Event = tuple[int, str]
+
+
+class Subscription:
+    """One stream client. `None` in the queue means it fell behind and was cut off."""
+
+    def __init__(self, buffer: int) -> None:
+        self.queue: asyncio.Queue[Event | None] = asyncio.Queue(maxsize=buffer)
+
+
+class NotificationHub:
+    """
+    In-process fan-out of newly committed notifications to stream subscribers.
+
+    Each subscriber has a bounded buffer. A subscriber whose buffer is full is cut off
+    rather than slowing publishers or growing memory: its buffer is replaced by a lag
+    marker, and the client reconnects with Last-Event-ID to backfill the gap from the
+    database. publish() may be called from any thread (sync handlers run in the
+    threadpool); fan-out always happens on the hub's event loop.
+    """
+
+    def __init__(self, *, buffer: int = 100, max_subscribers: int = 1000) -> None:
+        self._buffer = buffer
+        self._max_subscribers = max_subscribers
+        self._subscribers: set[Subscription] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self) -> None:
+        for sub in list(self._subscribers):
+            self._cut_off(sub)
+        self._subscribers.clear()
+        self._loop = None
+
+    def subscribe(self) -> Subscription | None:
+        """New subscription, or None when the hub is at NOTIFY_STREAM_MAX_SUBSCRIBERS."""
+        if len(self._subscribers) >= self._max_subscribers:
+            return None
+        sub = Subscription(self._buffer)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Queue (id, message, created_at) rows for every subscriber; never blocks."""
+        loop = self._loop
+        # Unlocked read from other threads: at worst one event races a new subscriber,
+        # which its backfill covers.
+        if loop is None or not rows or not self._subscribers:
+            return
+        events = [(row[0], encode_event(row)) for row in rows]
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(events)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._fan_out, events)
+            except RuntimeError:
+                # Loop closed during shutdown.
+                pass
+
+    def _fan_out(self, events: list[Event]) -> None:
+        metrics.inc("stream_events_total", len(events))
+        for sub in list(self._subscribers):
+            for event in events:
+                try:
+                    sub.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._cut_off(sub)
+                    self._subscribers.discard(sub)
+                    metrics.inc("stream_lagged_total")
+                    break
+
+    @staticmethod
+    def _cut_off(sub: Subscription) -> None:
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+
+_hub: NotificationHub | None = None
+
+
+def get_hub() -> NotificationHub | None:
+    if _hub is not None and _hub.running:
+        return _hub
+    return None
+
+
+def publish(rows: Sequence[Sequence[Any]]) -> None:
+    """Announce committed rows to stream subscribers; a no-op when nobody listens."""
+    if _hub is not None:
+        _hub.publish(rows)
+
+
+async def start_hub() -> NotificationHub:
+    global _hub
+    s = get_settings()
+    _hub = NotificationHub(
+        buffer=s.notify_stream_buffer, max_subscribers=s.notify_stream_max_subscribers
+    )
+    _hub.start()
+    return _hub
+
+
+async def stop_hub() -> None:
+    global _hub
+    if _hub is not None:
+        _hub.stop()
+        _hub = None
+
+
+def _collect() -> None:
+    if _hub is not None:
+        metrics.set_gauge("stream_subscribers", _hub.subscriber_count())
+
+
+metrics.register_collector(_collect)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+from app.observability import metrics
+
+metrics.describe("cache_hits_total", "counter", "Read-through cache hits.")
+metrics.describe("cache_misses_total", "counter", "Read-through cache misses (incl. expired).")
+metrics.describe("cache_evictions_total", "counter", "Entries evicted by the LRU bound.")
+metrics.describe("cache_entries", "gauge", "Entries currently cached.")
+metrics.describe("cache_hit_ratio", "gauge", "hits / (hits + misses) since process start.")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl_s`.
+
+    Values are handed out as-is, so only store immutable snapshots.
+    `maxsize <= 0` disables caching (every get is a miss, set is a no-op).
+
+    Read-through fills race with invalidation: a reader that loaded the old row can
+    store it after the writer invalidated. Take generation() before loading and pass
+    it to set(); the fill is then dropped if the key was invalidated in between.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl_s: float) -> None:
+        self.name = name
+        self._maxsize = maxsize
+        self._ttl_s = ttl_s
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation. Per-key last invalidation, LRU-bounded like the
+        # data; generations older than _forgotten may have been dropped from it.
+        self._generation = 0
+        self._invalidated: OrderedDict[K, int] = OrderedDict()
+        self._forgotten = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize > 0
+
+    def get(self, key: K) -> V | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                hit = False
+        labels = {"cache": self.name}
+        if hit:
+            metrics.inc("cache_hits_total", labels=labels)
+            return entry[1]  # type: ignore[index]
+        metrics.inc("cache_misses_total", labels=labels)
+        return None
+
+    def generation(self) -> int:
+        """Snapshot for set(..., generation=), taken before loading the value."""
+        with self._lock:
+            return self._generation
+
+    def set(
+        self, key: K, value: V, *, ttl_s: float | None = None, generation: int | None = None
+    ) -> None:
+        """
+        Store `value`; `ttl_s` overrides the cache-wide TTL for this entry.
+        With `generation`, the set is skipped if `key` was invalidated since then.
+        """
+        if self._maxsize <= 0:
+            return
+        evicted = 0
+        expires = time.monotonic() + (self._ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            if generation is not None and (
+                generation < self._forgotten or self._invalidated.get(key, 0) > generation
+            ):
+                return
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.inc("cache_evictions_total", evicted, labels={"cache": self.name})
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > max(self._maxsize, 1):
+                _, dropped = self._invalidated.popitem(last=False)
+                self._forgotten = max(self._forgotten, dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten = self._generation
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def export_metrics(self) -> None:
+        labels = {"cache": self.name}
+        metrics.set_gauge("cache_entries", len(self), labels)
+        metrics.set_gauge("cache_hit_ratio", self.hit_ratio(), labels)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Hashable
+from functools import lru_cache
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import get_settings, parse_csv
+from app.observability import metrics
+
+metrics.describe("admission_limit", "gauge", "Current adaptive concurrency limit.")
+metrics.describe("admission_in_flight", "gauge", "Requests holding an admission slot.")
+metrics.describe("admission_queue_depth", "gauge", "Requests waiting for an admission slot.")
+metrics.describe(
+    "admission_shed_total",
+    "counter",
+    "Requests refused with 503 by admission control (reason: queue_full, timeout).",
+)
+
+# Per-endpoint latency floors relax upward by this factor per sample, so a permanently
+# slower endpoint (new index, bigger payloads) stops looking "overloaded" eventually.
+_BASELINE_DRIFT = 0.001
+# Absolute slack on top of tolerance x baseline: sub-millisecond endpoints jitter by
+# more than 2x without anything being wrong.
+_LATENCY_SLACK_S = 0.005
+_EMA_WEIGHT = 0.2
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by latency.
+
+    Every completed request reports its time to first response byte. Each endpoint keeps
+    a latency floor (its "no load" latency) and a smoothed recent latency. While recent
+    latency stays within `tolerance` x floor the limit grows by ~1 per `limit` completions
+    (additive increase, only when the limit is actually being used); once it inflates,
+    or the app answers 503/504, the limit shrinks by `backoff` (multiplicative decrease,
+    at most once per `limit` completions so one slow burst doesn't collapse it).
+
+    Over the limit, requests wait in a bounded FIFO for up to `queue_timeout_s`; a
+    released slot is handed straight to the oldest waiter. Everything else is shed.
+    Not thread-safe: used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 64,
+        min_limit: int = 4,
+        max_limit: int = 512,
+        max_queue: int = 64,
+        queue_timeout_s: float = 0.1,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ) -> None:
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._max_queue = max_queue
+        self._queue_timeout_s = queue_timeout_s
+        self._tolerance = tolerance
+        self._backoff = backoff
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        # endpoint -> (latency floor, smoothed latency)
+        self._latency: dict[Hashable, tuple[float, float]] = {}
+        self._since_decrease = 0
+
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting briefly if needed; False means shed the request."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self._max_queue:
+            metrics.inc("admission_shed_total", labels={"reason": "queue_full"})
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self._queue_timeout_s):
+                await waiter
+            return True
+        except TimeoutError:
+            # The slot may have been handed over just as the timeout fired.
+            if waiter.done() and not waiter.cancelled():
+                return True
+            metrics.inc("admission_shed_total", labels={"reason": "timeout"})
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(
+        self, endpoint: Hashable, latency_s: float | None, *, overloaded: bool = False
+    ) -> None:
+        """Return a slot and feed the request's outcome into the limit."""
+        if latency_s is not None:
+            overloaded = self._latency_inflated(endpoint, latency_s) or overloaded
+        self._adjust(overloaded)
+        self._release_slot()
+
+    def _latency_inflated(self, endpoint: Hashable, latency_s: float) -> bool:
+        floor, smoothed = self._latency.get(endpoint, (latency_s, latency_s))
+        floor = min(floor * (1 + _BASELINE_DRIFT), latency_s)
+        smoothed += _EMA_WEIGHT * (latency_s - smoothed)
+        self._latency[endpoint] = (floor, smoothed)
+        return smoothed > floor * self._tolerance + _LATENCY_SLACK_S
+
+    def _adjust(self, overloaded: bool) -> None:
+        self._since_decrease += 1
+        if overloaded:
+            if self._since_decrease >= self.limit:
+                self.limit = max(self._min_limit, self.limit * self._backoff)
+                self._since_decrease = 0
+        elif self.in_flight >= self.limit / 2:
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+    def _release_slot(self) -> None:
+        if self.in_flight <= int(self.limit):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)  # the slot moves to the waiter as is
+                    return
+        self.in_flight -= 1
+
+
+_limiter: AdaptiveLimiter | None = None
+
+
+def get_limiter() -> AdaptiveLimiter | None:
+    """The process-wide limiter, or None when ADMISSION_ENABLED is off."""
+    global _limiter
+    s = get_settings()
+    if not s.admission_enabled:
+        return None
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(
+            initial_limit=s.admission_initial_limit,
+            min_limit=s.admission_min_limit,
+            max_limit=s.admission_max_limit,
+            max_queue=s.admission_queue_size,
+            queue_timeout_s=s.admission_queue_timeout_ms / 1000.0,
+        )
+    return _limiter
+
+
+def reset_limiter() -> None:
+    """Drop the limiter; the next request rebuilds it from current settings."""
+    global _limiter
+    _limiter = None
+
+
+def _collect() -> None:
+    if _limiter is not None:
+        metrics.set_gauge("admission_limit", _limiter.limit)
+        metrics.set_gauge("admission_in_flight", _limiter.in_flight)
+        metrics.set_gauge("admission_queue_depth", _limiter.queue_depth())
+
+
+metrics.register_collector(_collect)
+
+
+def overloaded_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server overloaded"},
+        headers={"Retry-After": str(get_settings().admission_retry_after_s)},
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Admission control in front of the app: requests past the adaptive limit queue
+    briefly, then get 503 + Retry-After instead of piling up in the threadpool.
+
+    ADMISSION_BYPASS_PATHS are never limited: /health and /metrics must keep answering
+    under overload (they are the priority lane), and long-lived streams and exports would
+    otherwise hold a slot for their whole lifetime. WebSockets are not limited either.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = get_limiter() if scope["type"] == "http" else None
+        bypass = _bypass_paths(get_settings().admission_bypass_paths)
+        if limiter is None or scope["path"] in bypass:
+            await self.app(scope, receive, send)
+            return
+        if not await limiter.acquire():
+            await overloaded_response()(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        latency_s: float | None = None
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency_s, status
+            if message["type"] == "http.response.start":
+                latency_s = time.perf_counter() - started
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(scope.get("endpoint"), latency_s, overloaded=status in (503, 504))
+
+
+@lru_cache(maxsize=4)
+def _bypass_paths(value: str) -> frozenset[str]:
+    return frozenset(parse_csv(value))
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import zlib
+from functools import lru_cache
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import get_settings, parse_csv
+from app.observability import metrics
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli (or brotlicffi)
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+metrics.describe(
+    "compression_responses_total", "counter", "Responses compressed, by Content-Encoding."
+)
+metrics.describe(
+    "compression_bytes_total",
+    "counter",
+    "Body bytes before (direction=in) and after (direction=out) compression.",
+)
+
+# Default level and valid range per encoding. Route levels are clamped into the range,
+# so "1" means "fastest" whatever the client negotiated.
+_LEVELS: dict[str, tuple[int, int, int]] = {
+    "zstd": (3, 1, 22),
+    "br": (4, 0, 11),
+    "gzip": (6, 1, 9),
+}
+
+# Already compressed, or not worth it. SSE is skipped so events are not held back by
+# proxies that wait for a full compressed block.
+_SKIP_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/x-gzip",
+        "application/zip",
+        "application/zstd",
+        "application/x-bzip2",
+        "application/x-7z-compressed",
+        "application/octet-stream",
+        "text/event-stream",
+    }
+)
+_SKIP_PREFIXES = ("image/", "video/", "audio/", "font/")
+
+
+@lru_cache(maxsize=1)
+def available_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, in server preference order."""
+    found = ("zstd",) if zstandard is not None else ()
+    if brotli is not None:
+        found += ("br",)
+    return (*found, "gzip")
+
+
+class Compressor:
+    """
+    Streaming compressor for one response. `compress(chunk)` returns everything the
+    chunk produced (sync flush, so a streamed body reaches the client chunk by chunk);
+    `finish()` closes the stream.
+    """
+
+    def __init__(self, encoding: str, level: int) -> None:
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=level)
+        elif encoding == "gzip":
+            # wbits=31: gzip container instead of raw zlib.
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+        else:
+            raise ValueError(f"unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(chunk) + self._obj.flush()
+        return self._obj.compress(chunk) + self._obj.flush(self._flush_mode)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(chunk) + self._obj.finish()
+        return self._obj.compress(chunk) + self._obj.flush()
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, offered: tuple[str, ...]) -> str | None:
+    """Pick from `offered` (preference order) by the client's Accept-Encoding q-values."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in offered:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+@lru_cache(maxsize=4)
+def _route_levels(value: str) -> tuple[tuple[str, int], ...]:
+    levels = []
+    for item in parse_csv(value):
+        path, _, level = item.rpartition("=")
+        levels.append((path.rstrip("/") or "/", int(level)))
+    # Longest prefix first.
+    return tuple(sorted(levels, key=lambda pl: len(pl[0]), reverse=True))
+
+
+def route_level(path: str, value: str) -> int | None:
+    """COMPRESSION_ROUTE_LEVELS entry for `path` (prefix match), if any; 0 = off."""
+    for prefix, level in _route_levels(value):
+        if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+            return level
+    return None
+
+
+def _level(encoding: str, route: int | None) -> int:
+    default, low, high = _LEVELS[encoding]
+    return default if route is None else min(max(route, low), high)
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    media = headers.get("content-type", "").partition(";")[0].strip().lower()
+    return media not in _SKIP_TYPES and not media.startswith(_SKIP_PREFIXES)
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best encoding both sides support (zstd, br,
+    gzip; zstd and br only when their packages are installed).
+
+    Bodies sent in one piece below COMPRESSION_MIN_SIZE go out as-is. Streamed bodies
+    are compressed chunk by chunk as the app produces them, never buffered whole.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        s = get_settings()
+        if scope["type"] != "http" or not s.compression_enabled:
+            await self.app(scope, receive, send)
+            return
+        level = route_level(scope["path"], s.compression_route_levels)
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        offered = _offered(s.compression_encodings)
+        encoding = negotiate(accept, offered) if accept and level != 0 else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(send, encoding, _level(encoding, level), s.compression_min_size)
+        await self.app(scope, receive, responder.send)
+
+
+@lru_cache(maxsize=4)
+def _offered(value: str) -> tuple[str, ...]:
+    available = available_encodings()
+    return tuple(e for e in parse_csv(value) if e in available)
+
+
+class _Responder:
+    def __init__(self, send: Send, encoding: str, level: int, min_size: int) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._level = level
+        self._min_size = min_size
+        self._start: Message | None = None
+        self._compressor: Compressor | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if message["status"] in (204, 304) or not _compressible(headers):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                self._start = message  # held until the first body chunk decides
+            return
+        if self._passthrough or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self._compressor is None:
+            assert self._start is not None
+            if not more and len(body) < self._min_size:
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            self._compressor = Compressor(self._encoding, self._level)
+            headers = MutableHeaders(raw=self._start["headers"])
+            del headers["content-length"]
+            headers["content-encoding"] = self._encoding
+            headers.add_vary_header("Accept-Encoding")
+            metrics.inc("compression_responses_total", labels={"encoding": self._encoding})
+            await self._send(self._start)
+        elif not body and more:
+            return
+
+        out = self._compressor.finish(body) if not more else self._compressor.compress(body)
+        metrics.inc(
+            "compression_bytes_total", len(body), {"encoding": self._encoding, "direction": "in"}
+        )
+        metrics.inc(
+            "compression_bytes_total", len(out), {"encoding": self._encoding, "direction": "out"}
+        )
+        await self._send({"type": "http.response.body", "body": out, "more_body": more})
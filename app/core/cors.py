@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from starlette.datastructures import Headers
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.observability import metrics
+
+metrics.describe(
+    "cors_preflight_total",
+    "counter",
+    "CORS preflights answered before the app (outcome: allowed, denied); not in http_requests_*.",
+)
+
+# (status, raw headers, body) of a finished preflight response.
+Preflight = tuple[int, tuple[tuple[bytes, bytes], ...], bytes]
+
+
+class CachedCORSMiddleware(CORSMiddleware):
+    """
+    Starlette's CORSMiddleware with its decisions memoized.
+
+    Allow/deny per Origin is cached, so CORS_ALLOW_ORIGIN_REGEX runs once per distinct
+    origin instead of on every request. Preflight answers are cached per (origin, method,
+    requested headers, private network) and sent as prebuilt ASGI messages. Both caches
+    are LRU-bounded by `cache_size`, since every key is client-controlled.
+
+    Add it last so it is the outermost layer: preflights are then answered before the
+    request-id and metrics middleware and don't count toward route latency.
+    """
+
+    def __init__(self, app: ASGIApp, *, cache_size: int = 1024, **kwargs: Any) -> None:
+        super().__init__(app, **kwargs)
+        self.is_allowed_origin = lru_cache(maxsize=cache_size)(self.is_allowed_origin)  # type: ignore[method-assign]
+        self._preflight = lru_cache(maxsize=cache_size)(self._build_preflight)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "OPTIONS":
+            await super().__call__(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        origin = headers.get("origin")
+        method = headers.get("access-control-request-method")
+        if origin is None or method is None:
+            await self.app(scope, receive, send)
+            return
+
+        status, raw_headers, body = self._preflight(
+            origin,
+            method,
+            headers.get("access-control-request-headers"),
+            headers.get("access-control-request-private-network"),
+        )
+        outcome = "allowed" if status == 200 else "denied"
+        metrics.inc("cors_preflight_total", labels={"outcome": outcome})
+        await send({"type": "http.response.start", "status": status, "headers": list(raw_headers)})
+        await send({"type": "http.response.body", "body": body})
+
+    def _build_preflight(
+        self,
+        origin: str,
+        method: str,
+        requested_headers: str | None,
+        private_network: str | None,
+    ) -> Preflight:
+        raw = [
+            (b"origin", origin.encode("latin-1")),
+            (b"access-control-request-method", method.encode("latin-1")),
+        ]
+        if requested_headers is not None:
+            raw.append((b"access-control-request-headers", requested_headers.encode("latin-1")))
+        if private_network is not None:
+            raw.append(
+                (b"access-control-request-private-network", private_network.encode("latin-1"))
+            )
+        response = self.preflight_response(request_headers=Headers(raw=raw))
+        return response.status_code, tuple(response.raw_headers), response.body
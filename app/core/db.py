@@ -1,49 +1,350 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+import itertools
+import logging
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, sessionmaker
+from sqlalchemy.pool import Pool
+
+from app.core.deadline import DeadlineExceeded, check_deadline, deadline_expired, remaining_s
+from app.core.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_pool_metrics
+from app.core.settings import Settings, get_settings
+from app.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("db_replica_healthy", "gauge", "1 if the replica passed its last health check.")
+metrics.describe(
+    "db_reads_routed_total", "counter", "Replica-eligible reads, by where they were sent."
+)
+
+# How many SQLite VM instructions run between deadline checks.
+_SQLITE_PROGRESS_STEPS = 1000
+
+_SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _sqlite_deadline_guard() -> int:
+    # Non-zero return makes SQLite abort the running statement ("interrupted").
+    return 1 if deadline_expired() else 0
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.settings import get_settings
+def _sqlite_pragmas(s: Settings) -> list[str]:
+    journal_mode = s.sqlite_journal_mode.upper()
+    synchronous = s.sqlite_synchronous.upper()
+    # Values are interpolated into SQL, so only accept the documented keywords.
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {s.sqlite_journal_mode!r}")
+    if synchronous not in _SQLITE_SYNCHRONOUS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {s.sqlite_synchronous!r}")
 
+    return [
+        # WAL: readers don't block behind the writer; NORMAL is durable enough in WAL mode.
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(s.sqlite_busy_timeout_ms)}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size={-int(s.sqlite_cache_size_kib)}",
+        f"PRAGMA mmap_size={int(s.sqlite_mmap_size)}",
+    ]
 
-def _make_engine() -> Engine:
+
+def _sqlite_connect_hook(pragmas: list[str], *, deadline_guard: bool):
+    def on_connect(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+        if deadline_guard:
+            # SQLite has no statement_timeout; a progress handler gives us the same effect.
+            dbapi_connection.set_progress_handler(_sqlite_deadline_guard, _SQLITE_PROGRESS_STEPS)
+
+    return on_connect
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    u = make_url(url)
+    if u.get_backend_name() != "sqlite":
+        return False
+    return u.database in (None, "", ":memory:") or u.query.get("mode") == "memory"
+
+
+def _pool_kwargs(url: str, s: Settings, poolclass: type[Pool]) -> dict[str, object]:
+    if _is_sqlite_memory(url):
+        # In-memory SQLite lives per connection; keep SQLAlchemy's default pool for it.
+        return {"pool_pre_ping": s.db_pool_pre_ping}
+    return {
+        "poolclass": poolclass,
+        "pool_size": s.db_pool_size,
+        "max_overflow": s.db_max_overflow,
+        "pool_timeout": s.db_pool_timeout_s,
+        "pool_recycle": s.db_pool_recycle_s,
+        "pool_pre_ping": s.db_pool_pre_ping,
+    }
+
+
+def _make_engine(url: str | None = None) -> Engine:
     s = get_settings()
-    url = s.database_url
+    url = url or s.database_url
 
     connect_args: dict[str, object] = {}
     # SQLite needs this flag for multithreaded testclient usage.
     if url.startswith("sqlite"):
         connect_args["check_same_thread"] = False
 
-    return create_engine(
+    eng = create_engine(
         url,
         echo=s.db_echo,
         future=True,
         connect_args=connect_args,
+        **_pool_kwargs(url, s, InstrumentedQueuePool),
+    )
+    if url.startswith("sqlite"):
+        event.listen(eng, "connect", _sqlite_connect_hook(_sqlite_pragmas(s), deadline_guard=True))
+    return eng
+
+
+# asyncio drivers for the sync URLs we accept in DATABASE_URL.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to the same database via its asyncio driver."""
+    backend = make_url(url).get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend!r}")
+    # Swap only the scheme; re-rendering the URL would re-quote paths like :memory:.
+    _, rest = url.split("://", 1)
+    return f"{_ASYNC_DRIVERS[backend]}://{rest}"
+
+
+def _make_async_engine() -> AsyncEngine:
+    s = get_settings()
+    url = s.async_database_url or async_database_url(s.database_url)
+    eng = create_async_engine(
+        url,
+        echo=s.db_echo,
+        **_pool_kwargs(url, s, InstrumentedAsyncQueuePool),
     )
+    if url.startswith("sqlite"):
+        # aiosqlite runs statements on its own thread without our contextvars,
+        # so no deadline guard here; asyncio cancellation covers the async path.
+        hook = _sqlite_connect_hook(_sqlite_pragmas(s), deadline_guard=False)
+        event.listen(eng.sync_engine, "connect", hook)
+    return eng
+
+
+class DeadlineSession(Session):
+    """Session that applies the request deadline to every transaction it begins."""
+
+
+# Pass as bind_arguments= on reads that may be served by a replica.
+READ_REPLICA = {"replica": True}
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines, skipping ones that failed a health check.
+
+    Health is a `SELECT 1` probe, cached per replica for `health_interval_s`,
+    so routing costs at most one probe per replica per interval.
+    """
+
+    def __init__(self, engines: list[Engine], *, health_interval_s: float = 5.0) -> None:
+        self.engines = engines
+        self._health_interval_s = health_interval_s
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        # index -> (healthy, monotonic time the verdict expires)
+        self._health: dict[int, tuple[bool, float]] = {}
+
+    @classmethod
+    def from_settings(cls, s: Settings) -> ReplicaSet:
+        urls = [u.strip() for u in s.database_replica_urls.split(",") if u.strip()]
+        engines = []
+        for i, url in enumerate(urls):
+            eng = _make_engine(url)
+            register_pool_metrics(eng, f"replica{i}")
+            engines.append(eng)
+        return cls(engines, health_interval_s=s.db_replica_health_interval_s)
+
+    def _probe(self, eng: Engine) -> bool:
+        try:
+            with eng.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+        except DBAPIError:
+            logger.warning("replica health check failed url=%s", eng.url.render_as_string())
+            return False
+        return True
+
+    def _healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._health.get(index)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        healthy = self._probe(self.engines[index])
+        with self._lock:
+            self._health[index] = (healthy, now + self._health_interval_s)
+        metrics.set_gauge("db_replica_healthy", int(healthy), {"pool": f"replica{index}"})
+        return healthy
+
+    def pick(self) -> Engine | None:
+        """Next healthy replica, or None when there are none (callers use the primary)."""
+        if not self.engines:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._healthy(index):
+                return self.engines[index]
+        return None
+
+
+class RoutingSession(DeadlineSession):
+    """
+    Writes and ordinary reads use the primary. Reads executed with
+    bind_arguments=READ_REPLICA go to a replica, unless this session wrote
+    within the read-your-writes window.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, replica: bool = False, **kw):  # type: ignore[override]
+        replicas: ReplicaSet | None = self.info.get("replicas")
+        if replica and replicas is not None and not self._read_your_writes():
+            eng = replicas.pick()
+            if eng is not None:
+                metrics.inc("db_reads_routed_total", labels={"target": "replica"})
+                return eng
+        if replica:
+            metrics.inc("db_reads_routed_total", labels={"target": "primary"})
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _read_your_writes(self) -> bool:
+        last_write = self.info.get("last_write_at")
+        if last_write is None:
+            return False
+        return time.monotonic() - last_write < self.info.get("read_your_writes_s", 0.0)
+
+
+def _mark_write(session: Session) -> None:
+    session.info["last_write_at"] = time.monotonic()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: Session, _flush_context) -> None:
+    _mark_write(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _after_dml(state: ORMExecuteState) -> None:
+    # Core insert()/update()/delete() through the session never flush.
+    if state.is_insert or state.is_update or state.is_delete:
+        _mark_write(state.session)
 
 
 engine: Engine = _make_engine()
+register_pool_metrics(engine, "primary")
+replicas = ReplicaSet.from_settings(get_settings())
 
 SessionLocal = sessionmaker(
     bind=engine,
+    class_=RoutingSession,
+    info={"replicas": replicas, "read_your_writes_s": get_settings().db_read_your_writes_s},
     autoflush=False,
     autocommit=False,
     future=True,
 )
 
 
-def get_db() -> Generator[Session, None, None]:
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    # Lazy: the asyncio driver is only imported by processes that use the async path.
+    eng = _make_async_engine()
+    register_pool_metrics(eng.sync_engine, "primary_async")
+    return eng
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        sync_session_class=DeadlineSession,
+        autoflush=False,
+        # Objects are usually serialized after commit; don't re-SELECT them lazily.
+        expire_on_commit=False,
+    )
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_statement_timeout(
+    _session: Session, _transaction: SessionTransaction, connection: Connection
+) -> None:
+    # Don't even start a transaction for a caller that already gave up.
+    check_deadline()
+
+    left = remaining_s()
+    if left is not None and connection.dialect.name == "postgresql":
+        # SET LOCAL is scoped to this transaction, so pooled connections stay clean.
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(left * 1000), 1)}")
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    A session that is closed on exit, with deadline-cancelled statements surfacing as
+    DeadlineExceeded. For work that opens its own session on a worker thread.
+    """
     db = SessionLocal()
     try:
         yield db
+    except OperationalError as exc:
+        # Statement was cancelled by statement_timeout / the SQLite progress handler.
+        if deadline_expired():
+            raise DeadlineExceeded("Deadline exceeded") from exc
+        raise
     finally:
         db.close()
 
 
+def get_db() -> Generator[Session, None, None]:
+    with session_scope() as db:
+        yield db
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async counterpart of get_db: the route stays on the event loop instead of
+    holding a threadpool worker for the whole DB round trip.
+    """
+    async with get_async_sessionmaker()() as db:
+        try:
+            yield db
+        except OperationalError as exc:
+            if deadline_expired():
+                raise DeadlineExceeded("Deadline exceeded") from exc
+            raise
+
+
 def init_db() -> None:
     """
     Minimal initializer (Module M).
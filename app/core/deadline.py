@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import time
+from functools import lru_cache
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import get_settings, parse_csv
+
+DEADLINE_HEADER = "x-request-deadline"
+
+# Absolute deadline on the time.monotonic() clock. None means "no budget".
+deadline_var: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """The caller's time budget ran out; mapped to 504 by the app."""
+
+
+def parse_budget_ms(value: str | None) -> float | None:
+    """
+    Parse X-Request-Deadline: remaining budget in milliseconds.
+
+    The header is relative on purpose, so client/server clock skew doesn't matter.
+    Garbage values are ignored (no budget) rather than rejected.
+    """
+    if value is None or not value.strip():
+        return None
+    try:
+        ms = float(value)
+    except ValueError:
+        return None
+    if math.isnan(ms) or math.isinf(ms):
+        return None
+    return max(ms, 0.0)
+
+
+def resolve_budget_s(header_value: str | None, default_ms: float) -> float | None:
+    """Client budget capped by the server default (a client can't extend our policy)."""
+    candidates = [
+        ms for ms in (parse_budget_ms(header_value), default_ms or None) if ms is not None
+    ]
+    if not candidates:
+        return None
+    return min(candidates) / 1000.0
+
+
+def set_deadline(budget_s: float | None) -> contextvars.Token[float | None]:
+    return deadline_var.set(None if budget_s is None else time.monotonic() + budget_s)
+
+
+def remaining_s() -> float | None:
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    left = remaining_s()
+    return left is not None and left <= 0
+
+
+def check_deadline() -> None:
+    if deadline_expired():
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+def cap_timeout(timeout_s: float) -> float:
+    """Shrink a timeout to the remaining budget; raise if nothing is left."""
+    left = remaining_s()
+    if left is None:
+        return timeout_s
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return min(timeout_s, left)
+
+
+class DeadlineMiddleware:
+    """
+    Captures the request budget into deadline_var and cancels the handler when it runs out.
+
+    Pure ASGI on purpose: BaseHTTPMiddleware's call_next waits for the handler task
+    to finish even after the caller is cancelled, so the 504 would come too late.
+    Sync handlers already running in the threadpool still finish in their thread;
+    DB statements are cut short by get_db / the SQLite progress handler.
+
+    REQUEST_BUDGET_BYPASS_PATHS get no deadline: once a streamed response has started,
+    cancelling it would end the body cleanly and the client couldn't tell it was cut.
+    REQUEST_ROUTE_BUDGETS replaces REQUEST_BUDGET_MS for the paths it lists.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        s = get_settings()
+        if scope["type"] != "http" or scope["path"] in _bypass_paths(s.request_budget_bypass_paths):
+            await self.app(scope, receive, send)
+            return
+
+        default_ms = _route_budgets(s.request_route_budgets).get(scope["path"], s.request_budget_ms)
+        budget_s = resolve_budget_s(Headers(scope=scope).get(DEADLINE_HEADER), default_ms)
+        if budget_s is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            # A message is never cut mid-send: a start without its body is a broken response.
+            # The deadline still stops a stream between chunks.
+            with anyio.CancelScope(shield=True):
+                await send(message)
+
+        token = set_deadline(budget_s)
+        try:
+            if budget_s > 0:
+                with anyio.move_on_after(budget_s) as cancel_scope:
+                    await self.app(scope, receive, send_wrapper)
+                if not cancel_scope.cancelled_caught:
+                    return
+            # Too late to change a response that is already on the wire.
+            if not response_started:
+                await deadline_exceeded_response()(scope, receive, send)
+        finally:
+            deadline_var.reset(token)
+
+
+def deadline_exceeded_response() -> JSONResponse:
+    return JSONResponse(status_code=504, content={"detail": "Deadline exceeded"})
+
+
+@lru_cache(maxsize=4)
+def _bypass_paths(value: str) -> frozenset[str]:
+    return frozenset(parse_csv(value))
+
+
+@lru_cache(maxsize=4)
+def _route_budgets(value: str) -> dict[str, float]:
+    budgets = {}
+    for item in parse_csv(value):
+        path, _, ms = item.rpartition("=")
+        budgets[path] = float(ms)
+    return budgets
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Callable
+from typing import Any, ParamSpec, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+from app.core.settings import get_settings
+from app.observability import metrics
+
+metrics.describe("executor_threads", "gauge", "Thread budget of each named executor.")
+metrics.describe("executor_busy", "gauge", "Calls currently running on each executor.")
+metrics.describe("executor_waiting", "gauge", "Calls waiting for a thread on each executor.")
+metrics.describe("executor_wait_seconds", "histogram", "Time a call waited for an executor thread.")
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_limiters: dict[str, CapacityLimiter] = {}
+
+
+def _sizes() -> dict[str, int]:
+    s = get_settings()
+    # More DB threads than pooled connections would only queue on the pool.
+    db = s.executor_db_threads
+    if db is None:
+        db = s.db_pool_size + s.db_max_overflow
+    return {"db": db, "delivery": s.executor_delivery_threads}
+
+
+def get_executor(name: str) -> CapacityLimiter:
+    """
+    The thread budget for `name` ("db", "delivery" or "default").
+
+    Executors share AnyIO's worker threads but not its default 40-token limiter, so a
+    burst of slow deliveries can't starve DB calls (or sync routes) of threads.
+    "default" is that shared limiter; asked for before the lifespan configured it, it is
+    sized here, which needs a running event loop.
+    """
+    limiter = _limiters.get(name)
+    if limiter is not None:
+        return limiter
+    if name == "default":
+        configure_default_executor()
+        return _limiters[name]
+    sizes = _sizes()
+    if name not in sizes:
+        raise ValueError(
+            f"Unknown executor {name!r}; expected one of {sorted([*sizes, 'default'])}"
+        )
+    limiter = _limiters[name] = CapacityLimiter(sizes[name])
+    return limiter
+
+
+async def run_in_executor(
+    name: str, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+) -> T:
+    """run_in_threadpool on a named executor; contextvars (request id) carry over."""
+    queued = time.perf_counter()
+
+    def call() -> T:
+        metrics.observe(
+            "executor_wait_seconds", time.perf_counter() - queued, labels={"executor": name}
+        )
+        return func(*args, **kwargs)
+
+    return await to_thread.run_sync(call, limiter=get_executor(name))
+
+
+def configure_default_executor() -> None:
+    """
+    Size AnyIO's default limiter (sync routes and dependencies) from EXECUTOR_DEFAULT_THREADS
+    and report it as the "default" executor. It is per event loop: call from the lifespan.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = get_settings().executor_default_threads
+    _limiters["default"] = limiter
+
+
+def reset_executors() -> None:
+    """Forget the limiters; the next call rebuilds them from current settings."""
+    _limiters.clear()
+
+
+def _collect() -> None:
+    for name, limiter in list(_limiters.items()):
+        labels = {"executor": name}
+        metrics.set_gauge("executor_threads", limiter.total_tokens, labels=labels)
+        metrics.set_gauge("executor_busy", limiter.borrowed_tokens, labels=labels)
+        metrics.set_gauge("executor_waiting", limiter.statistics().tasks_waiting, labels=labels)
+
+
+metrics.register_collector(_collect)
+
+
+def inline(func: Callable[P, T]) -> Callable[P, Any]:
+    """
+    Mark a sync route (or dependency) as non-blocking: FastAPI then calls it on the event
+    loop instead of hopping to the threadpool, and validates its response inline too.
+
+    Only for handlers that never block: no I/O, no locks, no heavy CPU. Anything that
+    does belongs on a thread (`run_in_executor`).
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+from collections.abc import Callable
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact JSON bytes; orjson when installed, else the stdlib with the same output shape.
+
+    The two differ at the edges: orjson writes NaN/Infinity as null where the stdlib
+    raises ValueError, and formats exponents differently (1e-7 vs 1e-07).
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class: JSONResponse rendered through `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Mark a route whose return value already is its response_model's exact JSON shape:
+    it is encoded straight into a FastJSONResponse, skipping FastAPI's validate +
+    serialize round trip. response_model still documents the route in OpenAPI.
+
+    Only for plain JSON-native dicts/lists with the route's default status code; the
+    output is not checked, and response_model_exclude_* options do not apply.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> FastJSONResponse:
+            return FastJSONResponse(await func(*args, **kwargs))
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> FastJSONResponse:
+        return FastJSONResponse(func(*args, **kwargs))
+
+    return wrapper
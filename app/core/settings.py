@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from functools import lru_cache
+from typing import Literal
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+DeliveryMode = Literal["background", "async", "outbox"]
+
+
 class Settings(BaseSettings):
     """
     Centralized, env-first settings.
@@ -19,7 +24,8 @@ class Settings(BaseSettings):
     cors_allow_origin_regex: str = ""  # опционально, если хочешь regex
     cors_allow_credentials: bool = False
     cors_allow_methods: str = "GET,POST,PUT,PATCH,DELETE,OPTIONS"
-    cors_allow_headers: str = "Authorization,Content-Type,X-Request-ID"
+    cors_allow_headers: str = "Authorization,Content-Type,X-Request-ID,Idempotency-Key"
+    cors_cache_size: int = 1024  # memoized origin decisions / preflight answers
 
     # External integrations (Module N)
     external_base_url: str = ""
@@ -43,6 +49,152 @@ class Settings(BaseSettings):
         alias="DATABASE_URL",
     )
     db_echo: bool = Field(default=False, alias="DB_ECHO")
+    # Optional explicit asyncio URL; derived from DATABASE_URL when empty
+    async_database_url: str = Field(default="", alias="ASYNC_DATABASE_URL")
+    # Read replicas (comma-separated URLs); empty = every read goes to DATABASE_URL
+    database_replica_urls: str = Field(default="", alias="DATABASE_REPLICA_URLS")
+    db_replica_health_interval_s: float = Field(default=5.0, alias="DB_REPLICA_HEALTH_INTERVAL_S")
+    # Hash-sharded notifications (comma-separated URLs); empty = single database
+    database_shard_urls: str = Field(default="", alias="DATABASE_SHARD_URLS")
+    # Unique per process writing to the shards (0-1023); part of every generated id
+    snowflake_worker_id: int = Field(default=0, alias="SNOWFLAKE_WORKER_ID")
+    # After a write, the same session reads from the primary for this long
+    db_read_your_writes_s: float = Field(default=2.0, alias="DB_READ_YOUR_WRITES_S")
+
+    # Connection pool (ignored for in-memory SQLite, which uses a per-thread pool)
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_s: float = Field(default=30.0, alias="DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=-1, alias="DB_POOL_RECYCLE_S")  # -1 = never
+    db_pool_pre_ping: bool = Field(default=False, alias="DB_POOL_PRE_PING")
+
+    # SQLite pragmas applied to every new connection
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size_kib: int = Field(default=20000, alias="SQLITE_CACHE_SIZE_KIB")
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE")  # bytes
+
+    # Notifications
+    notify_bulk_max_items: int = Field(default=10000, alias="NOTIFY_BULK_MAX_ITEMS")
+    notify_bulk_batch_size: int = Field(default=1000, alias="NOTIFY_BULK_BATCH_SIZE")
+    # Read-through cache for lookups by id (0 entries = disabled)
+    notification_cache_size: int = Field(default=10000, alias="NOTIFICATION_CACHE_SIZE")
+    notification_cache_ttl_s: float = Field(default=60.0, alias="NOTIFICATION_CACHE_TTL_S")
+    # POST /notify/batch: max messages per request
+    notify_batch_max_items: int = Field(default=1000, alias="NOTIFY_BATCH_MAX_ITEMS")
+    # Opt-in group commit: single writer task batching POST /notifications inserts
+    notify_write_behind: bool = Field(default=False, alias="NOTIFY_WRITE_BEHIND")
+    notify_write_behind_max_batch: int = Field(default=500, alias="NOTIFY_WRITE_BEHIND_MAX_BATCH")
+    notify_write_behind_max_delay_ms: float = Field(
+        default=5.0, alias="NOTIFY_WRITE_BEHIND_MAX_DELAY_MS"
+    )
+    notify_write_behind_queue_size: int = Field(
+        default=10000, alias="NOTIFY_WRITE_BEHIND_QUEUE_SIZE"
+    )
+
+    # GET /notifications/stream (SSE) and /notifications/ws: per-subscriber buffer (events)
+    notify_stream_buffer: int = Field(default=100, alias="NOTIFY_STREAM_BUFFER")
+    notify_stream_max_subscribers: int = Field(default=1000, alias="NOTIFY_STREAM_MAX_SUBSCRIBERS")
+    notify_stream_ping_s: float = Field(default=15.0, alias="NOTIFY_STREAM_PING_S")
+
+    # Retention: archive (gzip NDJSON) + delete notifications older than RETENTION_DAYS (0 = off)
+    retention_days: float = Field(default=0.0, alias="RETENTION_DAYS")
+    retention_archive_dir: str = Field(default="./archive", alias="RETENTION_ARCHIVE_DIR")
+    retention_batch_size: int = Field(default=1000, alias="RETENTION_BATCH_SIZE")
+    retention_max_rows_per_s: float = Field(default=0.0, alias="RETENTION_MAX_ROWS_PER_S")
+    retention_interval_s: float = Field(default=3600.0, alias="RETENTION_INTERVAL_S")
+    retention_in_process: bool = Field(default=True, alias="RETENTION_IN_PROCESS")
+
+    # Delivery for POST /notify:
+    # background (threadpool task) | async (event-loop dispatcher) | outbox (durable queue)
+    notify_delivery: DeliveryMode = Field(default="background", alias="NOTIFY_DELIVERY")
+    notify_async_concurrency: int = Field(default=100, alias="NOTIFY_ASYNC_CONCURRENCY")
+    notify_async_queue_size: int = Field(default=1000, alias="NOTIFY_ASYNC_QUEUE_SIZE")
+    notify_retry_after_s: int = Field(default=1, alias="NOTIFY_RETRY_AFTER_S")
+    # Outbox mode: repeats of a message within this window return the original id (0 = off)
+    notify_dedup_window_s: float = Field(default=0.0, alias="NOTIFY_DEDUP_WINDOW_S")
+    notify_dedup_cache_size: int = Field(default=100000, alias="NOTIFY_DEDUP_CACHE_SIZE")
+    # Outbox workers; in-process means they run inside the web app's event loop
+    outbox_in_process: bool = Field(default=True, alias="OUTBOX_IN_PROCESS")
+    outbox_workers: int = Field(default=2, alias="OUTBOX_WORKERS")
+    outbox_batch_size: int = Field(default=100, alias="OUTBOX_BATCH_SIZE")
+    outbox_concurrency: int = Field(default=10, alias="OUTBOX_CONCURRENCY")
+    outbox_poll_interval_s: float = Field(default=0.5, alias="OUTBOX_POLL_INTERVAL_S")
+    outbox_lease_s: float = Field(default=30.0, alias="OUTBOX_LEASE_S")
+    outbox_max_attempts: int = Field(default=8, alias="OUTBOX_MAX_ATTEMPTS")
+    outbox_backoff_base_s: float = Field(default=1.0, alias="OUTBOX_BACKOFF_BASE_S")
+    outbox_backoff_max_s: float = Field(default=300.0, alias="OUTBOX_BACKOFF_MAX_S")
+
+    # Admission control: adaptive (AIMD) concurrency limit, short queue, then 503
+    admission_enabled: bool = Field(default=True, alias="ADMISSION_ENABLED")
+    admission_initial_limit: int = Field(default=64, alias="ADMISSION_INITIAL_LIMIT")
+    admission_min_limit: int = Field(default=4, alias="ADMISSION_MIN_LIMIT")
+    admission_max_limit: int = Field(default=512, alias="ADMISSION_MAX_LIMIT")
+    admission_queue_size: int = Field(default=64, alias="ADMISSION_QUEUE_SIZE")
+    admission_queue_timeout_ms: float = Field(default=100.0, alias="ADMISSION_QUEUE_TIMEOUT_MS")
+    admission_retry_after_s: int = Field(default=1, alias="ADMISSION_RETRY_AFTER_S")
+    # Priority lane (never queued or shed) and long-lived streams/exports
+    admission_bypass_paths: str = Field(
+        default="/health,/metrics,/notifications/stream,/notifications/export",
+        alias="ADMISSION_BYPASS_PATHS",
+    )
+
+    # Idempotency-Key on POST: responses kept per process for replay (0 entries = disabled)
+    idempotency_store_size: int = Field(default=10000, alias="IDEMPOTENCY_STORE_SIZE")
+    idempotency_ttl_s: float = Field(default=86400.0, alias="IDEMPOTENCY_TTL_S")
+    idempotency_max_response_bytes: int = Field(
+        default=1048576, alias="IDEMPOTENCY_MAX_RESPONSE_BYTES"
+    )
+
+    # Deadlines: default per-request budget in ms (0 = no budget unless X-Request-Deadline is sent)
+    request_budget_ms: float = Field(default=0, alias="REQUEST_BUDGET_MS")
+    # Long-lived responses the budget would cut mid-body; they get no deadline at all
+    request_budget_bypass_paths: str = Field(
+        default="/notifications/stream,/notifications/export",
+        alias="REQUEST_BUDGET_BYPASS_PATHS",
+    )
+    # Per-route budgets: "path=ms" pairs (exact path) used instead of REQUEST_BUDGET_MS there;
+    # X-Request-Deadline can still only tighten them. 0 = no server budget for that route.
+    request_route_budgets: str = Field(
+        default="/notifications/search=2000", alias="REQUEST_ROUTE_BUDGETS"
+    )
+
+    # Thread budgets for blocking work (see app/core/executors.py). "default" is AnyIO's
+    # limiter used by sync routes; db, when unset, is DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    executor_default_threads: int = Field(default=40, alias="EXECUTOR_DEFAULT_THREADS")
+    executor_db_threads: int | None = Field(default=None, alias="EXECUTOR_DB_THREADS")
+    executor_delivery_threads: int = Field(default=20, alias="EXECUTOR_DELIVERY_THREADS")
+
+    # Response compression (see app/core/compression.py). Encodings in preference order;
+    # zstd/br are used only when their packages are installed. Route levels: "path=level"
+    # pairs, prefix-matched, clamped to each encoding's range; 0 turns compression off.
+    compression_enabled: bool = Field(default=True, alias="COMPRESSION_ENABLED")
+    compression_min_size: int = Field(default=500, alias="COMPRESSION_MIN_SIZE")  # bytes
+    compression_encodings: str = Field(default="zstd,br,gzip", alias="COMPRESSION_ENCODINGS")
+    compression_route_levels: str = Field(
+        default="/notifications/export=1", alias="COMPRESSION_ROUTE_LEVELS"
+    )
+
+    @field_validator("compression_route_levels")
+    @classmethod
+    def _check_route_levels(cls, value: str) -> str:
+        # Parsed per request by app.core.compression; a bad entry must fail at startup.
+        return _check_path_pairs(value, int, "level")
+
+    @field_validator("request_route_budgets")
+    @classmethod
+    def _check_route_budgets(cls, value: str) -> str:
+        # Parsed per request by app.core.deadline, same as the compression levels.
+        return _check_path_pairs(value, float, "ms")
+
+    @field_validator("notify_delivery", mode="before")
+    @classmethod
+    def _normalize_delivery(cls, value: object) -> object:
+        # Unset/empty means the default; any other unknown mode fails at startup.
+        if isinstance(value, str):
+            return value.strip().lower() or "background"
+        return value
 
 
 @lru_cache(maxsize=1)
@@ -52,3 +204,15 @@ def get_settings() -> Settings:
 
 def parse_csv(value: str) -> list[str]:
     return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _check_path_pairs(value: str, parse: Callable[[str], object], unit: str) -> str:
+    for item in parse_csv(value):
+        path, sep, number = item.rpartition("=")
+        try:
+            parse(number)
+        except ValueError:
+            sep = ""
+        if not sep or not path.startswith("/"):
+            raise ValueError(f"expected '/path={unit}' pairs, got {item!r}")
+    return value
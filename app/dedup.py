@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import time
+
+from app.cache import TTLCache
+from app.core.settings import get_settings
+from app.observability import metrics
+
+metrics.describe(
+    "notify_duplicates_total",
+    "counter",
+    "Duplicate /notify messages answered with the original id, by where they were caught.",
+)
+
+# (content_hash, dedup_bucket): the unique key on notifications.
+DedupKey = tuple[str, int]
+
+_cache: TTLCache[DedupKey, int] | None = None
+
+
+def content_hash(message: str) -> str:
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def dedup_key(message: str, window_s: float, *, now: float | None = None) -> DedupKey:
+    """
+    Key for `message` in the current dedup window.
+
+    Windows are fixed buckets of `window_s` seconds, so a repeat is caught if it lands
+    in the same bucket as the original: anywhere from 0 to `window_s` seconds later.
+    """
+    now = time.time() if now is None else now
+    return content_hash(message), int(now // window_s)
+
+
+def get_dedup_cache() -> TTLCache[DedupKey, int]:
+    global _cache
+    if _cache is None:
+        s = get_settings()
+        _cache = TTLCache(
+            "notify_dedup",
+            maxsize=s.notify_dedup_cache_size,
+            ttl_s=max(s.notify_dedup_window_s, 1.0),
+        )
+    return _cache
+
+
+def clear_dedup_cache() -> None:
+    """Drop the cache; the next lookup rebuilds it from current settings."""
+    global _cache
+    _cache = None
+
+
+def cached_original(key: DedupKey) -> int | None:
+    """Id of the original notification if this process has seen `key`; no DB access."""
+    original = get_dedup_cache().get(key)
+    if original is not None:
+        metrics.inc("notify_duplicates_total", labels={"source": "cache"})
+    return original
+
+
+def _collect_cache_metrics() -> None:
+    if _cache is not None:
+        _cache.export_metrics()
+
+
+metrics.register_collector(_collect_cache_metrics)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+
+from app.core.settings import get_settings
+from app.notification import deliver_notification_async
+from app.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("delivery_queue_depth", "gauge", "Deliveries waiting for a concurrency slot.")
+metrics.describe("delivery_in_flight", "gauge", "Deliveries currently running.")
+metrics.describe(
+    "delivery_rejected_total", "counter", "Deliveries refused because the queue was full."
+)
+
+_Deliver = Callable[[str, str | None], Awaitable[None]]
+
+
+class DeliveryDispatcher:
+    """
+    Async notification delivery on the event loop, off the request threadpool.
+
+    A semaphore caps deliveries in flight; the pending queue is bounded and
+    try_submit() refuses work when it is full, so callers can shed load (503)
+    instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 100,
+        max_pending: int = 1000,
+        deliver: _Deliver = deliver_notification_async,
+    ) -> None:
+        self._deliver_fn = deliver
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queue: asyncio.Queue[tuple[str, str | None]] = asyncio.Queue(maxsize=max_pending)
+        self._in_flight: set[asyncio.Task[None]] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def try_submit(self, message: str, request_id: str | None) -> bool:
+        try:
+            self._queue.put_nowait((message, request_id))
+        except asyncio.QueueFull:
+            metrics.inc("delivery_rejected_total")
+            return False
+        return True
+
+    def try_submit_many(self, messages: Sequence[str], request_id: str | None) -> bool:
+        """All-or-nothing: a batch is queued whole or refused whole."""
+        if self._queue.maxsize - self._queue.qsize() < len(messages):
+            metrics.inc("delivery_rejected_total", len(messages))
+            return False
+        for message in messages:
+            self._queue.put_nowait((message, request_id))
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="notify-delivery")
+
+    async def stop(self, *, drain_timeout_s: float = 5.0) -> None:
+        """Give queued deliveries a bounded chance to finish, then cancel the rest."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout_s)
+        except TimeoutError:
+            logger.warning("delivery drain timed out pending=%s", self._queue.qsize())
+        self._task.cancel()
+        for task in list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(self._task, *self._in_flight, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            message, request_id = await self._queue.get()
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._deliver(message, request_id))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _deliver(self, message: str, request_id: str | None) -> None:
+        try:
+            await self._deliver_fn(message, request_id)
+        finally:
+            self._semaphore.release()
+            self._queue.task_done()
+
+
+_dispatcher: DeliveryDispatcher | None = None
+
+
+def get_dispatcher() -> DeliveryDispatcher | None:
+    if _dispatcher is not None and _dispatcher.running:
+        return _dispatcher
+    return None
+
+
+async def start_dispatcher() -> DeliveryDispatcher:
+    global _dispatcher
+    s = get_settings()
+    _dispatcher = DeliveryDispatcher(
+        concurrency=s.notify_async_concurrency,
+        max_pending=s.notify_async_queue_size,
+    )
+    _dispatcher.start()
+    return _dispatcher
+
+
+async def stop_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
+
+
+def _collect() -> None:
+    if _dispatcher is not None:
+        metrics.set_gauge("delivery_queue_depth", _dispatcher.queue_depth())
+        metrics.set_gauge("delivery_in_flight", _dispatcher.in_flight())
+
+
+metrics.register_collector(_collect)
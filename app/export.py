@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+_CSV_HEADER = ("id", "message", "created_at")
+
+
+def _row_dict(r: Sequence[Any]) -> dict[str, Any]:
+    return {"id": r[0], "message": r[1], "created_at": _iso(r[2])}
+
+
+def _ndjson_chunk(rows: Sequence[Any]) -> bytes:
+    return "".join(
+        json.dumps(_row_dict(r), ensure_ascii=False, separators=(",", ":")) + "\n" for r in rows
+    ).encode("utf-8")
+
+
+def encode_page(rows: Sequence[Any], next_cursor: str | None) -> bytes:
+    """NotificationPage JSON straight from (id, message, created_at) rows, no model round trip."""
+    return json.dumps(
+        {"items": [_row_dict(r) for r in rows], "next_cursor": next_cursor},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_event(r: Sequence[Any]) -> str:
+    """One row as the JSON payload of a stream event (SSE data / WebSocket text frame)."""
+    return json.dumps(_row_dict(r), ensure_ascii=False, separators=(",", ":"))
+
+
+def _csv_chunk(rows: Sequence[Any], *, header: bool) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(_CSV_HEADER)
+    writer.writerows((r[0], r[1], _iso(r[2])) for r in rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def encode_export(
+    chunks: Iterable[Sequence[Any]], *, fmt: str, compress: bool = False
+) -> Iterator[bytes]:
+    """
+    Turn row chunks into body chunks: one yield per DB chunk, nothing buffered beyond it.
+
+    With compress=True the output is a single gzip member written incrementally.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+
+    def encoded() -> Iterator[bytes]:
+        if fmt == "csv":
+            # Header even for an empty export, so the file is still valid CSV.
+            yield _csv_chunk((), header=True)
+            for rows in chunks:
+                yield _csv_chunk(rows, header=False)
+        else:
+            for rows in chunks:
+                yield _ndjson_chunk(rows)
+
+    if not compress:
+        yield from encoded()
+        return
+
+    # wbits=31: gzip container instead of raw zlib.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for data in encoded():
+        out = compressor.compress(data)
+        if out:
+            yield out
+    yield compressor.flush()
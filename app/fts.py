@@ -0,0 +1,41 @@
+"""
+Full-text index DDL for notifications.message, shared by app.models (create_all) and the
+`notifications full text search` migration so the two can't drift. Plain strings only:
+migrations import this module, so it must not pull in engines or settings.
+"""
+
+from __future__ import annotations
+
+# SQLite: external-content FTS5 table kept in sync by triggers.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE notifications_fts USING fts5("
+    "message, content='notifications', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER notifications_fts_ai AFTER INSERT ON notifications BEGIN "
+    "INSERT INTO notifications_fts(rowid, message) VALUES (new.id, new.message); END",
+    "CREATE TRIGGER notifications_fts_ad AFTER DELETE ON notifications BEGIN "
+    "INSERT INTO notifications_fts(notifications_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); END",
+    "CREATE TRIGGER notifications_fts_au AFTER UPDATE OF message ON notifications BEGIN "
+    "INSERT INTO notifications_fts(notifications_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); "
+    "INSERT INTO notifications_fts(rowid, message) VALUES (new.id, new.message); END",
+)
+# Indexes rows that existed before the FTS table (migrations only).
+SQLITE_FTS_REBUILD = "INSERT INTO notifications_fts(notifications_fts) VALUES ('rebuild')"
+SQLITE_FTS_DROP = (
+    "DROP TRIGGER IF EXISTS notifications_fts_au",
+    "DROP TRIGGER IF EXISTS notifications_fts_ad",
+    "DROP TRIGGER IF EXISTS notifications_fts_ai",
+    "DROP TABLE IF EXISTS notifications_fts",
+)
+
+# Postgres: generated tsvector column with a GIN index.
+POSTGRES_FTS_DDL = (
+    "ALTER TABLE notifications ADD COLUMN message_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', message)) STORED",
+    "CREATE INDEX ix_notifications_message_tsv ON notifications USING gin (message_tsv)",
+)
+POSTGRES_FTS_DROP = (
+    "DROP INDEX IF EXISTS ix_notifications_message_tsv",
+    "ALTER TABLE notifications DROP COLUMN IF EXISTS message_tsv",
+)
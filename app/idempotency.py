@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import TTLCache
+from app.core.settings import get_settings
+from app.observability import metrics
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+# A replayed /token response must not outlive the token it carries.
+TOKEN_PATH = "/token"
+
+metrics.describe(
+    "idempotency_requests_total",
+    "counter",
+    "POST requests carrying an Idempotency-Key, by outcome "
+    "(executed, replayed, coalesced, mismatch).",
+)
+
+# (path, hash of the Authorization header, Idempotency-Key): a key is scoped to the
+# caller, so one client can never be handed another client's response (or token).
+StoreKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: tuple[tuple[bytes, bytes], ...]
+    body: bytes
+
+
+_store: TTLCache[StoreKey, StoredResponse] | None = None
+
+
+def get_idempotency_store() -> TTLCache[StoreKey, StoredResponse]:
+    global _store
+    if _store is None:
+        s = get_settings()
+        _store = TTLCache(
+            "idempotency", maxsize=s.idempotency_store_size, ttl_s=s.idempotency_ttl_s
+        )
+    return _store
+
+
+def clear_idempotency_store() -> None:
+    """Drop the store; the next request rebuilds it from current settings."""
+    global _store
+    _store = None
+
+
+def _collect_store_metrics() -> None:
+    if _store is not None:
+        _store.export_metrics()
+
+
+metrics.register_collector(_collect_store_metrics)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _fingerprint(scope: Scope, headers: Headers, body: bytes) -> str:
+    # Everything that shapes the request besides the path: a reused key with another
+    # query string or body encoding is a different request, not a retry.
+    content_type = headers.get("content-type", "").encode("latin-1")
+    return _digest(b"\0".join((scope.get("query_string", b""), content_type, body)))
+
+
+def _entry_ttl(path: str) -> float:
+    s = get_settings()
+    if path == TOKEN_PATH:
+        return min(s.idempotency_ttl_s, s.jwt_ttl_seconds)
+    return s.idempotency_ttl_s
+
+
+def _storable(status: int) -> bool:
+    # Server errors and throttling are transient: a retry should run again.
+    return status < 500 and status not in (408, 429)
+
+
+def _outcome(outcome: str) -> None:
+    metrics.inc("idempotency_requests_total", labels={"outcome": outcome})
+
+
+async def _replay(stored: StoredResponse, send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": [*stored.headers, (REPLAYED_HEADER, b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+def _mismatch() -> JSONResponse:
+    return JSONResponse(
+        status_code=422,
+        content={"detail": "Idempotency-Key was already used with a different request"},
+    )
+
+
+class IdempotencyMiddleware:
+    """
+    Honors `Idempotency-Key` on POST requests.
+
+    The first request with a key runs normally and its response (status, headers, body)
+    is kept for IDEMPOTENCY_TTL_S in a bounded LRU. Repeats get that response replayed
+    with `Idempotent-Replayed: true`, without running the handler or its background
+    tasks. Requests that arrive while the first is still running wait for it instead
+    of running too. Reusing a key with a different body, query string or Content-Type
+    is a 422. /token responses are kept no longer than JWT_TTL_SECONDS, so a retry is
+    never handed an expired token.
+
+    The store is per process; behind several workers, a retry that lands on another
+    worker runs again (outbox-mode dedup still applies to /notify there).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._inflight: dict[StoreKey, asyncio.Future[StoredResponse | None]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None or get_settings().idempotency_store_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"},
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = _fingerprint(scope, headers, body)
+        store_key = (scope["path"], _digest(headers.get("authorization", "").encode()), key)
+        store = get_idempotency_store()
+
+        while True:
+            stored = store.get(store_key)
+            outcome = "replayed"
+            pending = self._inflight.get(store_key)
+            if stored is None and pending is not None:
+                # shield: a waiter timing out must not cancel the first request's future.
+                stored = await asyncio.shield(pending)
+                outcome = "coalesced"
+                if stored is None:
+                    # The first request failed or wasn't storable; run (or wait) again.
+                    continue
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    _outcome("mismatch")
+                    await _mismatch()(scope, receive, send)
+                    return
+                _outcome(outcome)
+                await _replay(stored, send)
+                return
+            break
+
+        future: asyncio.Future[StoredResponse | None] = asyncio.get_running_loop().create_future()
+        self._inflight[store_key] = future
+        captured: StoredResponse | None = None
+        try:
+            _outcome("executed")
+            captured = await self._run(scope, receive, send, body, fingerprint)
+            if captured is not None:
+                store.set(store_key, captured, ttl_s=_entry_ttl(scope["path"]))
+        finally:
+            del self._inflight[store_key]
+            future.set_result(captured)
+
+    async def _run(
+        self, scope: Scope, receive: Receive, send: Send, body: bytes, fingerprint: str
+    ) -> StoredResponse | None:
+        """Run the app with the buffered body; returns the response if it may be stored."""
+        max_bytes = get_settings().idempotency_max_response_bytes
+        body_sent = False
+        status = 0
+        response_headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        size = 0
+        complete = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, response_headers, size, complete
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= max_bytes:
+                    chunks.append(chunk)
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+        if not complete or size > max_bytes or not _storable(status):
+            return None
+        return StoredResponse(fingerprint, status, tuple(response_headers), b"".join(chunks))
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
@@ -6,6 +6,8 @@ from typing import Any
 
 import httpx
 
+from app.core.deadline import DeadlineExceeded, cap_timeout, deadline_expired
+
 
 @dataclass(frozen=True)
 class ExternalClientConfig:
@@ -22,11 +24,15 @@ class ExternalClient:
         self._cfg = cfg
         self._client = client
 
+    def _timeout(self) -> httpx.Timeout:
+        # Never wait upstream longer than the caller is willing to wait for us.
+        return httpx.Timeout(cap_timeout(self._cfg.timeout_s))
+
     def _build_client(self) -> httpx.AsyncClient:
         # We build a short-lived client only if DI didn't provide one.
         return httpx.AsyncClient(
             base_url=self._cfg.base_url,
-            timeout=httpx.Timeout(self._cfg.timeout_s),
+            timeout=self._timeout(),
         )
 
     async def ping(self) -> dict[str, Any]:
@@ -45,8 +51,10 @@ class ExternalClient:
 
     async def _ping_with(self, client: httpx.AsyncClient) -> dict[str, Any]:
         try:
-            r = await client.get("ping")
+            r = await client.get("ping", timeout=self._timeout())
         except httpx.TimeoutException as e:
+            if deadline_expired():
+                raise DeadlineExceeded("Deadline exceeded") from e
             raise ExternalUpstreamError("External request timed out") from e
         except httpx.HTTPError as e:
             raise ExternalUpstreamError("External request failed") from e
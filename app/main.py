@@ -2,13 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
-from fastapi.middleware.cors import CORSMiddleware
-
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import make_url
+
+from app.core.admission import AdmissionMiddleware
+from app.core import db as db_core
+from app.core.compression import CompressionMiddleware
+from app.core.cors import CachedCORSMiddleware
+from app.core.executors import configure_default_executor, inline
+from app.core.responses import FastJSONResponse
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_response
 from app.core.settings import get_settings
 from app.api.routes import router
+from app.api.notifications import router as notifications_router
 from app.observability import (
     configure_logging,
     get_or_create_request_id,
@@ -17,28 +26,60 @@ from app.observability import (
     request_id_var,
     obs_enabled,
 )
+from app.idempotency import IdempotencyMiddleware
+from app.broadcast import start_hub, stop_hub
+from app.delivery import start_dispatcher, stop_dispatcher
+from app.outbox import check_dedup_dialect, start_outbox_workers, stop_outbox_workers
+from app.retention import start_retention_job, stop_retention_job
+from app.rollups import check_rollup_dialect
+from app.sharding import shard_urls
+from app.write_behind import start_write_behind, stop_write_behind
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Settings are read here (not at import) so env set before startup is honored.
+    s = get_settings()
+    check_dedup_dialect(db_core.engine.dialect.name)
+    shard_dialects = {make_url(url).get_backend_name() for url in shard_urls()}
+    for dialect in {db_core.engine.dialect.name, *shard_dialects}:
+        check_rollup_dialect(dialect)
+    configure_default_executor()
+    await start_hub()
+    if s.notify_write_behind:
+        await start_write_behind()
+    if s.notify_delivery == "async":
+        await start_dispatcher()
+    if s.notify_delivery == "outbox" and s.outbox_in_process:
+        await start_outbox_workers()
+    if s.retention_days > 0 and s.retention_in_process:
+        await start_retention_job()
+    try:
+        yield
+    finally:
+        await stop_retention_job()
+        await stop_outbox_workers()
+        await stop_dispatcher()
+        await stop_write_behind()
+        await stop_hub()
+
 
 settings = get_settings()
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=FastJSONResponse)
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
-allow_origins = []
-if getattr(settings, "cors_allow_origins", ""):
-    allow_origins = [o for o in settings.cors_allow_origins.split(",") if o.strip()]
-    allow_origins = [o.strip() for o in allow_origins]
-
-if allow_origins or getattr(settings, "cors_allow_origin_regex", ""):
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=allow_origins,
-        allow_origin_regex=getattr(settings, "cors_allow_origin_regex", None) or None,
-        allow_credentials=getattr(settings, "cors_allow_credentials", False),
-        allow_methods=[m.strip() for m in settings.cors_allow_methods.split(",")],
-        allow_headers=[h.strip() for h in settings.cors_allow_headers.split(",")],
-        max_age=600,
-    )
+# Inside the deadline, so a request waiting on an in-flight duplicate still gets its 504.
+app.add_middleware(IdempotencyMiddleware)
+# Inside request_id_and_timing, so 504s still get X-Request-ID and show up in metrics.
+app.add_middleware(DeadlineMiddleware)
+# Outside the deadline (queueing here is admission, not handler time); shed 503s still
+# get X-Request-ID and show up in metrics.
+app.add_middleware(AdmissionMiddleware)
+# Outside idempotency, so stored responses are plain and each replay is encoded for its
+# own client's Accept-Encoding.
+app.add_middleware(CompressionMiddleware)
 
 
 @app.middleware("http")
@@ -54,7 +95,7 @@ async def request_id_and_timing(request: Request, call_next):
         status_code = response.status_code
     except Exception:
         # важно: чтобы X-Request-ID был даже на 500
-        response = JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+        response = FastJSONResponse(status_code=500, content={"detail": "Internal Server Error"})
         status_code = 500
     finally:
         duration_s = now() - start
@@ -78,10 +119,35 @@ async def request_id_and_timing(request: Request, call_next):
     return response
 
 
+# Added after request_id_and_timing, so it is the outermost layer: preflights are answered
+# here without touching the app or the request metrics.
+allow_origins = []
+if getattr(settings, "cors_allow_origins", ""):
+    allow_origins = [o for o in settings.cors_allow_origins.split(",") if o.strip()]
+    allow_origins = [o.strip() for o in allow_origins]
+
+if allow_origins or getattr(settings, "cors_allow_origin_regex", ""):
+    app.add_middleware(
+        CachedCORSMiddleware,
+        allow_origins=allow_origins,
+        allow_origin_regex=getattr(settings, "cors_allow_origin_regex", None) or None,
+        allow_credentials=getattr(settings, "cors_allow_credentials", False),
+        allow_methods=[m.strip() for m in settings.cors_allow_methods.split(",")],
+        allow_headers=[h.strip() for h in settings.cors_allow_headers.split(",")],
+        max_age=600,
+        cache_size=settings.cors_cache_size,
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return deadline_exceeded_response()
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):  # pragma: no cover
     # критично: не потерять WWW-Authenticate
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
         headers=exc.headers,
@@ -89,6 +155,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):  # pragm
 
 
 @app.get("/metrics", response_class=PlainTextResponse)
+@inline
 def metrics_endpoint():
     if not obs_enabled():
         raise HTTPException(status_code=404, detail="Metrics disabled")
@@ -111,3 +178,4 @@ async def sleep(seconds: float = 1):
 
 
 app.include_router(router)
+app.include_router(notifications_router)
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy import DDL, BigInteger, DateTime, ForeignKey, Index, Integer, String, event, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from app.fts import POSTGRES_FTS_DDL, SQLITE_FTS_DDL
+
+
+# 64-bit ids (sharded mode uses snowflake ids). SQLite's INTEGER is already 64-bit and
+# only "INTEGER PRIMARY KEY" autoincrements there, so keep that spelling on SQLite.
+BigId = BigInteger().with_variant(Integer, "sqlite")
+
 
 class Base(DeclarativeBase):
     pass
@@ -12,11 +19,75 @@ class Base(DeclarativeBase):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Dedup window for POST /notify (app/dedup.py). Rows written without dedup leave both
+    # columns NULL, and NULLs never collide in a unique index.
+    __table_args__ = (Index("ux_notifications_dedup", "content_hash", "dedup_bucket", unique=True),)
+    # INSERT ... RETURNING created_at, so rollups can bucket a row before commit.
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigId, primary_key=True, autoincrement=True)
     message: Mapped[str] = mapped_column(String(200), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         server_default=func.now(),
+        index=True,
+    )
+    content_hash: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    dedup_bucket: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+
+class NotificationRollup(Base):
+    """
+    Notifications per minute (bucket_start is naive UTC, like created_at).
+
+    Maintained incrementally in the same transaction as inserts/deletes; see app/rollups.py.
+    """
+
+    __tablename__ = "notification_rollups"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Full-text index over notifications.message, outside the ORM model (see app/search.py).
+# Same DDL as the migration (app/fts.py), so create_all() databases (tests, init_db) are
+# searchable too.
+for _statement in SQLITE_FTS_DDL:
+    event.listen(
+        Notification.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+for _statement in POSTGRES_FTS_DDL:
+    event.listen(
+        Notification.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql")
+    )
+
+
+class OutboxMessage(Base):
+    """
+    Pending delivery for a notification, written in the same transaction as the row.
+
+    status: pending -> processing (leased by a worker) -> done | dead.
+    A processing row whose lease expired is claimable again (worker crashed).
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (Index("ix_notification_outbox_status_available", "status", "available_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    notification_id: Mapped[int] = mapped_column(
+        BigId, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False
+    )
+    message: Mapped[str] = mapped_column(String(200), nullable=False)
+    request_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,10 +1,24 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Iterator, Sequence
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Row, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app import broadcast, rollups
+from app.cache import TTLCache
+from app.core.db import READ_REPLICA
+from app.core.settings import DeliveryMode, get_settings
+from app.dedup import get_dedup_cache
 from app.models import Notification
+from app.observability import metrics
+from app.schemas import NotificationMessage
 
+import asyncio
 import logging
 import time
 
@@ -12,23 +26,325 @@ import time
 def create_notification(db: Session, *, message: str) -> Notification:
     obj = Notification(message=message)
     db.add(obj)
+    db.flush()
+    rollups.record(db, [obj.created_at])
     db.commit()
     db.refresh(obj)
+    broadcast.publish([(obj.id, obj.message, obj.created_at)])
     return obj
 
 
+def _as_utc(value: datetime) -> datetime:
+    # created_at is stored as UTC; naive input is taken to be UTC already.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class NotificationRecord(NamedTuple):
+    """Detached, immutable snapshot of a notification row; safe to share across sessions."""
+
+    id: int
+    message: str
+    created_at: datetime
+
+
+# Read paths select these columns straight into NotificationRecord: no ORM instances,
+# no identity-map entries, no attribute instrumentation.
+_RECORD_COLUMNS = (Notification.id, Notification.message, Notification.created_at)
+
+
+def list_notifications_page(
+    db: Session,
+    *,
+    limit: int = 50,
+    before_id: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+) -> tuple[list[NotificationRecord], int | None]:
+    """
+    Keyset page, newest first. Returns (items, before_id for the next page or None).
+
+    `WHERE id < :before_id ORDER BY id DESC LIMIT n` walks the primary key directly,
+    so page 10,000 costs the same as page 1 (OFFSET would scan and discard).
+    """
+    stmt = select(*_RECORD_COLUMNS)
+    if before_id is not None:
+        stmt = stmt.where(Notification.id < before_id)
+    if created_after is not None:
+        stmt = stmt.where(Notification.created_at >= _as_utc(created_after))
+    if created_before is not None:
+        stmt = stmt.where(Notification.created_at < _as_utc(created_before))
+    # One extra row tells us whether another page exists without a COUNT.
+    stmt = stmt.order_by(Notification.id.desc()).limit(limit + 1)
+
+    rows = [NotificationRecord(*row) for row in db.execute(stmt, bind_arguments=READ_REPLICA)]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def iter_notification_rows(
+    db: Session,
+    *,
+    after_id: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[Sequence[Row[tuple[int, str, datetime]]]]:
+    """
+    Stream (id, message, created_at) tuples in id order, one chunk at a time.
+
+    Plain column rows (no ORM instances / identity map) fetched with yield_per,
+    which turns on server-side cursors where the driver has them, so memory stays
+    flat however big the table is. `after_id` resumes from the last id a client saw.
+    """
+    stmt = select(Notification.id, Notification.message, Notification.created_at)
+    if after_id is not None:
+        stmt = stmt.where(Notification.id > after_id)
+    if created_after is not None:
+        stmt = stmt.where(Notification.created_at >= _as_utc(created_after))
+    if created_before is not None:
+        stmt = stmt.where(Notification.created_at < _as_utc(created_before))
+    stmt = stmt.order_by(Notification.id.asc()).execution_options(yield_per=chunk_size)
+
+    yield from db.execute(stmt, bind_arguments=READ_REPLICA).partitions()
+
+
+def list_notifications_after(
+    db: Session, *, after_id: int, limit: int = 500
+) -> list[NotificationRecord]:
+    """
+    Oldest first, strictly after `after_id`: backfill for stream clients resuming
+    from a Last-Event-ID. Reads the primary: a lagging replica would skip rows for good.
+    """
+    stmt = (
+        select(*_RECORD_COLUMNS)
+        .where(Notification.id > after_id)
+        .order_by(Notification.id.asc())
+        .limit(limit)
+    )
+    return [NotificationRecord(*row) for row in db.execute(stmt)]
+
+
+_messages_adapter = TypeAdapter(list[NotificationMessage])
+_message_adapter = TypeAdapter(NotificationMessage)
+
+
+def validate_messages(raw: Sequence[object]) -> tuple[list[str], dict[int, str]]:
+    """
+    Validate a batch; returns (accepted messages, {index: error}).
+
+    Unlike bulk_create_notifications, a bad item only rejects itself. Accepted messages
+    are always the validated values, never the raw input, and errors carry pydantic's
+    message only (not the offending value).
+    """
+    try:
+        return _messages_adapter.validate_python(list(raw)), {}
+    except ValidationError:
+        pass
+    # Some item is bad: one pass per item, so each good one still comes out validated.
+    accepted: list[str] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(raw):
+        try:
+            accepted.append(_message_adapter.validate_python(item))
+        except ValidationError as exc:
+            errors[index] = exc.errors()[0]["msg"]
+    return accepted, errors
+
+
+def bulk_create_notifications(
+    db: Session, messages: Sequence[str], *, batch_size: int = 1000
+) -> list[int]:
+    """
+    Insert many notifications, committing once per batch; returns ids in input order.
+
+    A Core INSERT ... RETURNING executed as executemany (SQLAlchemy's insertmanyvalues),
+    so there are no per-object flushes and no refresh SELECT per row.
+    Everything is validated up front: a bad message rejects the whole call
+    (pydantic ValidationError, a ValueError) before any row is written.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    checked = _messages_adapter.validate_python(list(messages))
+
+    stmt = insert(Notification).returning(
+        Notification.id, Notification.created_at, sort_by_parameter_order=True
+    )
+    ids: list[int] = []
+    for start in range(0, len(checked), batch_size):
+        batch = checked[start : start + batch_size]
+        rows = db.execute(stmt, [{"message": m} for m in batch]).all()
+        ids.extend(row.id for row in rows)
+        rollups.record(db, (row.created_at for row in rows))
+        db.commit()
+        broadcast.publish([(row.id, m, row.created_at) for row, m in zip(rows, batch)])
+    return ids
+
+
 def get_notification(db: Session, notification_id: int) -> Notification | None:
-    return db.get(Notification, notification_id)
+    return db.get(Notification, notification_id, bind_arguments=READ_REPLICA)
+
+
+_notification_cache: TTLCache[int, NotificationRecord] | None = None
+
+
+def get_notification_cache() -> TTLCache[int, NotificationRecord]:
+    global _notification_cache
+    if _notification_cache is None:
+        s = get_settings()
+        _notification_cache = TTLCache(
+            "notification",
+            maxsize=s.notification_cache_size,
+            ttl_s=s.notification_cache_ttl_s,
+        )
+    return _notification_cache
+
+
+def clear_notification_cache() -> None:
+    """Drop the cache; the next lookup rebuilds it from current settings."""
+    global _notification_cache
+    _notification_cache = None
+
+
+def get_notification_cached(db: Session, notification_id: int) -> NotificationRecord | None:
+    """
+    Read-through lookup by id. Misses are not cached, so a row is cached
+    only once it exists; updates/deletes below invalidate it. A fill whose read
+    started before such an invalidation is dropped rather than caching the old row.
+
+    Fills read the primary: a lagging replica could return the row as it was before
+    an update, and the cache would keep serving it for the whole TTL. With the cache
+    disabled, the lookup is a plain replica read.
+    """
+    cache = get_notification_cache()
+    stmt = select(*_RECORD_COLUMNS).where(Notification.id == notification_id)
+    if not cache.enabled:
+        row = db.execute(stmt, bind_arguments=READ_REPLICA).first()
+        return None if row is None else NotificationRecord(*row)
+
+    record = cache.get(notification_id)
+    if record is not None:
+        return record
+
+    generation = cache.generation()
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    record = NotificationRecord(*row)
+    cache.set(notification_id, record, generation=generation)
+    return record
+
+
+def update_notification(db: Session, notification_id: int, *, message: str) -> Notification | None:
+    obj = db.get(Notification, notification_id)
+    if obj is None:
+        return None
+    # The dedup key hashed the old text: drop it rather than keep deduplicating against a
+    # row that no longer has that content (a new key could collide in its window).
+    dedup_key = None
+    if obj.content_hash is not None and obj.dedup_bucket is not None:
+        dedup_key = (obj.content_hash, obj.dedup_bucket)
+    obj.message = message
+    obj.content_hash = obj.dedup_bucket = None
+    db.commit()
+    get_notification_cache().invalidate(notification_id)
+    if dedup_key is not None:
+        get_dedup_cache().invalidate(dedup_key)
+    db.refresh(obj)
+    return obj
+
+
+def delete_notification(db: Session, notification_id: int) -> bool:
+    obj = db.get(Notification, notification_id)
+    if obj is None:
+        return False
+    db.delete(obj)
+    rollups.record(db, [obj.created_at], sign=-1)
+    db.commit()
+    get_notification_cache().invalidate(notification_id)
+    if obj.content_hash is not None and obj.dedup_bucket is not None:
+        get_dedup_cache().invalidate((obj.content_hash, obj.dedup_bucket))
+    return True
 
 
 def list_notifications(db: Session, *, limit: int = 50, offset: int = 0) -> list[Notification]:
     stmt = select(Notification).order_by(Notification.id.desc()).limit(limit).offset(offset)
-    return list(db.execute(stmt).scalars().all())
+    return list(db.execute(stmt, bind_arguments=READ_REPLICA).scalars().all())
+
+
+def list_notification_records(
+    db: Session, *, limit: int = 50, offset: int = 0
+) -> list[NotificationRecord]:
+    """list_notifications for read-only callers: compact tuples instead of ORM objects."""
+    stmt = select(*_RECORD_COLUMNS).order_by(Notification.id.desc()).limit(limit).offset(offset)
+    return [NotificationRecord(*row) for row in db.execute(stmt, bind_arguments=READ_REPLICA)]
+
+
+async def create_notification_async(db: AsyncSession, *, message: str) -> Notification:
+    obj = Notification(message=message)
+    db.add(obj)
+    await db.flush()
+    await rollups.record_async(db, [obj.created_at])
+    await db.commit()
+    await db.refresh(obj)
+    broadcast.publish([(obj.id, obj.message, obj.created_at)])
+    return obj
+
+
+async def get_notification_async(db: AsyncSession, notification_id: int) -> Notification | None:
+    return await db.get(Notification, notification_id)
+
+
+async def list_notifications_async(
+    db: AsyncSession, *, limit: int = 50, offset: int = 0
+) -> list[Notification]:
+    stmt = select(Notification).order_by(Notification.id.desc()).limit(limit).offset(offset)
+    return list((await db.execute(stmt)).scalars().all())
 
 
 logger = logging.getLogger(__name__)
 
 
+def _collect_cache_metrics() -> None:
+    if _notification_cache is not None:
+        _notification_cache.export_metrics()
+
+
+metrics.register_collector(_collect_cache_metrics)
+
+
+def get_delivery_mode() -> DeliveryMode:
+    """NOTIFY_DELIVERY, already validated and lowercased by Settings."""
+    return get_settings().notify_delivery
+
+
+def send_notification(message: str, request_id: str | None) -> None:
+    """
+    Delivery simulation. Raises on failure so retrying callers (the outbox) can back off.
+    """
+    # Simulate some work.
+    time.sleep(0.01)
+    logger.info("delivered notification request_id=%s message=%r", request_id or "-", message)
+
+
+async def send_notification_async(message: str, request_id: str | None) -> None:
+    """Async delivery simulation: waits on the event loop instead of holding a thread."""
+    # Simulate some work.
+    await asyncio.sleep(0.01)
+    logger.info("delivered notification request_id=%s message=%r", request_id or "-", message)
+
+
+async def deliver_notification_async(message: str, request_id: str | None) -> None:
+    """Async counterpart of deliver_notification; must never raise either."""
+    try:
+        await send_notification_async(message, request_id)
+    except Exception:
+        logger.exception("background delivery failed request_id=%s", request_id or "-")
+
+
 def deliver_notification(message: str, request_id: str | None) -> None:
     """
     Background delivery simulation.
@@ -36,8 +352,18 @@ def deliver_notification(message: str, request_id: str | None) -> None:
     Must never raise (background task should not crash request lifecycle/tests).
     """
     try:
-        # Simulate some work.
-        time.sleep(0.01)
-        logger.info("delivered notification request_id=%s message=%r", request_id or "-", message)
+        send_notification(message, request_id)
     except Exception:
         logger.exception("background delivery failed request_id=%s", request_id or "-")
+
+
+def deliver_notification_batch(messages: Sequence[str], request_id: str | None) -> None:
+    """One background task for a whole /notify/batch request; must never raise."""
+    for message in messages:
+        deliver_notification(message, request_id)
+
+
+async def deliver_notification_batch_async(messages: Sequence[str], request_id: str | None) -> None:
+    """Async counterpart of deliver_notification_batch; must never raise either."""
+    for message in messages:
+        await deliver_notification_async(message, request_id)
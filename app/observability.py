@@ -7,7 +7,9 @@ import sys
 import threading
 import time
 import uuid
+from bisect import bisect_left
 from collections import defaultdict
+from collections.abc import Callable
 
 request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
@@ -51,6 +53,22 @@ def configure_logging() -> None:
     _logging_configured = True
 
 
+DEFAULT_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, str] | None) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join('%s="%s"' % (k, v) for k, v in pairs) + "}"
+
+
 class Metrics:
     def __init__(self) -> None:
         self._lock = threading.Lock()
@@ -58,6 +76,54 @@ class Metrics:
         self._duration_sum: dict[tuple[str, str], float] = defaultdict(float)
         self._duration_count: dict[tuple[str, str], int] = defaultdict(int)
 
+        # Generic series used by components (pools, queues, caches...).
+        # name -> (kind, help, buckets); kind is counter|gauge|histogram.
+        self._meta: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._values: dict[tuple[str, LabelKey], float] = defaultdict(float)
+        # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+        self._histograms: dict[tuple[str, LabelKey], list[float]] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def describe(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        with self._lock:
+            self._meta[name] = (kind, help_text, buckets)
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """Callback run before rendering, e.g. to refresh gauges from live objects."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def inc(self, name: str, value: float = 1.0, labels: dict[str, str] | None = None) -> None:
+        if not obs_enabled():
+            return
+        with self._lock:
+            self._values[(name, _label_key(labels))] += value
+
+    def set_gauge(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        if not obs_enabled():
+            return
+        with self._lock:
+            self._values[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        if not obs_enabled():
+            return
+        with self._lock:
+            buckets = self._meta.get(name, ("histogram", "", DEFAULT_BUCKETS))[2]
+            key = (name, _label_key(labels))
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0.0] * (len(buckets) + 2)
+            hist[bisect_left(buckets, value)] += 1
+            hist[-1] += value
+
     def record(self, *, method: str, path: str, status: int, duration_s: float) -> None:
         if not obs_enabled():
             return
@@ -70,10 +136,18 @@ class Metrics:
             self._duration_count[duration_key] += 1
 
     def render_prometheus(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector()
+
         with self._lock:
             request_counts = dict(self._request_counts)
             duration_sum = dict(self._duration_sum)
             duration_count = dict(self._duration_count)
+            meta = dict(self._meta)
+            values = dict(self._values)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
 
         lines = [
             "# HELP http_requests_total Total HTTP requests.",
@@ -109,8 +183,40 @@ class Metrics:
                 % (method, path, value)
             )
 
+        lines.extend(self._render_generic(meta, values, histograms))
+
         return "\n".join(lines) + "\n"
 
+    @staticmethod
+    def _render_generic(
+        meta: dict[str, tuple[str, str, tuple[float, ...]]],
+        values: dict[tuple[str, LabelKey], float],
+        histograms: dict[tuple[str, LabelKey], list[float]],
+    ) -> list[str]:
+        lines: list[str] = []
+        for name in sorted(meta):
+            kind, help_text, buckets = meta[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            if kind != "histogram":
+                for (series, key), value in sorted(values.items()):
+                    if series == name:
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+                continue
+
+            for (series, key), hist in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip((*buckets, "+Inf"), hist[:-1]):
+                    cumulative += count
+                    le = (("le", str(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {hist[-1]}")
+                lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
 
 def get_or_create_request_id(request_id_header: str | None) -> str:
     if request_id_header:
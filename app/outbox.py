@@ -0,0 +1,483 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import random
+import signal
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import broadcast, rollups
+from app.core.executors import run_in_executor
+from app.core.settings import get_settings
+from app.dedup import DedupKey, get_dedup_cache
+from app.models import Notification, OutboxMessage
+from app.notification import send_notification_async
+from app.observability import configure_logging, metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("outbox_claimed_total", "counter", "Outbox rows claimed by workers.")
+metrics.describe("outbox_delivered_total", "counter", "Outbox rows delivered.")
+metrics.describe("outbox_retried_total", "counter", "Failed deliveries scheduled for retry.")
+metrics.describe("outbox_dead_total", "counter", "Rows that exhausted their attempts.")
+metrics.describe("outbox_queue_depth", "gauge", "Outbox rows waiting for delivery.")
+metrics.describe("outbox_lag_seconds", "gauge", "Age of the oldest undelivered outbox row.")
+metrics.describe("outbox_delivery_seconds", "histogram", "Time to deliver one outbox row.")
+
+_LAST_ERROR_MAX = 500
+# Rows still owed a delivery; done and dead rows are finished.
+LIVE_STATUSES = ("pending", "processing")
+FINISHED_STATUSES = ("done", "dead")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class ClaimedMessage:
+    id: int
+    message: str
+    request_id: str | None
+    attempts: int
+
+
+def enqueue_notification(db: Session, *, message: str, request_id: str | None) -> Notification:
+    """Write the notification and its outbox row in one transaction."""
+    obj = Notification(message=message)
+    db.add(obj)
+    db.flush()
+    rollups.record(db, [obj.created_at])
+    db.add(
+        OutboxMessage(
+            notification_id=obj.id,
+            message=message,
+            request_id=request_id,
+            status="pending",
+            attempts=0,
+            available_at=_utcnow(),
+        )
+    )
+    # Read before commit expires the instance (no reload SELECT just to publish).
+    event = (obj.id, message, obj.created_at)
+    db.commit()
+    broadcast.publish([event])
+    return obj
+
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def check_dedup_dialect(dialect: str) -> None:
+    """
+    Fail at startup instead of on the first /notify: outbox-mode dedup needs
+    INSERT ... ON CONFLICT, implemented here for SQLite and PostgreSQL only.
+    """
+    s = get_settings()
+    if s.notify_delivery == "outbox" and s.notify_dedup_window_s > 0 and dialect not in _INSERTS:
+        raise RuntimeError(
+            f"NOTIFY_DEDUP_WINDOW_S is not supported on {dialect!r} (SQLite or PostgreSQL only)"
+        )
+
+
+def enqueue_notification_once(
+    db: Session, *, message: str, request_id: str | None, key: DedupKey
+) -> tuple[int, bool]:
+    """
+    enqueue_notification, deduplicated on `key` (see app.dedup); returns (id, duplicate).
+
+    The unique index decides: INSERT ... ON CONFLICT DO NOTHING either writes the row and
+    its outbox entry, or writes nothing and we return the id of the row that holds `key`.
+    """
+    dialect = db.get_bind().dialect.name
+    try:
+        dialect_insert = _INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"Deduplication is not supported on {dialect!r}") from None
+    content_hash, bucket = key
+    stmt = (
+        dialect_insert(Notification)
+        .values(message=message, content_hash=content_hash, dedup_bucket=bucket)
+        .on_conflict_do_nothing(index_elements=["content_hash", "dedup_bucket"])
+        .returning(Notification.id, Notification.created_at)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        original = db.scalar(
+            select(Notification.id).where(
+                Notification.content_hash == content_hash, Notification.dedup_bucket == bucket
+            )
+        )
+        if original is None:
+            # The original was deleted in between; the key is free again.
+            return enqueue_notification_once(db, message=message, request_id=request_id, key=key)
+        metrics.inc("notify_duplicates_total", labels={"source": "db"})
+        get_dedup_cache().set(key, original)
+        return original, True
+
+    rollups.record(db, [row.created_at])
+    db.add(
+        OutboxMessage(
+            notification_id=row.id,
+            message=message,
+            request_id=request_id,
+            status="pending",
+            attempts=0,
+            available_at=_utcnow(),
+        )
+    )
+    db.commit()
+    get_dedup_cache().set(key, row.id)
+    broadcast.publish([(row.id, message, row.created_at)])
+    return row.id, False
+
+
+def enqueue_notifications(
+    db: Session, *, messages: Sequence[str], request_id: str | None
+) -> list[int]:
+    """Batch form of enqueue_notification: all rows and outbox entries in one transaction."""
+    rows = db.execute(
+        insert(Notification).returning(
+            Notification.id, Notification.created_at, sort_by_parameter_order=True
+        ),
+        [{"message": m} for m in messages],
+    ).all()
+    ids = [row.id for row in rows]
+    rollups.record(db, (row.created_at for row in rows))
+    now = _utcnow()
+    db.execute(
+        insert(OutboxMessage),
+        [
+            {
+                "notification_id": notification_id,
+                "message": message,
+                "request_id": request_id,
+                "status": "pending",
+                "attempts": 0,
+                "available_at": now,
+            }
+            for notification_id, message in zip(ids, messages)
+        ],
+    )
+    db.commit()
+    broadcast.publish([(row.id, m, row.created_at) for row, m in zip(rows, messages)])
+    return ids
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(OutboxMessage.status == "pending", OutboxMessage.available_at <= now),
+        # Lease expired: the worker that claimed it died mid-delivery.
+        and_(OutboxMessage.status == "processing", OutboxMessage.locked_until < now),
+    )
+
+
+def claim_batch(db: Session, *, limit: int, lease_s: float) -> list[ClaimedMessage]:
+    """
+    Lease up to `limit` due rows for this worker.
+
+    Postgres: FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint rows.
+    SQLite ignores it; its single writer makes the UPDATE atomic anyway.
+    """
+    now = _utcnow()
+    candidates = (
+        select(OutboxMessage.id)
+        .where(_claimable(now))
+        .order_by(OutboxMessage.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(candidates.scalar_subquery()), _claimable(now))
+        .values(
+            status="processing",
+            locked_until=now + timedelta(seconds=lease_s),
+            attempts=OutboxMessage.attempts + 1,
+        )
+        .returning(
+            OutboxMessage.id,
+            OutboxMessage.message,
+            OutboxMessage.request_id,
+            OutboxMessage.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = [ClaimedMessage(*row) for row in db.execute(stmt).all()]
+    db.commit()
+    claimed.sort(key=lambda m: m.id)
+    return claimed
+
+
+def mark_delivered(db: Session, ids: list[int]) -> None:
+    if not ids:
+        return
+    db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(ids))
+        .values(status="done", delivered_at=_utcnow(), locked_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def backoff_s(attempts: int, *, base_s: float, max_s: float) -> float:
+    """Exponential backoff with jitter, so retries from one burst don't realign."""
+    ceiling = min(max_s, base_s * 2 ** max(attempts - 1, 0))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def mark_failed(
+    db: Session,
+    failures: list[tuple[ClaimedMessage, str]],
+    *,
+    max_attempts: int,
+    base_s: float,
+    max_s: float,
+) -> int:
+    """Reschedule failed rows; returns how many were given up on (status=dead)."""
+    now = _utcnow()
+    dead = 0
+    for msg, error in failures:
+        values: dict[str, object] = {"locked_until": None, "last_error": error[:_LAST_ERROR_MAX]}
+        if msg.attempts >= max_attempts:
+            values["status"] = "dead"
+            dead += 1
+        else:
+            values["status"] = "pending"
+            delay = backoff_s(msg.attempts, base_s=base_s, max_s=max_s)
+            values["available_at"] = now + timedelta(seconds=delay)
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == msg.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return dead
+
+
+def backlog(db: Session) -> tuple[int, float]:
+    """(rows not yet delivered, age in seconds of the oldest one)."""
+    depth, oldest = db.execute(
+        select(func.count(), func.min(OutboxMessage.created_at)).where(
+            OutboxMessage.status.in_(LIVE_STATUSES)
+        )
+    ).one()
+    if oldest is None:
+        return depth, 0.0
+    if oldest.tzinfo is None:
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    return depth, max((_utcnow() - oldest).total_seconds(), 0.0)
+
+
+class OutboxWorkerPool:
+    """
+    Pollers claim batches from the outbox and deliver them with bounded concurrency.
+
+    Async senders run on the event loop; a sync `send` runs on a dedicated executor,
+    never AnyIO's shared threadpool, so a delivery backlog can't starve sync request
+    handlers. `concurrency` caps deliveries in flight across all pollers.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] | None = None,
+        *,
+        workers: int = 2,
+        batch_size: int = 100,
+        concurrency: int = 10,
+        poll_interval_s: float = 0.5,
+        lease_s: float = 30.0,
+        max_attempts: int = 8,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 300.0,
+        send: Callable[[str, str | None], Awaitable[None] | None] = send_notification_async,
+    ) -> None:
+        self._session_factory = session_factory
+        self._workers = workers
+        self._batch_size = batch_size
+        self._poll_interval_s = poll_interval_s
+        self._lease_s = lease_s
+        self._max_attempts = max_attempts
+        self._backoff_base_s = backoff_base_s
+        self._backoff_max_s = backoff_max_s
+        self._send = send
+        self._concurrency = concurrency
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stopping = asyncio.Event()
+
+    @classmethod
+    def from_settings(cls, **overrides: object) -> OutboxWorkerPool:
+        s = get_settings()
+        kwargs: dict[str, object] = {
+            "workers": s.outbox_workers,
+            "batch_size": s.outbox_batch_size,
+            "concurrency": s.outbox_concurrency,
+            "poll_interval_s": s.outbox_poll_interval_s,
+            "lease_s": s.outbox_lease_s,
+            "max_attempts": s.outbox_max_attempts,
+            "backoff_base_s": s.outbox_backoff_base_s,
+            "backoff_max_s": s.outbox_backoff_max_s,
+        }
+        kwargs.update(overrides)
+        return cls(**kwargs)  # type: ignore[arg-type]
+
+    def _factory(self) -> Callable[[], Session]:
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core import db as db_core  # resolved per use so tests can swap it
+
+        return db_core.SessionLocal
+
+    def _db_call(self, fn: Callable[..., object], *args: object, **kwargs: object):
+        def run() -> object:
+            with self._factory()() as db:
+                return fn(db, *args, **kwargs)
+
+        # The "db" executor, so worker DB calls share its pool-sized thread budget.
+        return run_in_executor("db", run)
+
+    def _ensure_runtime(self) -> None:
+        if self._executor is None and not inspect.iscoroutinefunction(self._send):
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._concurrency, thread_name_prefix="outbox-delivery"
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+    async def start(self) -> None:
+        self._ensure_runtime()
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._poll_loop(), name=f"outbox-worker-{i}")
+            for i in range(self._workers)
+        ]
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run_once(self) -> int:
+        """Claim one batch and deliver it. Returns the number of rows claimed."""
+        self._ensure_runtime()
+        claimed: list[ClaimedMessage] = await self._db_call(
+            claim_batch, limit=self._batch_size, lease_s=self._lease_s
+        )
+        if not claimed:
+            return 0
+        metrics.inc("outbox_claimed_total", len(claimed))
+
+        results = await asyncio.gather(*(self._deliver(msg) for msg in claimed))
+        delivered = [msg.id for msg, error in zip(claimed, results) if error is None]
+        failures = [(msg, error) for msg, error in zip(claimed, results) if error is not None]
+
+        await self._db_call(mark_delivered, delivered)
+        if failures:
+            dead = await self._db_call(
+                mark_failed,
+                failures,
+                max_attempts=self._max_attempts,
+                base_s=self._backoff_base_s,
+                max_s=self._backoff_max_s,
+            )
+            metrics.inc("outbox_retried_total", len(failures) - dead)
+            metrics.inc("outbox_dead_total", dead)
+        metrics.inc("outbox_delivered_total", len(delivered))
+        return len(claimed)
+
+    async def _deliver(self, msg: ClaimedMessage) -> str | None:
+        assert self._semaphore is not None
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                if self._executor is None:
+                    await self._send(msg.message, msg.request_id)  # type: ignore[misc]
+                else:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self._send, msg.message, msg.request_id
+                    )
+            except Exception as exc:
+                logger.warning(
+                    "outbox delivery failed id=%s attempt=%s error=%r", msg.id, msg.attempts, exc
+                )
+                return repr(exc)
+            finally:
+                metrics.observe("outbox_delivery_seconds", time.perf_counter() - started)
+        return None
+
+    async def refresh_backlog_metrics(self) -> None:
+        depth, lag_s = await self._db_call(backlog)
+        metrics.set_gauge("outbox_queue_depth", depth)
+        metrics.set_gauge("outbox_lag_seconds", lag_s)
+
+    async def _poll_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once()
+                await self.refresh_backlog_metrics()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # DB hiccup: keep the worker alive; leases make partial work safe to redo.
+                logger.exception("outbox worker iteration failed")
+                claimed = 0
+            if claimed < self._batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self._poll_interval_s)
+                except TimeoutError:
+                    pass
+
+
+_pool: OutboxWorkerPool | None = None
+
+
+async def start_outbox_workers() -> OutboxWorkerPool:
+    global _pool
+    _pool = OutboxWorkerPool.from_settings()
+    await _pool.start()
+    return _pool
+
+
+async def stop_outbox_workers() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+async def _serve() -> None:
+    pool = OutboxWorkerPool.from_settings()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await pool.start()
+    logger.info("outbox workers started")
+    await stop.wait()
+    await pool.stop()
+    logger.info("outbox workers stopped")
+
+
+if __name__ == "__main__":
+    # Separate process entry point: `python -m app.outbox` (set OUTBOX_IN_PROCESS=false on web).
+    configure_logging()
+    asyncio.run(_serve())
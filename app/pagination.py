@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    """Opaque cursor: clients pass it back verbatim and must not parse it."""
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app import rollups
+from app.core import db as db_core
+from app.core.settings import get_settings
+from app.dedup import get_dedup_cache
+from app.export import encode_export
+from app.models import Notification, OutboxMessage
+from app.notification import get_notification_cache
+from app.observability import configure_logging, metrics
+from app.outbox import FINISHED_STATUSES, LIVE_STATUSES
+from app.sharding import get_shard_store
+
+logger = logging.getLogger(__name__)
+
+metrics.describe("retention_rows_archived_total", "counter", "Notifications archived and pruned.")
+metrics.describe(
+    "retention_rows_per_second", "gauge", "Archive+delete throughput of the last retention run."
+)
+metrics.describe("retention_last_run_timestamp", "gauge", "Unix time the last retention run ended.")
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionResult:
+    rows: int
+    seconds: float
+    segment: Path | None
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _segment_path(archive_dir: Path, now: datetime) -> Path:
+    return archive_dir / f"notifications-{now:%Y%m%dT%H%M%S%fZ}.ndjson.gz"
+
+
+def _append_member(path: Path, rows: list) -> None:
+    # Each batch is its own gzip member; concatenated members are still one valid .gz file,
+    # and everything flushed before a crash stays readable.
+    with path.open("ab") as f:
+        for data in encode_export([rows], fmt="ndjson", compress=True):
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def prune_notifications(
+    session_factory: Callable[[], Session],
+    *,
+    older_than: datetime,
+    archive_dir: Path,
+    batch_size: int = 1000,
+    max_rows_per_s: float = 0.0,
+    stop: threading.Event | None = None,
+) -> RetentionResult:
+    """
+    Archive notifications created before `older_than` to a gzip NDJSON segment, then
+    delete them, one short transaction per batch so writers never wait long.
+
+    A batch is on disk (fsynced) before it is deleted; a crash in between means those
+    rows are archived again next run (at-least-once), never lost.
+    Notifications with an outbox row still pending or processing are left for a later
+    run, so retention never cancels a delivery.
+    `max_rows_per_s` > 0 throttles the job by sleeping between batches.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    # created_at is stored as UTC; compare against a naive UTC cutoff.
+    cutoff = older_than.astimezone(timezone.utc).replace(tzinfo=None)
+    started = time.perf_counter()
+    segment: Path | None = None
+    total = 0
+    cache = get_notification_cache()
+    dedup_cache = get_dedup_cache()
+    undelivered = exists().where(
+        OutboxMessage.notification_id == Notification.id,
+        OutboxMessage.status.in_(LIVE_STATUSES),
+    )
+
+    while stop is None or not stop.is_set():
+        with session_factory() as db:
+            rows = db.execute(
+                select(
+                    Notification.id,
+                    Notification.message,
+                    Notification.created_at,
+                    Notification.content_hash,
+                    Notification.dedup_bucket,
+                )
+                .where(Notification.created_at < cutoff, ~undelivered)
+                .order_by(Notification.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            if segment is None:
+                archive_dir.mkdir(parents=True, exist_ok=True)
+                segment = _segment_path(archive_dir, datetime.now(timezone.utc))
+            _append_member(segment, [row[:3] for row in rows])
+
+            ids = [row[0] for row in rows]
+            rollups.record(db, (row[2] for row in rows), sign=-1)
+            # Explicit: SQLite doesn't enforce ON DELETE CASCADE without PRAGMA foreign_keys.
+            db.execute(
+                delete(OutboxMessage).where(
+                    OutboxMessage.notification_id.in_(ids),
+                    OutboxMessage.status.in_(FINISHED_STATUSES),
+                )
+            )
+            db.execute(delete(Notification).where(Notification.id.in_(ids)))
+            db.commit()
+
+        for notification_id in ids:
+            cache.invalidate(notification_id)
+        # A cached dedup key would keep answering with an id that no longer exists.
+        for row in rows:
+            if row.content_hash is not None and row.dedup_bucket is not None:
+                dedup_cache.invalidate((row.content_hash, row.dedup_bucket))
+        total += len(rows)
+        metrics.inc("retention_rows_archived_total", len(rows))
+
+        if max_rows_per_s > 0:
+            ahead_s = total / max_rows_per_s - (time.perf_counter() - started)
+            if ahead_s > 0:
+                if stop is not None:
+                    stop.wait(ahead_s)
+                else:
+                    time.sleep(ahead_s)
+
+    result = RetentionResult(rows=total, seconds=time.perf_counter() - started, segment=segment)
+    metrics.set_gauge("retention_rows_per_second", result.rows_per_s)
+    metrics.set_gauge("retention_last_run_timestamp", time.time())
+    return result
+
+
+def retention_targets() -> list[tuple[str, Callable[[], Session]]]:
+    """
+    (name, session factory) for every database holding notifications: DATABASE_URL,
+    plus each shard when DATABASE_SHARD_URLS is set.
+    """
+    # Looked up per run so tests can swap SessionLocal.
+    targets: list[tuple[str, Callable[[], Session]]] = [("primary", db_core.SessionLocal)]
+    store = get_shard_store()
+    if store is not None:
+        targets += [(f"shard{i}", maker) for i, maker in enumerate(store.session_factories)]
+    return targets
+
+
+def prune_all(
+    *,
+    older_than: datetime,
+    archive_dir: Path,
+    batch_size: int = 1000,
+    max_rows_per_s: float = 0.0,
+    stop: threading.Event | None = None,
+) -> dict[str, RetentionResult]:
+    """
+    prune_notifications over every retention target, one after another.
+    Shard segments go to `archive_dir/<shard name>/`, the primary's to `archive_dir`.
+    """
+    results: dict[str, RetentionResult] = {}
+    for name, session_factory in retention_targets():
+        if stop is not None and stop.is_set():
+            break
+        results[name] = prune_notifications(
+            session_factory,
+            older_than=older_than,
+            archive_dir=archive_dir if name == "primary" else archive_dir / name,
+            batch_size=batch_size,
+            max_rows_per_s=max_rows_per_s,
+            stop=stop,
+        )
+    return results
+
+
+def run_retention(stop: threading.Event | None = None) -> dict[str, RetentionResult]:
+    """One pass with the configured policy (RETENTION_*); results by target name."""
+    s = get_settings()
+    results = prune_all(
+        older_than=datetime.now(timezone.utc) - timedelta(days=s.retention_days),
+        archive_dir=Path(s.retention_archive_dir),
+        batch_size=s.retention_batch_size,
+        max_rows_per_s=s.retention_max_rows_per_s,
+        stop=stop,
+    )
+    for name, result in results.items():
+        logger.info(
+            "retention run target=%s rows=%s seconds=%.3f rows_per_s=%.1f segment=%s",
+            name,
+            result.rows,
+            result.seconds,
+            result.rows_per_s,
+            result.segment or "-",
+        )
+    return results
+
+
+class RetentionJob:
+    """Runs run_retention() every `interval_s` on a worker thread."""
+
+    def __init__(self, *, interval_s: float) -> None:
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="notification-retention")
+
+    async def stop(self) -> None:
+        """Interrupts a run between batches (finished batches stay archived and deleted)."""
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(run_retention, self._stop)
+            except Exception:
+                logger.exception("retention run failed")
+            await asyncio.to_thread(self._stop.wait, self._interval_s)
+
+
+_job: RetentionJob | None = None
+
+
+async def start_retention_job() -> RetentionJob:
+    global _job
+    _job = RetentionJob(interval_s=get_settings().retention_interval_s)
+    _job.start()
+    return _job
+
+
+async def stop_retention_job() -> None:
+    global _job
+    if _job is not None:
+        await _job.stop()
+        _job = None
+
+
+def main(argv: list[str] | None = None) -> None:
+    s = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.retention",
+        description="Archive and prune old notifications once, then exit.",
+    )
+    parser.add_argument("--days", type=float, default=s.retention_days)
+    parser.add_argument("--archive-dir", default=s.retention_archive_dir)
+    parser.add_argument("--batch-size", type=int, default=s.retention_batch_size)
+    parser.add_argument("--max-rows-per-s", type=float, default=s.retention_max_rows_per_s)
+    args = parser.parse_args(argv)
+    if args.days <= 0:
+        parser.error("--days (or RETENTION_DAYS) must be > 0")
+
+    results = prune_all(
+        older_than=datetime.now(timezone.utc) - timedelta(days=args.days),
+        archive_dir=Path(args.archive_dir),
+        batch_size=args.batch_size,
+        max_rows_per_s=args.max_rows_per_s,
+    )
+    for name, result in results.items():
+        print(
+            f"target={name} archived={result.rows} seconds={result.seconds:.3f} "
+            f"rows_per_s={result.rows_per_s:.1f} segment={result.segment or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import db as db_core
+from app.models import Notification, NotificationRollup
+
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Buckets per multi-row upsert; keeps bound parameters well under driver limits.
+_REBUILD_CHUNK = 1000
+
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # The way created_at is stored.
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def bucket_of(created_at: datetime) -> datetime:
+    """Minute bucket (naive UTC) that a row created at `created_at` is counted in."""
+    return _naive_utc(created_at).replace(second=0, microsecond=0)
+
+
+def _deltas(created_ats: Iterable[datetime], sign: int) -> dict[datetime, int]:
+    return {bucket: sign * n for bucket, n in Counter(map(bucket_of, created_ats)).items()}
+
+
+def check_rollup_dialect(dialect: str) -> None:
+    """
+    Fail at startup instead of on every write: rollups are maintained with
+    INSERT ... ON CONFLICT, implemented here for SQLite and PostgreSQL only.
+    """
+    if dialect not in _UPSERTS:
+        raise RuntimeError(
+            f"Notification rollups are not supported on {dialect!r} (SQLite or PostgreSQL only)"
+        )
+
+
+def _bind_bucket(dialect: str, bucket: datetime) -> datetime:
+    # bucket_start is timestamptz on PostgreSQL, where a naive value would be read in the
+    # session's TimeZone; SQLite stores what it is given, naive UTC like created_at.
+    return bucket.replace(tzinfo=timezone.utc) if dialect == "postgresql" else bucket
+
+
+def _upsert(dialect: str, deltas: dict[datetime, int]):
+    try:
+        insert = _UPSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"Rollups are not supported on {dialect!r}") from None
+    stmt = insert(NotificationRollup).values(
+        [
+            {"bucket_start": _bind_bucket(dialect, bucket), "count": n}
+            for bucket, n in deltas.items()
+        ]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[NotificationRollup.bucket_start],
+        set_={"count": NotificationRollup.count + stmt.excluded["count"]},
+    )
+
+
+def record(db: Session, created_ats: Iterable[datetime], *, sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) rows from their minute buckets.
+
+    Call inside the transaction that writes the rows, before commit: the rollup
+    then commits or rolls back together with them.
+    """
+    deltas = _deltas(created_ats, sign)
+    if deltas:
+        db.execute(_upsert(db.get_bind().dialect.name, deltas))
+
+
+async def record_async(db: AsyncSession, created_ats: Iterable[datetime]) -> None:
+    deltas = _deltas(created_ats, 1)
+    if deltas:
+        await db.execute(_upsert(db.get_bind().dialect.name, deltas))
+
+
+def merge_stats(*results: list[tuple[datetime, int]]) -> list[tuple[datetime, int]]:
+    """Sum read_stats() results from several databases (shards)."""
+    total: Counter[datetime] = Counter()
+    for result in results:
+        for bucket, n in result:
+            total[bucket] += n
+    return sorted(total.items())
+
+
+def read_stats(
+    db: Session, *, start: datetime, end: datetime, granularity: str = "hour"
+) -> list[tuple[datetime, int]]:
+    """
+    (bucket_start, count) at `granularity` for minute buckets starting in [start, end);
+    empty buckets are omitted.
+    """
+    step = GRANULARITIES[granularity]
+    dialect = db.get_bind().dialect.name
+    rows = db.execute(
+        select(NotificationRollup.bucket_start, NotificationRollup.count)
+        .where(
+            NotificationRollup.bucket_start >= _bind_bucket(dialect, bucket_of(start)),
+            NotificationRollup.bucket_start < _bind_bucket(dialect, _naive_utc(end)),
+            NotificationRollup.count > 0,
+        )
+        .order_by(NotificationRollup.bucket_start)
+    )
+    epoch = datetime(1970, 1, 1)
+    out: dict[datetime, int] = {}
+    for bucket, n in rows:
+        bucket = bucket_of(bucket)
+        seconds = int((bucket - epoch).total_seconds())
+        key = epoch + timedelta(seconds=seconds - seconds % step)
+        out[key] = out.get(key, 0) + n
+    return list(out.items())
+
+
+def _raw_counts(db: Session) -> Counter[datetime]:
+    counts: Counter[datetime] = Counter()
+    stmt = select(Notification.created_at).execution_options(yield_per=10_000)
+    for (created_at,) in db.execute(stmt):
+        counts[bucket_of(created_at)] += 1
+    return counts
+
+
+def check(db: Session) -> list[tuple[datetime, int, int]]:
+    """Buckets where rollups disagree with raw rows: (bucket, rollup count, raw count)."""
+    raw = _raw_counts(db)
+    rolled = {
+        bucket_of(bucket): n
+        for bucket, n in db.execute(
+            select(NotificationRollup.bucket_start, NotificationRollup.count)
+        )
+        if n
+    }
+    return [
+        (bucket, rolled.get(bucket, 0), raw.get(bucket, 0))
+        for bucket in sorted(raw.keys() | rolled.keys())
+        if rolled.get(bucket, 0) != raw.get(bucket, 0)
+    ]
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute all rollups from raw rows in one transaction; returns the bucket count.
+
+    The rollup table is locked first, so writers that commit meanwhile wait and then
+    apply their own +1 on top of the rebuilt counts instead of being lost.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE notification_rollups IN EXCLUSIVE MODE"))
+    # On SQLite the DELETE takes the database write lock for the same effect.
+    db.execute(delete(NotificationRollup))
+    counts = list(_raw_counts(db).items())
+    dialect = db.get_bind().dialect.name
+    for start in range(0, len(counts), _REBUILD_CHUNK):
+        db.execute(_upsert(dialect, dict(counts[start : start + _REBUILD_CHUNK])))
+    db.commit()
+    return len(counts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.rollups", description="Maintain notification rollups."
+    )
+    parser.add_argument("command", choices=("check", "rebuild"))
+    args = parser.parse_args(argv)
+
+    with db_core.SessionLocal() as db:
+        if args.command == "rebuild":
+            print(f"rebuilt buckets={rebuild(db)}")
+        mismatches = check(db)
+    for bucket, rolled, raw in mismatches:
+        print(f"mismatch bucket={bucket.isoformat()} rollup={rolled} raw={raw}")
+    print(f"checked mismatches={len(mismatches)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
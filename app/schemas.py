@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Annotated, Any
+
+from pydantic import BaseModel, ConfigDict
 from pydantic import Field
 
+# Single source of truth for message limits (matches Notification.message String(200)).
+NotificationMessage = Annotated[str, Field(min_length=1, max_length=200)]
+
 
 class HealthResponse(BaseModel):
     status: str
@@ -21,7 +27,86 @@ class SleepResponse(BaseModel):
 
 
 class NotifyRequest(BaseModel):
-    message: str = Field(min_length=1, max_length=200)
+    message: NotificationMessage
+
+
+class NotifyResponse(BaseModel):
+    ok: bool
+    # Set only when deduplication is on (NOTIFY_DEDUP_WINDOW_S): the stored notification,
+    # which for a duplicate is the original one.
+    id: int | None = None
+    duplicate: bool | None = None
+
+
+class NotifyBatchRequest(BaseModel):
+    # Items are validated one by one in the route so a bad one only rejects itself.
+    messages: list[Any] = Field(min_length=1)
+
+
+class NotifyBatchItem(BaseModel):
+    index: int
+    accepted: bool
+    error: str | None = None
+
+
+class NotifyBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    items: list[NotifyBatchItem]
+
+
+class NotificationCreateResponse(BaseModel):
+    id: int
+
+
+class NotificationOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    message: str
+    created_at: datetime
+
+
+class NotificationPage(BaseModel):
+    items: list[NotificationOut]
+    next_cursor: str | None = None
+
+
+class NotificationSearchHit(BaseModel):
+    id: int
+    message: str
+    created_at: datetime
+    rank: float
+    # HTML-escaped excerpt with matches wrapped in <mark>...</mark>
+    snippet: str
+
+
+class NotificationSearchPage(BaseModel):
+    items: list[NotificationSearchHit]
+    next_cursor: str | None = None
+
+
+class NotificationStatsBucket(BaseModel):
+    bucket_start: datetime
+    count: int
+
+
+class NotificationStats(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    total: int
+    buckets: list[NotificationStatsBucket]
+
+
+class NotificationBulkRequest(BaseModel):
+    # Items are validated in the route, after the 413 size check (all or nothing).
+    messages: list[Any] = Field(min_length=1)
+
+
+class NotificationBulkResponse(BaseModel):
+    count: int
+    ids: list[int]
 
 
 class OkResponse(BaseModel):
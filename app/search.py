@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import html
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import DateTime, Float, Integer, String, column, text
+from sqlalchemy.orm import Session
+
+from app.core.db import READ_REPLICA
+
+# Match markers from the DB; control characters, so html.escape leaves them alone.
+_START, _STOP = "\x02", "\x03"
+_SNIPPET_TOKENS = 12
+
+# Typed result columns, so created_at comes back as a datetime on SQLite too.
+_COLUMNS = (
+    column("id", Integer),
+    column("message", String),
+    column("created_at", DateTime(timezone=True)),
+    column("rank", Float),
+    column("snippet", String),
+)
+
+# Rank and page over the index alone, then build snippets for the page's rows only
+# (re-opening the FTS cursor per row id). The inner alias must not be "rank": that is
+# FTS5's own hidden column, and ordering by it is noticeably slower.
+_SQLITE_SEARCH = text(
+    f"""
+    SELECT n.id, n.message, n.created_at, page.score AS rank,
+           snippet(f.notifications_fts, 0, '{_START}', '{_STOP}', '…', {_SNIPPET_TOKENS}) AS snippet
+    FROM (
+        SELECT rowid AS id, bm25(notifications_fts) AS score
+        FROM notifications_fts
+        WHERE notifications_fts MATCH :match
+          AND (:after_rank IS NULL OR (bm25(notifications_fts), rowid) > (:after_rank, :after_id))
+        ORDER BY score, rowid
+        LIMIT :limit
+    ) AS page
+    JOIN notifications_fts AS f ON f.rowid = page.id AND f.notifications_fts MATCH :match
+    JOIN notifications AS n ON n.id = page.id
+    ORDER BY page.score, page.id
+    """
+).columns(*_COLUMNS)
+
+# rank is negated so that, as with bm25, smaller sorts first on both backends.
+_POSTGRES_SEARCH = text(
+    f"""
+    WITH q AS (SELECT websearch_to_tsquery('simple', :q) AS query),
+    hits AS (
+        SELECT n.id, n.message, n.created_at,
+               -ts_rank_cd(n.message_tsv, q.query)::float8 AS rank,
+               q.query
+        FROM notifications AS n, q
+        WHERE n.message_tsv @@ q.query
+    )
+    SELECT id, message, created_at, rank,
+           ts_headline('simple', message, query,
+                       'StartSel={_START}, StopSel={_STOP}, MaxWords={_SNIPPET_TOKENS}, MinWords=1')
+               AS snippet
+    FROM hits
+    WHERE CAST(:after_rank AS float8) IS NULL OR (rank, id) > (:after_rank, :after_id)
+    ORDER BY rank, id
+    LIMIT :limit
+    """
+).columns(*_COLUMNS)
+
+
+class SearchNotSupported(Exception):
+    """The database has no full-text index this module can query (SQLite/Postgres only)."""
+
+
+class SearchHit(NamedTuple):
+    id: int
+    message: str
+    created_at: datetime
+    rank: float
+    snippet: str
+
+
+def fts5_match(q: str) -> str:
+    """
+    User text -> FTS5 query: every word must match, quoted so that FTS syntax
+    characters (", *, :, -, AND/OR...) in user input are taken literally.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in q.split()]
+    return " ".join(terms)
+
+
+def _highlight(snippet: str) -> str:
+    # Escape the message text, then turn the markers into <mark> tags.
+    return html.escape(snippet).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search_notifications(
+    db: Session,
+    q: str,
+    *,
+    limit: int = 20,
+    after: tuple[float, int] | None = None,
+) -> tuple[list[SearchHit], tuple[float, int] | None]:
+    """
+    Ranked full-text search, best match first. Returns (hits, cursor for the next page).
+
+    The cursor is the (rank, id) of the last hit; the next page continues strictly after
+    it. Ranks depend on corpus statistics, so pages fetched while rows are being written
+    may shift slightly (no duplicates within a stable index, though).
+    """
+    dialect = db.get_bind().dialect.name
+    after_rank, after_id = after if after is not None else (None, None)
+    params = {"limit": limit + 1, "after_rank": after_rank, "after_id": after_id}
+    if dialect == "sqlite":
+        match = fts5_match(q)
+        if not match:
+            return [], None
+        stmt, params = _SQLITE_SEARCH, {**params, "match": match}
+    elif dialect == "postgresql":
+        stmt, params = _POSTGRES_SEARCH, {**params, "q": q}
+    else:
+        raise SearchNotSupported(f"Search is not supported on {dialect!r}")
+
+    rows = db.execute(stmt, params, bind_arguments=READ_REPLICA).all()
+    hits = [
+        SearchHit(row.id, row.message, row.created_at, float(row.rank), _highlight(row.snippet))
+        for row in rows[:limit]
+    ]
+    if len(rows) > limit:
+        return hits, (hits[-1].rank, hits[-1].id)
+    return hits, None
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import broadcast, rollups
+from app.core import db as db_core
+from app.core.pool import register_pool_metrics
+from app.core.settings import get_settings, parse_csv
+from app.models import Notification
+from app.notification import (
+    NotificationRecord,
+    get_notification_cached,
+    iter_notification_rows,
+    list_notifications_page,
+)
+from app.schemas import NotificationMessage
+from app.search import SearchHit, search_notifications
+
+# 2026-01-01T00:00:00Z; ids stay positive 63-bit ints for ~69 years after it.
+_EPOCH_MS = 1767225600000
+_WORKER_BITS = 10
+_SEQUENCE_BITS = 12
+_MAX_WORKER = (1 << _WORKER_BITS) - 1
+_MAX_SEQUENCE = (1 << _SEQUENCE_BITS) - 1
+
+_messages_adapter = TypeAdapter(list[NotificationMessage])
+
+
+class SnowflakeIds:
+    """
+    Time-ordered 63-bit ids: ms since _EPOCH_MS | worker id | per-ms sequence.
+
+    Unique across processes as long as each has its own worker id
+    (SNOWFLAKE_WORKER_ID), and roughly creation-ordered, so keyset
+    pagination by id still means newest first.
+    """
+
+    def __init__(self, worker_id: int = 0) -> None:
+        if not 0 <= worker_id <= _MAX_WORKER:
+            raise ValueError(f"worker_id must be in [0, {_MAX_WORKER}]")
+        self._worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next_id(self) -> int:
+        with self._lock:
+            now = max(time.time_ns() // 1_000_000 - _EPOCH_MS, self._last_ms)  # never backwards
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & _MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 ids in one ms: wait for the next one.
+                    while now <= self._last_ms:
+                        now = time.time_ns() // 1_000_000 - _EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (
+                (now << (_WORKER_BITS + _SEQUENCE_BITS))
+                | (self._worker_id << _SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+def shard_for(key: str | int, shards: int) -> int:
+    """Stable across processes and restarts (unlike hash())."""
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class ShardedNotificationStore:
+    """
+    Notifications spread over N databases.
+
+    A row lives on shard_for(shard_key) where the key defaults to the row's id;
+    callers that place rows by tenant pass the same key to get(). Lists and
+    exports query every shard and merge by id; search merges by (rank, id).
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        *,
+        ids: SnowflakeIds | None = None,
+        session_class: type[Session] = Session,
+    ) -> None:
+        if not engines:
+            raise ValueError("at least one shard is required")
+        self.engines = list(engines)
+        self._ids = ids or SnowflakeIds()
+        self._makers = [
+            sessionmaker(bind=eng, class_=session_class, autoflush=False) for eng in self.engines
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.engines), thread_name_prefix="shard-scatter"
+        )
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    @property
+    def session_factories(self) -> list[sessionmaker[Session]]:
+        """One session factory per shard, in shard order (for per-shard jobs like retention)."""
+        return list(self._makers)
+
+    def dispose(self) -> None:
+        self._executor.shutdown(wait=True)
+        for eng in self.engines:
+            eng.dispose()
+
+    def _shard(self, key: str | int) -> int:
+        return shard_for(key, len(self.engines))
+
+    def _scatter(self, fn: Callable[[Session], Any]) -> list[Any]:
+        def run(maker: sessionmaker[Session]) -> Any:
+            with maker() as db:
+                return fn(db)
+
+        return list(self._executor.map(run, self._makers))
+
+    def create(self, message: str, *, shard_key: str | None = None) -> NotificationRecord:
+        return self.bulk_create([message], shard_key=shard_key)[0]
+
+    def bulk_create(
+        self, messages: Sequence[str], *, shard_key: str | None = None
+    ) -> list[NotificationRecord]:
+        """One INSERT ... RETURNING per shard touched; returns records in input order."""
+        messages = _messages_adapter.validate_python(list(messages))
+        by_shard: dict[int, list[tuple[int, int, str]]] = {}
+        for position, message in enumerate(messages):
+            new_id = self._ids.next_id()
+            shard = self._shard(shard_key if shard_key is not None else new_id)
+            by_shard.setdefault(shard, []).append((position, new_id, message))
+
+        out: list[NotificationRecord | None] = [None] * len(messages)
+        stmt = insert(Notification).returning(
+            Notification.id,
+            Notification.message,
+            Notification.created_at,
+            sort_by_parameter_order=True,
+        )
+        for shard, rows in by_shard.items():
+            with self._makers[shard]() as db:
+                result = db.execute(stmt, [{"id": i, "message": m} for _, i, m in rows])
+                records = [NotificationRecord(*row) for row in result]
+                for (position, _, _), record in zip(rows, records):
+                    out[position] = record
+                rollups.record(db, (r.created_at for r in records))
+                db.commit()
+                broadcast.publish(records)
+        return out  # type: ignore[return-value]
+
+    def get(
+        self, notification_id: int, *, shard_key: str | None = None
+    ) -> NotificationRecord | None:
+        shard = self._shard(shard_key if shard_key is not None else notification_id)
+        with self._makers[shard]() as db:
+            return get_notification_cached(db, notification_id)
+
+    def list_page(
+        self,
+        *,
+        limit: int = 50,
+        before_id: int | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> tuple[list[NotificationRecord], int | None]:
+        """
+        Same contract as list_notifications_page. Every shard returns its own top
+        `limit` rows below the cursor (in parallel); the global top `limit` is among them.
+        """
+        pages = self._scatter(
+            lambda db: list_notifications_page(
+                db,
+                limit=limit,
+                before_id=before_id,
+                created_after=created_after,
+                created_before=created_before,
+            )
+        )
+        has_more = any(next_id is not None for _, next_id in pages)
+        merged = heapq.merge(*(items for items, _ in pages), key=lambda r: -r.id)
+        items = list(itertools.islice(merged, limit + 1))
+        if len(items) > limit or (has_more and len(items) == limit):
+            items = items[:limit]
+            return items, items[-1].id
+        return items, None
+
+    def stats(
+        self, *, start: datetime, end: datetime, granularity: str = "hour"
+    ) -> list[tuple[datetime, int]]:
+        """Rollups are kept per shard; sum them bucket by bucket."""
+        return rollups.merge_stats(
+            *self._scatter(
+                lambda db: rollups.read_stats(db, start=start, end=end, granularity=granularity)
+            )
+        )
+
+    def search(
+        self, q: str, *, limit: int = 20, after: tuple[float, int] | None = None
+    ) -> tuple[list[SearchHit], tuple[float, int] | None]:
+        """
+        Same contract as search_notifications, merged by (rank, id) like list_page.
+        Each shard ranks against its own index statistics, so the merged order is
+        approximate across shards (exact within one).
+        """
+        pages = self._scatter(lambda db: search_notifications(db, q, limit=limit, after=after))
+        has_more = any(next_after is not None for _, next_after in pages)
+        merged = heapq.merge(*(hits for hits, _ in pages), key=lambda h: (h.rank, h.id))
+        hits = list(itertools.islice(merged, limit + 1))
+        if len(hits) > limit or (has_more and len(hits) == limit):
+            hits = hits[:limit]
+            return hits, (hits[-1].rank, hits[-1].id)
+        return hits, None
+
+    def iter_rows(
+        self,
+        *,
+        after_id: int | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[list[Any]]:
+        """Export across shards in global id order; one open cursor per shard, merged lazily."""
+        sessions = [maker() for maker in self._makers]
+        try:
+            streams = [
+                itertools.chain.from_iterable(
+                    iter_notification_rows(
+                        db,
+                        after_id=after_id,
+                        created_after=created_after,
+                        created_before=created_before,
+                        chunk_size=chunk_size,
+                    )
+                )
+                for db in sessions
+            ]
+            merged = heapq.merge(*streams, key=lambda r: r[0])
+            while chunk := list(itertools.islice(merged, chunk_size)):
+                yield chunk
+        finally:
+            for db in sessions:
+                db.close()
+
+
+def shard_urls() -> list[str]:
+    return parse_csv(get_settings().database_shard_urls)
+
+
+@lru_cache(maxsize=1)
+def get_shard_store() -> ShardedNotificationStore | None:
+    """The store when DATABASE_SHARD_URLS is set, else None (single-database mode)."""
+    urls = shard_urls()
+    if not urls:
+        return None
+    engines = []
+    for i, url in enumerate(urls):
+        eng = db_core._make_engine(url)
+        register_pool_metrics(eng, f"shard{i}")
+        engines.append(eng)
+    s = get_settings()
+    return ShardedNotificationStore(
+        engines,
+        ids=SnowflakeIds(s.snowflake_worker_id),
+        session_class=db_core.DeadlineSession,
+    )
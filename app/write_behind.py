@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.executors import run_in_executor
+from app.core.settings import get_settings
+from app.notification import bulk_create_notifications
+from app.observability import metrics
+from app.schemas import NotificationMessage
+
+logger = logging.getLogger(__name__)
+
+metrics.describe(
+    "notify_write_behind_queue_depth", "gauge", "Notifications waiting for a group commit."
+)
+metrics.describe(
+    "notify_write_behind_batch_size",
+    "histogram",
+    "Rows written per group commit.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+metrics.describe(
+    "notify_write_behind_flush_seconds", "histogram", "Time spent writing one group commit."
+)
+
+_message_adapter = TypeAdapter(NotificationMessage)
+
+_Pending = tuple[str, "asyncio.Future[int]"]
+
+
+class NotificationWriteBehind:
+    """
+    Single writer task that turns many concurrent single-row inserts into group commits.
+
+    Callers await submit() and get their row id once the batch holding it is committed.
+    The queue is bounded: when the writer falls behind, submit() waits for room
+    (backpressure) instead of letting memory grow.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] | None = None,
+        *,
+        max_batch: int = 500,
+        max_delay_s: float = 0.005,
+        max_queue: int = 10000,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_delay_s = max_delay_s
+        self._queue: asyncio.Queue[_Pending] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="notify-write-behind")
+
+    async def stop(self) -> None:
+        """Stop accepting rows, flush what is queued, then stop the writer task."""
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, message: str) -> int:
+        if self._closed:
+            raise RuntimeError("write-behind buffer is closed")
+        # Validate here: one bad row must not fail everyone else's batch.
+        message = _message_adapter.validate_python(message)
+
+        future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            flush_at = loop.time() + self._max_delay_s
+            while len(batch) < self._max_batch:
+                timeout = flush_at - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        messages = [message for message, _ in batch]
+        started = time.perf_counter()
+        try:
+            ids = await run_in_executor("db", self._write, messages)
+        except Exception as exc:
+            logger.exception("write-behind flush failed rows=%s", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            metrics.observe("notify_write_behind_flush_seconds", time.perf_counter() - started)
+            metrics.observe("notify_write_behind_batch_size", len(batch))
+
+        for (_, future), notification_id in zip(batch, ids):
+            # A caller that gave up (cancelled) still gets its row written.
+            if not future.done():
+                future.set_result(notification_id)
+
+    def _write(self, messages: list[str]) -> list[int]:
+        factory = self._session_factory
+        if factory is None:
+            from app.core import db as db_core  # resolved per flush so tests can swap it
+
+            factory = db_core.SessionLocal
+        with factory() as db:
+            return bulk_create_notifications(db, messages, batch_size=len(messages))
+
+
+_writer: NotificationWriteBehind | None = None
+
+
+def get_write_behind() -> NotificationWriteBehind | None:
+    """The running buffer, or None when write-behind mode is off."""
+    if _writer is not None and _writer.running:
+        return _writer
+    return None
+
+
+async def start_write_behind() -> NotificationWriteBehind:
+    global _writer
+    s = get_settings()
+    _writer = NotificationWriteBehind(
+        max_batch=s.notify_write_behind_max_batch,
+        max_delay_s=s.notify_write_behind_max_delay_ms / 1000.0,
+        max_queue=s.notify_write_behind_queue_size,
+    )
+    _writer.start()
+    return _writer
+
+
+async def stop_write_behind() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+def _collect_queue_depth() -> None:
+    if _writer is not None:
+        metrics.set_gauge("notify_write_behind_queue_depth", _writer.queue_depth())
+
+
+metrics.register_collector(_collect_queue_depth)
@@ -0,0 +1,110 @@
+"""
+Requests per second on GET /add: the original route vs the fast path.
+
+"before" is the route as it was: a sync handler (threadpool hop), response_model
+validation and serialization, stdlib JSONResponse. "inline" only drops the thread
+hop, isolating the serialization gain. "after" is app.api.routes.add:
+@inline, @trusted and FastJSONResponse (orjson when installed). "full app" is the
+real app with its middleware stack, for scale. Requests are driven straight through
+ASGI, so no HTTP client or server cost is included.
+
+    poetry run python -m benchmarks.bench_add_rps --requests 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.api import routes
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.schemas import ResultResponse
+
+
+def _before() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/add", response_model=ResultResponse)
+    def add(a: int, b: int):
+        return {"result": float(a + b)}
+
+    return app
+
+
+def _inline_only() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/add", response_model=ResultResponse)
+    async def add(a: int, b: int):
+        return {"result": float(a + b)}
+
+    return app
+
+
+def _after() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.get("/add", response_model=ResultResponse)(routes.add)
+    return app
+
+
+async def _rps(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/add",
+        "raw_path": b"/add",
+        "query_string": b"a=2&b=3",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("bench", 1),
+        "server": ("bench", 80),
+    }
+    statuses: list[int] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    for _ in range(min(requests, 500)):  # warm-up
+        await app(dict(scope), receive, send)
+    statuses.clear()
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, set(statuses)
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    from app.main import app as full_app
+
+    json_lib = "orjson" if responses.orjson is not None else "stdlib json"
+    print(f"requests={args.requests} serializer={json_lib}")
+    for label, app in (
+        ("before", _before()),
+        ("inline", _inline_only()),
+        ("after", _after()),
+        ("full app", full_app),
+    ):
+        rps = asyncio.run(_rps(app, args.requests))
+        print(f"{label:>9}: {rps:9.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
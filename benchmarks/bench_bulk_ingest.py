@@ -0,0 +1,66 @@
+"""
+Bulk notification ingest: rows/s against local SQLite for different batch sizes.
+
+The "orm-per-row" line is the create_notification baseline (add + commit + refresh).
+
+    poetry run python -m benchmarks.bench_bulk_ingest --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.notification import bulk_create_notifications, create_notification
+
+
+def _maker(path: Path) -> sessionmaker:
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def bench_orm_per_row(path: Path, rows: int) -> float:
+    maker = _maker(path)
+    started = time.perf_counter()
+    with maker() as db:
+        for i in range(rows):
+            create_notification(db, message=f"row-{i}")
+    return rows / (time.perf_counter() - started)
+
+
+def bench_bulk(path: Path, rows: int, batch_size: int) -> float:
+    maker = _maker(path)
+    messages = [f"row-{i}" for i in range(rows)]
+    started = time.perf_counter()
+    with maker() as db:
+        bulk_create_notifications(db, messages, batch_size=batch_size)
+    return rows / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,10,100,1000,5000")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        rate = bench_orm_per_row(tmp_path / "orm.db", args.baseline_rows)
+        print(f"{'orm-per-row':>14}: {rate:12.1f} rows/s ({args.baseline_rows} rows)")
+
+        for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            rows = args.rows if batch_size >= 100 else min(args.rows, batch_size * 2000)
+            rate = bench_bulk(tmp_path / f"bulk-{batch_size}.db", rows, batch_size)
+            print(f"{'batch=' + str(batch_size):>14}: {rate:12.1f} rows/s ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Response compression: bytes saved vs CPU per encoding and level.
+
+Builds representative bodies (a 100-item notifications page, a streamed NDJSON
+export in 500-row chunks, a /metrics scrape) and runs each through the same
+streaming Compressor the middleware uses, flushing per chunk like a real response.
+
+    poetry run python -m benchmarks.bench_compression --export-rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.compression import Compressor, available_encodings
+from app.export import encode_export, encode_page
+
+_WORDS = "order shipped delayed refund payment invoice user signup reset password alert".split()
+_LEVELS = {"zstd": (1, 3, 9), "br": (1, 4, 9), "gzip": (1, 6, 9)}
+
+
+def _rows(count: int, rng: random.Random) -> list[tuple[int, str, datetime]]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        (i, " ".join(rng.choices(_WORDS, k=rng.randint(3, 12))), start + timedelta(seconds=i))
+        for i in range(1, count + 1)
+    ]
+
+
+def _metrics_text(rng: random.Random) -> bytes:
+    # The app's own registry, with every component's series described.
+    os.environ["OBS_ENABLED"] = "1"
+    metrics = importlib.import_module("app.main").metrics
+    for path in ("/notify", "/notifications", "/notifications/export", "/health", "/add"):
+        for status in (200, 400, 401, 503):
+            metrics.record(method="GET", path=path, status=status, duration_s=rng.random())
+    for name in ("default", "db", "delivery"):
+        for _ in range(50):
+            metrics.observe("executor_wait_seconds", rng.random() / 100, {"executor": name})
+    return metrics.render_prometheus().encode()
+
+
+def _run(chunks: list[bytes], encoding: str, level: int, repeat: int) -> tuple[int, float]:
+    samples, size = [], 0
+    for _ in range(repeat):
+        started = time.process_time()
+        c = Compressor(encoding, level)
+        size = sum(len(c.compress(chunk)) for chunk in chunks[:-1])
+        size += len(c.finish(chunks[-1]))
+        samples.append(time.process_time() - started)
+    return size, statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--export-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rows = _rows(args.export_rows, rng)
+    payloads = {
+        "page": [encode_page(rows[:100], "MTAw")],
+        "export": list(
+            encode_export((rows[i : i + 500] for i in range(0, len(rows), 500)), fmt="ndjson")
+        ),
+        "metrics": [_metrics_text(rng)],
+    }
+
+    print(f"export_rows={args.export_rows} (median CPU of {args.repeat})")
+    print(
+        f"{'payload':>8} {'encoding':>8} {'level':>5} {'in':>10} {'out':>10} {'ratio':>6} {'MB/s':>8}"
+    )
+    for name, chunks in payloads.items():
+        raw = sum(len(c) for c in chunks)
+        for encoding in available_encodings():
+            for level in _LEVELS[encoding]:
+                size, cpu_s = _run(chunks, encoding, level, args.repeat)
+                mbps = raw / cpu_s / 1e6 if cpu_s else float("inf")
+                print(
+                    f"{name:>8} {encoding:>8} {level:>5} {raw:>10} {size:>10} "
+                    f"{raw / size:>6.1f} {mbps:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Sync vs async DB path under concurrent load (local SQLite).
+
+Sync ops go through anyio's threadpool the same way Starlette runs a sync route;
+async ops stay on the event loop with an AsyncSession.
+
+    poetry run python -m benchmarks.bench_db_async --ops 2000 --concurrency 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import anyio.to_thread
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.notification import (
+    create_notification,
+    create_notification_async,
+    get_notification,
+    get_notification_async,
+)
+
+
+async def bench_sync(path: Path, ops: int, concurrency: int) -> float:
+    engine = create_engine(f"sqlite+pysqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    maker = sessionmaker(bind=engine, autoflush=False)
+
+    def one_op(i: int) -> None:
+        with maker() as db:
+            obj = create_notification(db, message=f"sync-{i}")
+            get_notification(db, obj.id)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def worker(i: int) -> None:
+        async with sem:
+            await anyio.to_thread.run_sync(one_op, i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(ops)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return ops / elapsed
+
+
+async def bench_async(path: Path, ops: int, concurrency: int) -> float:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def worker(i: int) -> None:
+        async with sem, maker() as db:
+            obj = await create_notification_async(db, message=f"async-{i}")
+            await get_notification_async(db, obj.id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(ops)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return ops / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_rate = await bench_sync(Path(tmp) / "sync.db", args.ops, args.concurrency)
+        async_rate = await bench_async(Path(tmp) / "async.db", args.ops, args.concurrency)
+
+    print(f"ops={args.ops} concurrency={args.concurrency} (create + get per op)")
+    print(f"sync  (threadpool): {sync_rate:10.1f} ops/s")
+    print(f"async (event loop): {async_rate:10.1f} ops/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Page latency: OFFSET vs keyset cursor, at page 1 and at a deep page.
+
+Seeds a SQLite table (1M rows by default) once, then times fetching one page of
+`--limit` rows at `--deep-page` both ways.
+
+    poetry run python -m benchmarks.bench_keyset_pagination --rows 1000000 --deep-page 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Base, Notification
+from app.notification import (
+    bulk_create_notifications,
+    list_notification_records,
+    list_notifications_page,
+)
+
+
+def _timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'pages.db'}")
+        Base.metadata.create_all(engine)
+        maker = sessionmaker(bind=engine, autoflush=False)
+
+        with maker() as db:
+            bulk_create_notifications(db, (f"row-{i}" for i in range(args.rows)), batch_size=50_000)
+
+        with maker() as db:
+            max_id = db.scalar(select(func.max(Notification.id)))
+            deep_offset = (args.deep_page - 1) * args.limit
+            # The cursor a client would hold after walking to the deep page.
+            deep_before_id = max_id - deep_offset + 1
+
+            def offset_page(db: Session, offset: int):
+                return lambda: list_notification_records(db, limit=args.limit, offset=offset)
+
+            def keyset_page(db: Session, before_id: int | None):
+                return lambda: list_notifications_page(db, limit=args.limit, before_id=before_id)
+
+            rows = [
+                ("offset", 1, _timed(offset_page(db, 0), args.repeat)),
+                ("offset", args.deep_page, _timed(offset_page(db, deep_offset), args.repeat)),
+                ("keyset", 1, _timed(keyset_page(db, None), args.repeat)),
+                ("keyset", args.deep_page, _timed(keyset_page(db, deep_before_id), args.repeat)),
+            ]
+
+    print(f"rows={args.rows} limit={args.limit} (median of {args.repeat})")
+    for kind, page, ms in rows:
+        print(f"{kind:>7} page {page:>6}: {ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Notification reads: ORM instances vs compact NotificationRecord tuples.
+
+Seeds a SQLite table, then for each path measures
+  - memory: tracemalloc peak while materializing `--rows` rows in one list
+  - latency: one `--limit` page fetched and serialized to JSON
+
+    poetry run python -m benchmarks.bench_read_records --rows 100000 --limit 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.export import encode_page
+from app.models import Base
+from app.notification import (
+    bulk_create_notifications,
+    list_notification_records,
+    list_notifications,
+)
+from app.schemas import NotificationOut, NotificationPage
+
+
+def _peak_mib(maker: sessionmaker[Session], load: Callable[[Session], list]) -> float:
+    gc.collect()
+    with maker() as db:
+        tracemalloc.start()
+        rows = load(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del rows
+    return peak / (1024 * 1024)
+
+
+def _timed_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'records.db'}")
+        Base.metadata.create_all(engine)
+        maker = sessionmaker(bind=engine, autoflush=False)
+
+        with maker() as db:
+            bulk_create_notifications(db, (f"row-{i}" for i in range(args.rows)), batch_size=50_000)
+
+        orm_mib = _peak_mib(maker, lambda db: list_notifications(db, limit=args.rows))
+        rec_mib = _peak_mib(maker, lambda db: list_notification_records(db, limit=args.rows))
+
+        def orm_page() -> bytes:
+            # Fresh session per call, like a real request: no warm identity map.
+            with maker() as db:
+                items = list_notifications(db, limit=args.limit)
+                page = NotificationPage(
+                    items=[NotificationOut.model_validate(o) for o in items], next_cursor=None
+                )
+                return page.model_dump_json().encode()
+
+        def record_page() -> bytes:
+            with maker() as db:
+                return encode_page(list_notification_records(db, limit=args.limit), None)
+
+        orm_ms = _timed_ms(orm_page, args.repeat)
+        rec_ms = _timed_ms(record_page, args.repeat)
+        engine.dispose()
+
+    print(f"rows={args.rows} limit={args.limit} (latency: median of {args.repeat})")
+    print(f"{'path':>7} {'peak MiB':>10} {'page ms':>9}")
+    print(f"{'orm':>7} {orm_mib:10.1f} {orm_ms:9.3f}")
+    print(f"{'records':>7} {rec_mib:10.1f} {rec_ms:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
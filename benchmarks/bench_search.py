@@ -0,0 +1,91 @@
+"""
+Search latency: FTS5 index (search_notifications) vs a LIKE '%term%' scan.
+
+Seeds a SQLite table (1M rows by default) with random words, then times one
+`--limit` page for a common, a medium and a rare term both ways. Ranked search
+scores every match, so very common terms cost more than an early-exit LIKE scan.
+
+    poetry run python -m benchmarks.bench_search --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Base, Notification
+from app.notification import bulk_create_notifications
+from app.search import search_notifications
+
+_VOCAB = [f"w{i}" for i in range(5000)]
+
+
+def _timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def _messages(rows: int, rng: random.Random):
+    # Zipf-ish: low-numbered words are common, high-numbered ones rare.
+    weights = [1 / (i + 1) for i in range(len(_VOCAB))]
+    for _ in range(rows):
+        yield " ".join(rng.choices(_VOCAB, weights=weights, k=8))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'search.db'}")
+        Base.metadata.create_all(engine)  # includes the FTS5 table and triggers
+        maker = sessionmaker(bind=engine, autoflush=False)
+
+        with maker() as db:
+            bulk_create_notifications(db, _messages(args.rows, random.Random(0)), batch_size=50_000)
+
+        def fts(db: Session, term: str):
+            return lambda: search_notifications(db, term, limit=args.limit)
+
+        def like(db: Session, term: str):
+            # Whole-word-ish match to be fair to the tokenized index.
+            stmt = (
+                select(Notification.id, Notification.message)
+                .where((" " + Notification.message + " ").like(f"% {term} %"))
+                .order_by(Notification.id.desc())
+                .limit(args.limit)
+            )
+            return lambda: db.execute(stmt).all()
+
+        rows = []
+        with maker() as db:
+            for label, term in (
+                ("common", _VOCAB[0]),
+                ("medium", _VOCAB[50]),
+                ("rare", _VOCAB[-1]),
+            ):
+                rows.append((label, "fts5", _timed(fts(db, term), args.repeat)))
+                rows.append((label, "like", _timed(like(db, term), args.repeat)))
+        engine.dispose()
+
+    print(f"rows={args.rows} limit={args.limit} (median of {args.repeat})")
+    for label, kind, ms in rows:
+        print(f"{label:>7} {kind:>5}: {ms:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,18 @@ import os
 import pytest
 from fastapi.testclient import TestClient
 
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import db as db_mod
+from app.core.admission import reset_limiter
+from app.core.executors import reset_executors
 from app.core.settings import get_settings
+from app.dedup import clear_dedup_cache
+from app.idempotency import clear_idempotency_store
 from app.main import app
 from app.models import Base
+from app.notification import clear_notification_cache
 
 # Keep list explicit so tests are deterministic.
 _ENV_KEYS_TO_CLEAR = [
@@ -21,8 +30,78 @@ _ENV_KEYS_TO_CLEAR = [
     "JWT_TTL_SECONDS",
     "DATABASE_URL",
     "DB_ECHO",
+    "ASYNC_DATABASE_URL",
+    "DATABASE_REPLICA_URLS",
+    "DB_REPLICA_HEALTH_INTERVAL_S",
+    "DB_READ_YOUR_WRITES_S",
+    "DATABASE_SHARD_URLS",
+    "SNOWFLAKE_WORKER_ID",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_TIMEOUT_S",
+    "DB_POOL_RECYCLE_S",
+    "DB_POOL_PRE_PING",
+    "SQLITE_JOURNAL_MODE",
+    "SQLITE_SYNCHRONOUS",
+    "SQLITE_BUSY_TIMEOUT_MS",
+    "SQLITE_CACHE_SIZE_KIB",
+    "SQLITE_MMAP_SIZE",
+    "NOTIFY_BULK_MAX_ITEMS",
+    "NOTIFY_BULK_BATCH_SIZE",
+    "NOTIFY_BATCH_MAX_ITEMS",
+    "NOTIFY_DEDUP_WINDOW_S",
+    "NOTIFY_DEDUP_CACHE_SIZE",
+    "NOTIFY_STREAM_BUFFER",
+    "NOTIFY_STREAM_MAX_SUBSCRIBERS",
+    "NOTIFY_STREAM_PING_S",
+    "ADMISSION_ENABLED",
+    "ADMISSION_INITIAL_LIMIT",
+    "ADMISSION_MIN_LIMIT",
+    "ADMISSION_MAX_LIMIT",
+    "ADMISSION_QUEUE_SIZE",
+    "ADMISSION_QUEUE_TIMEOUT_MS",
+    "ADMISSION_RETRY_AFTER_S",
+    "ADMISSION_BYPASS_PATHS",
+    "EXECUTOR_DEFAULT_THREADS",
+    "EXECUTOR_DB_THREADS",
+    "EXECUTOR_DELIVERY_THREADS",
+    "COMPRESSION_ENABLED",
+    "COMPRESSION_MIN_SIZE",
+    "COMPRESSION_ENCODINGS",
+    "COMPRESSION_ROUTE_LEVELS",
+    "IDEMPOTENCY_STORE_SIZE",
+    "IDEMPOTENCY_TTL_S",
+    "IDEMPOTENCY_MAX_RESPONSE_BYTES",
+    "NOTIFICATION_CACHE_SIZE",
+    "NOTIFICATION_CACHE_TTL_S",
+    "RETENTION_DAYS",
+    "RETENTION_ARCHIVE_DIR",
+    "RETENTION_BATCH_SIZE",
+    "RETENTION_MAX_ROWS_PER_S",
+    "RETENTION_INTERVAL_S",
+    "RETENTION_IN_PROCESS",
+    "NOTIFY_WRITE_BEHIND",
+    "NOTIFY_WRITE_BEHIND_MAX_BATCH",
+    "NOTIFY_WRITE_BEHIND_MAX_DELAY_MS",
+    "NOTIFY_WRITE_BEHIND_QUEUE_SIZE",
+    "NOTIFY_DELIVERY",
+    "NOTIFY_ASYNC_CONCURRENCY",
+    "NOTIFY_ASYNC_QUEUE_SIZE",
+    "NOTIFY_RETRY_AFTER_S",
+    "OUTBOX_IN_PROCESS",
+    "OUTBOX_WORKERS",
+    "OUTBOX_BATCH_SIZE",
+    "OUTBOX_CONCURRENCY",
+    "OUTBOX_POLL_INTERVAL_S",
+    "OUTBOX_LEASE_S",
+    "OUTBOX_MAX_ATTEMPTS",
+    "OUTBOX_BACKOFF_BASE_S",
+    "OUTBOX_BACKOFF_MAX_S",
     "EXTERNAL_BASE_URL",
     "EXTERNAL_TIMEOUT_S",
+    "REQUEST_BUDGET_MS",
+    "REQUEST_BUDGET_BYPASS_PATHS",
+    "REQUEST_ROUTE_BUDGETS",
 ]
 
 
@@ -30,6 +109,12 @@ _ENV_KEYS_TO_CLEAR = [
 def _clear_settings_cache():
     # Tests rely on Settings being cached but resettable between cases.
     get_settings.cache_clear()
+    # The notification caches are process-wide; each test gets its own DB.
+    clear_notification_cache()
+    clear_dedup_cache()
+    clear_idempotency_store()
+    reset_limiter()
+    reset_executors()
 
     # Avoid environment leaking across tests.
     for k in _ENV_KEYS_TO_CLEAR:
@@ -39,6 +124,11 @@ def _clear_settings_cache():
 
     # Defensive cleanup after test as well.
     get_settings.cache_clear()
+    clear_notification_cache()
+    clear_dedup_cache()
+    clear_idempotency_store()
+    reset_limiter()
+    reset_executors()
     for k in _ENV_KEYS_TO_CLEAR:
         os.environ.pop(k, None)
 
@@ -65,3 +155,19 @@ def init_db(db_url: str) -> None:
     from app.core.db import engine
 
     Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture()
+def db_session_factory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # Изолированная БД, подключенная в get_db (и всё, что берёт app.core.db.SessionLocal)
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'app.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, class_=db_mod.DeadlineSession, autoflush=False)
+
+    monkeypatch.setattr(db_mod, "engine", engine)
+    monkeypatch.setattr(db_mod, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db import DeadlineSession, async_database_url
+from app.models import Base
+from app.notification import (
+    create_notification_async,
+    get_notification_async,
+    list_notifications_async,
+)
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite+pysqlite:///./rail_api.db", "sqlite+aiosqlite:///./rail_api.db"),
+        ("sqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+        ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ],
+)
+def test_async_database_url(url: str, expected: str) -> None:
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        async_database_url("mysql+pymysql://u:p@db/app")
+
+
+def test_async_create_get_list(tmp_path: Path) -> None:
+    async def run() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        maker = async_sessionmaker(
+            bind=engine, sync_session_class=DeadlineSession, expire_on_commit=False
+        )
+        try:
+            async with maker() as db:
+                first = await create_notification_async(db, message="one")
+                second = await create_notification_async(db, message="two")
+
+                fetched = await get_notification_async(db, first.id)
+                assert fetched is not None
+                assert fetched.message == "one"
+
+                listed = await list_notifications_async(db, limit=10)
+                assert [n.id for n in listed] == [second.id, first.id]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
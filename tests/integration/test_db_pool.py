@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.core import db as db_mod
+from app.core.pool import InstrumentedQueuePool, register_pool_metrics
+from app.observability import metrics
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def file_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    url = f"sqlite+pysqlite:///{tmp_path / 'pool.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    return url
+
+
+def test_sqlite_pragmas_applied(file_url: str) -> None:
+    engine = db_mod._make_engine()
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -20000
+    finally:
+        engine.dispose()
+
+
+def test_async_engine_applies_pragmas(file_url: str) -> None:
+    async def run() -> str:
+        engine = db_mod._make_async_engine()
+        try:
+            async with engine.connect() as conn:
+                return (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == "wal"
+
+
+def test_invalid_journal_mode_rejected(file_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "wal; DROP TABLE notifications")
+    with pytest.raises(ValueError):
+        db_mod._make_engine()
+
+
+def test_pool_settings_applied(file_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "1")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+
+    engine = db_mod._make_engine()
+    try:
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 1
+        assert engine.pool._pre_ping is True
+    finally:
+        engine.dispose()
+
+
+def test_memory_sqlite_keeps_default_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+    engine = db_mod._make_engine()
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert not isinstance(engine.pool, InstrumentedQueuePool)
+    finally:
+        engine.dispose()
+
+
+def test_pool_metrics_exported(file_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    engine = db_mod._make_engine()
+    register_pool_metrics(engine, "pool-test")
+    try:
+        with engine.connect():
+            body = metrics.render_prometheus()
+            assert 'db_pool_checked_out{pool="pool-test"} 1' in body
+
+        body = metrics.render_prometheus()
+        assert 'db_pool_checked_out{pool="pool-test"} 0' in body
+        assert 'db_pool_checkout_wait_seconds_count{pool="pool-test"}' in body
+        assert "# TYPE db_pool_checkout_wait_seconds histogram" in body
+    finally:
+        engine.dispose()
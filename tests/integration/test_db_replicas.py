@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import db as db_mod
+from app.core.settings import get_settings
+from app.models import Base
+from app.notification import (
+    clear_notification_cache,
+    create_notification,
+    get_notification,
+    get_notification_cached,
+    list_notifications,
+    update_notification,
+)
+
+pytestmark = pytest.mark.integration
+
+
+def _copy(src: Path, dst: Path) -> None:
+    # Online backup, so WAL contents not yet checkpointed are included.
+    with sqlite3.connect(src) as s, sqlite3.connect(dst) as d:
+        s.backup(d)
+
+
+@pytest.fixture()
+def primary(tmp_path: Path):
+    path = tmp_path / "primary.db"
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(engine)
+    yield path, engine
+    engine.dispose()
+
+
+def _factory(primary_engine, replica_paths: list[Path], monkeypatch, *, ryw_s: float = 2.0):
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS", ",".join(f"sqlite+pysqlite:///{p}" for p in replica_paths)
+    )
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_S", str(ryw_s))
+    get_settings.cache_clear()
+    s = get_settings()
+    replicas = db_mod.ReplicaSet.from_settings(s)
+    maker = sessionmaker(
+        bind=primary_engine,
+        class_=db_mod.RoutingSession,
+        autoflush=False,
+        info={"replicas": replicas, "read_your_writes_s": s.db_read_your_writes_s},
+    )
+    return maker, replicas
+
+
+def test_reads_go_to_replica_writes_to_primary(primary, tmp_path: Path, monkeypatch):
+    path, engine = primary
+    replica = tmp_path / "replica.db"
+    _copy(path, replica)  # snapshot before the write: the replica "lags"
+    maker, replicas = _factory(engine, [replica], monkeypatch)
+
+    with maker() as db:
+        created = create_notification(db, message="fresh")
+
+    with maker() as db:
+        assert list_notifications(db) == []
+        assert get_notification(db, created.id) is None
+
+    for eng in replicas.engines:
+        eng.dispose()
+
+
+def test_read_your_writes_within_session(primary, tmp_path: Path, monkeypatch):
+    path, engine = primary
+    replica = tmp_path / "replica.db"
+    _copy(path, replica)
+    maker, replicas = _factory(engine, [replica], monkeypatch)
+
+    with maker() as db:
+        created = create_notification(db, message="mine")
+        assert get_notification(db, created.id) is not None
+        assert [n.id for n in list_notifications(db)] == [created.id]
+
+    maker, replicas = _factory(engine, [replica], monkeypatch, ryw_s=0)
+    with maker() as db:
+        other = create_notification(db, message="not sticky")
+        db.expunge_all()  # force a real read instead of the identity map
+        assert get_notification(db, other.id) is None
+
+    for eng in replicas.engines:
+        eng.dispose()
+
+
+def test_cache_is_filled_from_primary_only(primary, tmp_path: Path, monkeypatch):
+    path, engine = primary
+    with sessionmaker(bind=engine)() as db:
+        created = create_notification(db, message="old").id
+    replica = tmp_path / "replica.db"
+    _copy(path, replica)
+    maker, replicas = _factory(engine, [replica], monkeypatch, ryw_s=0)
+    with maker() as db:
+        update_notification(db, created, message="new")
+
+    with maker() as db:
+        assert get_notification_cached(db, created).message == "new"
+
+    # Without a cache there is nothing to poison: the lookup stays on the replica.
+    monkeypatch.setenv("NOTIFICATION_CACHE_SIZE", "0")
+    get_settings.cache_clear()
+    clear_notification_cache()
+    with maker() as db:
+        assert get_notification_cached(db, created).message == "old"
+
+    for eng in replicas.engines:
+        eng.dispose()
+
+
+def test_round_robin_and_unhealthy_replica_skipped(primary, tmp_path: Path, monkeypatch):
+    path, engine = primary
+    with sessionmaker(bind=engine)() as db:
+        create_notification(db, message="one")
+    first = tmp_path / "r1.db"
+    _copy(path, first)
+    with sessionmaker(bind=engine)() as db:
+        create_notification(db, message="two")
+    second = tmp_path / "r2.db"
+    _copy(path, second)
+    missing = tmp_path / "no-such-dir" / "r3.db"
+
+    maker, replicas = _factory(engine, [first, missing, second], monkeypatch)
+    counts = []
+    for _ in range(4):
+        with maker() as db:
+            counts.append(len(list_notifications(db)))
+    # r3 can't be opened, so reads alternate between r1 (1 row) and r2 (2 rows).
+    assert sorted(counts) == [1, 1, 2, 2]
+
+    for eng in replicas.engines:
+        eng.dispose()
+
+
+def test_all_replicas_down_falls_back_to_primary(primary, tmp_path: Path, monkeypatch):
+    _, engine = primary
+    maker, replicas = _factory(engine, [tmp_path / "gone" / "r.db"], monkeypatch)
+
+    with maker() as db:
+        create_notification(db, message="x")
+    with maker() as db:
+        assert len(list_notifications(db)) == 1
+
+    for eng in replicas.engines:
+        eng.dispose()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import gzip
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Base, Notification
+from app.retention import main as retention_main
+from app.sharding import ShardedNotificationStore, SnowflakeIds, get_shard_store, shard_for
+
+pytestmark = pytest.mark.integration
+
+
+def _shard_urls(tmp_path: Path, n: int) -> list[str]:
+    urls = []
+    for i in range(n):
+        url = f"sqlite+pysqlite:///{tmp_path / f'shard{i}.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        urls.append(url)
+    return urls
+
+
+@pytest.fixture()
+def store(tmp_path: Path):
+    store = ShardedNotificationStore(
+        [create_engine(url) for url in _shard_urls(tmp_path, 3)], ids=SnowflakeIds(7)
+    )
+    yield store
+    store.dispose()
+
+
+def _counts(store: ShardedNotificationStore) -> list[int]:
+    counts = []
+    for engine in store.engines:
+        with Session(engine) as db:
+            counts.append(db.scalar(select(func.count()).select_from(Notification)))
+    return counts
+
+
+def test_snowflake_ids_unique_and_increasing():
+    ids = SnowflakeIds(3)
+    generated = [ids.next_id() for _ in range(10_000)]
+    assert generated == sorted(set(generated))
+    assert all((i >> 12) & 0x3FF == 3 for i in generated)
+    with pytest.raises(ValueError):
+        SnowflakeIds(1024)
+
+
+def test_shard_for_is_stable():
+    assert shard_for(12345, 4) == shard_for(12345, 4)
+    assert {shard_for(i, 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_rows_spread_across_shards_and_found_by_id(store: ShardedNotificationStore):
+    records = store.bulk_create([f"m{i}" for i in range(60)])
+    counts = _counts(store)
+    assert sum(counts) == 60
+    assert all(c > 0 for c in counts)
+
+    for record in records[:10]:
+        assert store.get(record.id) == record
+    assert [r.message for r in records] == [f"m{i}" for i in range(60)]
+
+
+def test_shard_key_keeps_tenant_on_one_shard(store: ShardedNotificationStore):
+    records = store.bulk_create(["a", "b", "c"], shard_key="tenant-1")
+    assert sorted(_counts(store)) == [0, 0, 3]
+    assert store.get(records[0].id, shard_key="tenant-1") == records[0]
+
+
+def test_list_page_merges_shards_newest_first(store: ShardedNotificationStore):
+    ids = [r.id for r in store.bulk_create([f"m{i}" for i in range(25)])]
+
+    seen: list[int] = []
+    before_id = None
+    while True:
+        items, before_id = store.list_page(limit=7, before_id=before_id)
+        seen.extend(r.id for r in items)
+        if before_id is None:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_iter_rows_merges_in_id_order(store: ShardedNotificationStore):
+    ids = [r.id for r in store.bulk_create([f"m{i}" for i in range(25)])]
+
+    chunks = list(store.iter_rows(chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert [row[0] for chunk in chunks for row in chunk] == sorted(ids)
+
+    resumed = [row[0] for chunk in store.iter_rows(after_id=ids[9]) for row in chunk]
+    assert resumed == sorted(ids)[10:]
+
+
+def test_routes_use_shards_when_configured(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("DATABASE_SHARD_URLS", ",".join(_shard_urls(tmp_path, 2)))
+    get_shard_store.cache_clear()
+    try:
+        r = client.post("/notifications/bulk", json={"messages": ["a", "b", "c", "d"]})
+        assert r.status_code == 200
+        ids = r.json()["ids"]
+
+        page = client.get("/notifications", params={"limit": 10}).json()
+        assert [item["id"] for item in page["items"]] == sorted(ids, reverse=True)
+        assert client.get(f"/notifications/{ids[0]}").json()["message"] == "a"
+        hits = client.get("/notifications/search", params={"q": "c"}).json()["items"]
+        assert [hit["id"] for hit in hits] == [ids[2]]
+    finally:
+        store = get_shard_store()
+        if store is not None:
+            store.dispose()
+        get_shard_store.cache_clear()
+
+
+def test_search_pages_across_shards(store: ShardedNotificationStore):
+    records = store.bulk_create([f"alpha {i}" for i in range(25)] + ["beta"] * 5)
+    expected = {r.id for r in records if r.message.startswith("alpha")}
+
+    found: list[int] = []
+    after = None
+    while True:
+        hits, after = store.search("alpha", limit=7, after=after)
+        found.extend(hit.id for hit in hits)
+        if after is None:
+            break
+    assert len(found) == len(set(found)) and set(found) == expected
+
+
+def test_stats_sum_rollups_across_shards(store: ShardedNotificationStore):
+    store.bulk_create([f"m{i}" for i in range(30)])
+    store.create("one more")
+    now = datetime.now(timezone.utc)
+
+    buckets = store.stats(start=now - timedelta(hours=1), end=now + timedelta(hours=1))
+    assert sum(n for _, n in buckets) == 31
+
+
+def test_retention_prunes_every_shard(
+    db_session_factory, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys
+):
+    monkeypatch.setenv("DATABASE_SHARD_URLS", ",".join(_shard_urls(tmp_path, 2)))
+    get_shard_store.cache_clear()
+    try:
+        store = get_shard_store()
+        records = store.bulk_create([f"m{i}" for i in range(20)])
+        for engine in store.engines:
+            with Session(engine) as db:
+                db.execute(update(Notification).values(created_at=datetime(2020, 1, 1)))
+                db.commit()
+        store.create("fresh")
+
+        archive = tmp_path / "archive"
+        retention_main(["--days", "30", "--archive-dir", str(archive)])
+
+        assert sum(_counts(store)) == 1
+        out = capsys.readouterr().out
+        assert "target=primary archived=0" in out
+        archived = 0
+        for name in ("shard0", "shard1"):
+            [segment] = (archive / name).glob("notifications-*.ndjson.gz")
+            archived += len(gzip.decompress(segment.read_bytes()).splitlines())
+            assert f"target={name} archived=" in out
+        assert archived == len(records)
+    finally:
+        store = get_shard_store()
+        if store is not None:
+            store.dispose()
+        get_shard_store.cache_clear()
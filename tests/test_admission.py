@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdaptiveLimiter, AdmissionMiddleware
+from app.core.settings import Settings, parse_csv
+from app.observability import metrics
+
+
+def test_waiter_gets_released_slot_then_queue_sheds():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_queue=1, queue_timeout_s=1)
+        assert await limiter.acquire()
+
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth() == 1
+        # Queue full: shed at once.
+        assert not await limiter.acquire()
+
+        limiter.release("ep", 0.001)
+        assert await waiting
+        assert limiter.in_flight == 1
+        limiter.release("ep", 0.001)
+        assert limiter.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_sheds():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, queue_timeout_s=0.01)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.queue_depth() == 0
+
+    asyncio.run(run())
+
+
+def test_limit_grows_while_fast_and_shrinks_when_latency_inflates():
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, max_limit=20)
+    limiter.in_flight = 10
+    for _ in range(100):
+        limiter._adjust(limiter._latency_inflated("ep", 0.010))
+    grown = limiter.limit
+    assert grown > 10
+
+    for _ in range(2000):
+        limiter._adjust(limiter._latency_inflated("ep", 0.200))
+    assert limiter.limit == 2
+
+    # Other endpoints keep their own floor: a slow one is not compared to a fast one.
+    assert not limiter._latency_inflated("slow-endpoint", 1.0)
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/work")
+    async def work():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/release")
+    async def do_release():
+        release.set()
+        return {}
+
+    app.add_middleware(AdmissionMiddleware)
+    return app
+
+
+def test_overload_sheds_with_retry_after_but_health_answers(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("ADMISSION_INITIAL_LIMIT", "1")
+    monkeypatch.setenv("ADMISSION_MIN_LIMIT", "1")
+    monkeypatch.setenv("ADMISSION_QUEUE_SIZE", "0")
+    monkeypatch.setenv("ADMISSION_BYPASS_PATHS", "/health,/release")
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    app = _app()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            busy = asyncio.create_task(c.get("/work"))
+            await asyncio.sleep(0.05)
+            shed = await c.get("/work")
+            health = await c.get("/health")
+            await c.get("/release")
+            return await busy, shed, health
+
+    busy, shed, health = asyncio.run(run())
+    assert busy.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert health.status_code == 200
+    assert 'admission_shed_total{reason="queue_full"}' in metrics.render_prometheus()
+
+
+def test_limiter_metrics_exported(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    client.get("/add", params={"a": 1, "b": 2})
+    body = client.get("/metrics").text
+    assert "admission_limit 64" in body
+    assert "admission_in_flight 0" in body
+
+
+def test_disabled(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("ADMISSION_ENABLED", "false")
+    monkeypatch.setenv("ADMISSION_INITIAL_LIMIT", "0")
+    assert client.get("/add", params={"a": 1, "b": 2}).status_code == 200
+
+
+def test_paths_without_a_deadline_are_not_admission_limited():
+    # Long-lived responses: a slot held for minutes would starve every other route.
+    s = Settings()
+    assert set(parse_csv(s.request_budget_bypass_paths)) <= set(parse_csv(s.admission_bypass_paths))
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.core.compression import CompressionMiddleware, available_encodings, negotiate, route_level
+from app.core.settings import Settings
+
+OFFERED = ("zstd", "br", "gzip")
+
+
+def _streaming_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/rows")
+    async def rows():
+        async def body():
+            for i in range(3):
+                yield (f'{{"id": {i}, "message": "row {i}"}}\n' * 200).encode()
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+async def _raw_get(app, path: str, accept: str) -> list[dict]:
+    messages: list[dict] = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()  # no disconnect; cancelled once the body is sent
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", accept.encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("gzip, deflate", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip, zstd;q=0.5, br", "br"),
+        ("*", "zstd"),
+        ("gzip;q=0, identity", None),
+        ("deflate", None),
+    ],
+)
+def test_negotiation(accept: str, expected: str | None):
+    assert negotiate(accept, OFFERED) == expected
+
+
+def test_route_levels_match_by_prefix():
+    value = "/notifications=5,/notifications/export=1,/metrics=0"
+    assert route_level("/notifications/export", value) == 1
+    assert route_level("/notifications/42", value) == 5
+    assert route_level("/notifications-old", value) is None
+    assert route_level("/metrics", value) == 0
+
+
+@pytest.mark.parametrize("value", ["/export=fast", "export=1", "/export"])
+def test_malformed_route_levels_fail_at_startup(value: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("COMPRESSION_ROUTE_LEVELS", value)
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_metrics_are_compressed(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    r = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert "# TYPE" in r.text  # decoded transparently by the client
+
+
+def test_small_and_precompressed_bodies_pass_through(client: TestClient, db_session_factory):
+    r = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+
+    r = client.get("/notifications/export?gzip=true", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-type"] == "application/gzip"
+    assert "content-encoding" not in r.headers
+
+
+@pytest.mark.parametrize(
+    ("key", "value"), [("COMPRESSION_ROUTE_LEVELS", "/metrics=0"), ("COMPRESSION_ENABLED", "0")]
+)
+def test_route_level_zero_or_disabled_skips_compression(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, key: str, value: str
+):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    monkeypatch.setenv(key, value)
+    assert "content-encoding" not in client.get("/metrics").headers
+
+
+def test_streaming_body_is_compressed_chunk_by_chunk():
+    messages = asyncio.run(_raw_get(_streaming_app(), "/rows", "gzip"))
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    # Each chunk decodes on arrival: nothing waits for the end of the stream.
+    decoder = zlib.decompressobj(31)
+    decoded = [decoder.decompress(m["body"]) for m in bodies]
+    assert decoded[0].startswith(b'{"id": 0')
+    assert b"".join(decoded).count(b"\n") == 600
+    assert bodies[-1]["more_body"] is False
+    assert sum(len(m["body"]) for m in bodies) < 600 * 10
+
+
+@pytest.mark.parametrize("encoding", [e for e in available_encodings() if e != "gzip"])
+def test_optional_encodings_round_trip(encoding: str):
+    app = _streaming_app()
+    with TestClient(app) as c:
+        r = c.get("/rows", headers={"Accept-Encoding": encoding})
+    assert r.headers["content-encoding"] == encoding
+    assert r.text.count("\n") == 600
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse
+
+from app.core.cors import CachedCORSMiddleware
+from app.observability import metrics
+
+CORS_ARGS = {
+    "allow_origin_regex": r"https://.*\.example\.com",
+    "allow_methods": ["GET", "POST"],
+    "allow_headers": ["Authorization", "Content-Type"],
+}
+PREFLIGHT = {
+    "Origin": "https://app.example.com",
+    "Access-Control-Request-Method": "POST",
+    "Access-Control-Request-Headers": "authorization",
+}
+
+
+class _CountingRegex:
+    def __init__(self, pattern: str) -> None:
+        self._regex = re.compile(pattern)
+        self.calls = 0
+
+    def fullmatch(self, value: str):
+        self.calls += 1
+        return self._regex.fullmatch(value)
+
+
+def _inner():
+    calls: list[str] = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["method"])
+        await PlainTextResponse("inner")(scope, receive, send)
+
+    return app, calls
+
+
+def test_origin_decisions_are_memoized_and_bounded():
+    mw = CachedCORSMiddleware(_inner()[0], cache_size=2, **CORS_ARGS)
+    regex = mw.allow_origin_regex = _CountingRegex(CORS_ARGS["allow_origin_regex"])
+
+    for _ in range(3):
+        assert mw.is_allowed_origin(origin="https://app.example.com")
+        assert not mw.is_allowed_origin(origin="https://evil.test")
+    assert regex.calls == 2
+
+    for i in range(10):
+        mw.is_allowed_origin(origin=f"https://{i}.example.com")
+    assert mw.is_allowed_origin.cache_info().currsize == 2
+
+
+def test_preflight_is_answered_without_the_app(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    inner, calls = _inner()
+    cached = TestClient(CachedCORSMiddleware(inner, **CORS_ARGS))
+    reference = TestClient(CORSMiddleware(inner, **CORS_ARGS))
+
+    for _ in range(2):
+        r = cached.options("/notify", headers=PREFLIGHT)
+        expected = reference.options("/notify", headers=PREFLIGHT)
+        assert (r.status_code, r.text) == (expected.status_code, expected.text) == (200, "OK")
+        assert r.headers == expected.headers
+
+    denied = cached.options("/notify", headers={**PREFLIGHT, "Origin": "https://evil.test"})
+    assert denied.status_code == 400
+    assert "access-control-allow-origin" not in denied.headers
+
+    assert calls == []
+    body = metrics.render_prometheus()
+    assert 'cors_preflight_total{outcome="allowed"} 2' in body
+    assert 'cors_preflight_total{outcome="denied"} 1' in body
+
+
+def test_other_requests_reach_the_app_with_cors_headers():
+    inner, calls = _inner()
+    c = TestClient(CachedCORSMiddleware(inner, **CORS_ARGS))
+
+    r = c.get("/", headers={"Origin": "https://app.example.com"})
+    assert r.text == "inner"
+    assert r.headers["access-control-allow-origin"] == "https://app.example.com"
+    # A plain OPTIONS (no Access-Control-Request-Method) is not a preflight.
+    assert c.options("/", headers={"Origin": "https://app.example.com"}).text == "inner"
+    assert calls == ["GET", "OPTIONS"]
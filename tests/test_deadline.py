@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from pydantic import ValidationError
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from starlette.responses import JSONResponse
+
+import app.api.notifications as notifications_mod
+import app.main as main_mod
+from app.core import db as db_mod
+from app.core.deadline import (
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    cap_timeout,
+    deadline_expired,
+    parse_budget_ms,
+    resolve_budget_s,
+    set_deadline,
+)
+from app.core.settings import Settings, get_settings
+from app.integrations.external_client import ExternalClient, ExternalClientConfig
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("abc", None),
+        ("nan", None),
+        ("-5", 0.0),
+        ("250", 250.0),
+    ],
+)
+def test_parse_budget_ms(value: str | None, expected: float | None):
+    assert parse_budget_ms(value) == expected
+
+
+def test_server_default_caps_client_budget():
+    assert resolve_budget_s("5000", 200) == pytest.approx(0.2)
+    assert resolve_budget_s("100", 200) == pytest.approx(0.1)
+    assert resolve_budget_s(None, 0) is None
+
+
+def test_expired_budget_returns_504_without_running_handler():
+    client = TestClient(main_mod.app)
+    r = client.get("/health", headers={"X-Request-Deadline": "0"})
+    assert r.status_code == 504
+    assert r.json() == {"detail": "Deadline exceeded"}
+    assert r.headers.get("X-Request-ID")
+
+
+def test_slow_handler_cancelled_when_budget_runs_out():
+    client = TestClient(main_mod.app)
+
+    started = time.monotonic()
+    r = client.get("/sleep", params={"seconds": 2}, headers={"X-Request-Deadline": "50"})
+    elapsed = time.monotonic() - started
+
+    assert r.status_code == 504
+    assert elapsed < 1.0
+
+
+def test_default_budget_from_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("REQUEST_BUDGET_MS", "50")
+    client = TestClient(main_mod.app)
+
+    r = client.get("/sleep", params={"seconds": 2})
+    assert r.status_code == 504
+
+
+def test_external_client_timeout_capped_by_deadline():
+    seen: list[dict] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"pong": True})
+
+    async def run() -> None:
+        set_deadline(0.2)
+        http = httpx.AsyncClient(
+            base_url="http://external.test", transport=httpx.MockTransport(handler)
+        )
+        client = ExternalClient(ExternalClientConfig(base_url="http://external.test"), http)
+        async with http:
+            assert await client.ping() == {"pong": True}
+
+    asyncio.run(run())
+    assert 0 < seen[0]["read"] <= 0.2
+
+
+def test_external_client_skips_call_when_budget_spent():
+    async def handler(request: httpx.Request) -> httpx.Response:  # pragma: no cover
+        raise AssertionError("upstream must not be called")
+
+    async def run() -> None:
+        set_deadline(0)
+        http = httpx.AsyncClient(
+            base_url="http://external.test", transport=httpx.MockTransport(handler)
+        )
+        client = ExternalClient(ExternalClientConfig(base_url="http://external.test"), http)
+        async with http:
+            await client.ping()
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+
+def test_cap_timeout_without_deadline_is_noop():
+    assert cap_timeout(3.0) == 3.0
+
+
+def test_sqlite_query_interrupted_by_deadline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+pysqlite:///{tmp_path / 'deadline.db'}")
+    engine = db_mod._make_engine()
+    monkeypatch.setattr(db_mod.SessionLocal, "kw", {**db_mod.SessionLocal.kw, "bind": engine})
+
+    heavy = text(
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+        "SELECT count(*) FROM c"
+    )
+
+    def run() -> None:
+        gen = db_mod.get_db()
+        db = next(gen)
+        token = set_deadline(0.05)
+        try:
+            db.execute(text("SELECT 1"))
+            db.execute(heavy)
+        except Exception as exc:
+            gen.throw(exc)
+        finally:
+            from app.core.deadline import deadline_var
+
+            deadline_var.reset(token)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        run()
+    assert time.monotonic() - started < 2.0
+    engine.dispose()
+
+
+def test_response_in_flight_is_not_cut_by_the_deadline():
+    async def inner(scope, receive, send):
+        await JSONResponse({"ok": True})(scope, receive, send)
+
+    sent: list[dict] = []
+
+    async def slow_client(message):
+        if message["type"] == "http.response.body":
+            await asyncio.sleep(0.1)  # the budget runs out while the body is being written
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "path": "/", "headers": [(b"x-request-deadline", b"50")]}
+    asyncio.run(DeadlineMiddleware(inner)(scope, receive, slow_client))
+    assert [m["type"] for m in sent] == ["http.response.start", "http.response.body"]
+    assert sent[0]["status"] == 200 and sent[1]["body"] == b'{"ok":true}'
+
+
+def test_route_budget_cancels_the_handler(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("REQUEST_ROUTE_BUDGETS", "/sleep=50")
+    client = TestClient(main_mod.app)
+
+    assert client.get("/sleep", params={"seconds": 2}).status_code == 504
+    # Other routes keep the global default (none here); a header can still tighten.
+    assert client.get("/add", params={"a": 1, "b": 2}).status_code == 200
+    monkeypatch.setenv("REQUEST_ROUTE_BUDGETS", "/sleep=5000")
+    get_settings.cache_clear()
+    r = client.get("/sleep", params={"seconds": 2}, headers={"X-Request-Deadline": "50"})
+    assert r.status_code == 504
+
+
+def test_search_has_a_route_budget(monkeypatch: pytest.MonkeyPatch):
+    assert "/notifications/search=" in Settings().request_route_budgets
+
+    monkeypatch.setenv("REQUEST_ROUTE_BUDGETS", "/notifications/search=50")
+
+    def slow_search(*_args, **_kwargs):
+        # Like a DB statement under the deadline guard: runs until the budget is spent.
+        while not deadline_expired():
+            time.sleep(0.005)
+        raise DeadlineExceeded("Deadline exceeded")
+
+    monkeypatch.setattr(notifications_mod, "search_notifications", slow_search)
+    started = time.monotonic()
+    r = TestClient(main_mod.app).get("/notifications/search", params={"q": "x"})
+    assert r.status_code == 504
+    assert time.monotonic() - started < 1.0
+
+
+@pytest.mark.parametrize("value", ["/sleep", "sleep=50", "/sleep=fast"])
+def test_malformed_route_budgets_fail_at_startup(monkeypatch: pytest.MonkeyPatch, value: str):
+    monkeypatch.setenv("REQUEST_ROUTE_BUDGETS", value)
+    with pytest.raises(ValidationError):
+        Settings()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_mod
+from app.delivery import DeliveryDispatcher
+
+
+def test_dispatcher_caps_concurrency():
+    running = 0
+    peak = 0
+    done: list[str] = []
+
+    async def deliver(message: str, request_id: str | None) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(message)
+
+    async def run() -> None:
+        dispatcher = DeliveryDispatcher(concurrency=2, max_pending=100, deliver=deliver)
+        dispatcher.start()
+        for i in range(10):
+            assert dispatcher.try_submit(f"m{i}", None)
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert peak == 2
+    assert sorted(done) == sorted(f"m{i}" for i in range(10))
+
+
+def test_dispatcher_refuses_when_queue_full():
+    async def run() -> None:
+        dispatcher = DeliveryDispatcher(max_pending=1)
+        assert dispatcher.try_submit("a", None)
+        assert not dispatcher.try_submit("b", None)
+
+    asyncio.run(run())
+
+
+def test_notify_async_mode_sheds_with_503(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "async")
+    monkeypatch.setenv("NOTIFY_ASYNC_CONCURRENCY", "1")
+    monkeypatch.setenv("NOTIFY_ASYNC_QUEUE_SIZE", "1")
+
+    async def slow_send(message: str, request_id: str | None) -> None:
+        await asyncio.sleep(0.1)
+
+    import app.notification as notification_mod
+
+    monkeypatch.setattr(notification_mod, "send_notification_async", slow_send)
+
+    with TestClient(main_mod.app) as client:
+        statuses = [client.post("/notify", json={"message": f"m{i}"}) for i in range(6)]
+
+    assert statuses[0].status_code == 200
+    shed = [r for r in statuses if r.status_code == 503]
+    assert shed
+    assert shed[0].headers["retry-after"] == "1"
+    assert shed[0].json() == {"detail": "Delivery queue is full"}
+
+
+def test_notify_async_mode_without_lifespan_uses_loop_task(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "async")
+    calls: list[tuple[str, str | None]] = []
+
+    async def fake_deliver(message: str, request_id: str | None) -> None:
+        calls.append((message, request_id))
+
+    import app.api.routes as routes_mod
+
+    monkeypatch.setattr(routes_mod, "deliver_notification_async", fake_deliver)
+
+    r = client.post("/notify", json={"message": "hello"}, headers={"x-request-id": "rid-9"})
+    assert r.status_code == 200
+    assert calls == [("hello", "rid-9")]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from anyio import to_thread
+from fastapi.testclient import TestClient
+
+import app.api.routes as routes_mod
+import app.main as main_mod
+from app.core.executors import get_executor, reset_executors, run_in_executor
+from app.core.settings import get_settings
+from app.observability import metrics
+from app.outbox import OutboxWorkerPool
+from app.write_behind import NotificationWriteBehind
+
+
+def test_inline_routes_answer_with_the_threadpool_exhausted():
+    async def run():
+        limiter = to_thread.current_default_thread_limiter()
+        limiter.total_tokens = 1
+        holder = object()
+        limiter.acquire_on_behalf_of_nowait(holder)
+        try:
+            transport = httpx.ASGITransport(app=main_mod.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+                return await asyncio.wait_for(c.get("/add", params={"a": 2, "b": 3}), 2)
+        finally:
+            limiter.release_on_behalf_of(holder)
+
+    r = asyncio.run(run())
+    assert r.status_code == 200
+    assert r.json() == {"result": 5.0}
+
+
+def test_executor_caps_concurrency_and_reports_waits(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("EXECUTOR_DB_THREADS", "2")
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def work() -> str:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return threading.current_thread().name
+
+    async def run():
+        return await asyncio.gather(*(run_in_executor("db", work) for _ in range(6)))
+
+    names = asyncio.run(run())
+    assert peak == 2
+    assert threading.main_thread().name not in names
+    body = metrics.render_prometheus()
+    assert 'executor_threads{executor="db"} 2' in body
+    assert 'executor_busy{executor="db"} 0' in body
+    assert 'executor_wait_seconds_count{executor="db"} 6' in body
+
+
+def test_background_delivery_runs_on_delivery_executor(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    delivered: list[str] = []
+    monkeypatch.setattr(routes_mod, "deliver_notification", lambda m, _rid: delivered.append(m))
+
+    assert client.post("/notify", json={"message": "hi"}).status_code == 200
+    assert delivered == ["hi"]
+    assert 'executor_wait_seconds_count{executor="delivery"} 1' in client.get("/metrics").text
+
+
+def test_default_executor_sized_at_startup(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("EXECUTOR_DEFAULT_THREADS", "7")
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    with TestClient(main_mod.app) as c:
+        body = c.get("/metrics").text
+    assert 'executor_threads{executor="default"} 7' in body
+
+
+def test_db_executor_follows_pool_size_unless_set(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "4")
+    assert get_executor("db").total_tokens == 7
+
+    reset_executors()
+    get_settings.cache_clear()
+    monkeypatch.setenv("EXECUTOR_DB_THREADS", "2")
+    assert get_executor("db").total_tokens == 2
+
+
+def test_default_executor_before_lifespan_and_unknown_names(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("EXECUTOR_DEFAULT_THREADS", "9")
+
+    async def default_tokens() -> float:
+        return get_executor("default").total_tokens
+
+    assert asyncio.run(default_tokens()) == 9
+    with pytest.raises(ValueError, match="Unknown executor 'dbb'"):
+        get_executor("dbb")
+
+
+def test_db_work_runs_on_the_db_executor(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    limiters: list[object] = []
+    run_sync = to_thread.run_sync
+
+    async def spy(func, *args, limiter=None, **kwargs):
+        limiters.append(limiter)
+        return await run_sync(func, *args, limiter=limiter, **kwargs)
+
+    monkeypatch.setattr(to_thread, "run_sync", spy)
+
+    assert client.post("/notifications/bulk", json={"messages": ["a b"]}).status_code == 200
+    assert client.get("/notifications").status_code == 200
+    assert client.get("/notifications/1").status_code == 200
+    assert client.get("/notifications/search", params={"q": "a"}).status_code == 200
+    assert client.get("/notifications/stats").status_code == 200
+    db_limiter = get_executor("db")
+    assert limiters and all(limiter is db_limiter for limiter in limiters)
+
+    async def background_writers() -> None:
+        writer = NotificationWriteBehind(db_session_factory)
+        writer.start()
+        try:
+            await writer.submit("c")
+        finally:
+            await writer.stop()
+        await OutboxWorkerPool(db_session_factory, send=lambda *_: None).run_once()
+
+    limiters.clear()
+    asyncio.run(background_writers())
+    assert limiters and all(limiter is get_executor("db") for limiter in limiters)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import app.api.routes as routes_mod
+import app.cache as cache_mod
+from app.idempotency import IdempotencyMiddleware
+from app.observability import metrics
+
+
+def _counting_app() -> tuple[FastAPI, list[str]]:
+    calls: list[str] = []
+    app = FastAPI()
+
+    @app.post("/slow")
+    async def slow(payload: dict):
+        calls.append(payload["v"])
+        await asyncio.sleep(0.05)
+        return {"n": len(calls)}
+
+    @app.post("/flaky")
+    async def flaky():
+        calls.append("flaky")
+        if len(calls) == 1:
+            raise HTTPException(status_code=503, detail="try later")
+        return {"n": len(calls)}
+
+    app.add_middleware(IdempotencyMiddleware)
+    return app, calls
+
+
+def test_notify_repeat_is_replayed_without_new_delivery(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    delivered: list[str] = []
+    monkeypatch.setattr(routes_mod, "deliver_notification", lambda m, _rid: delivered.append(m))
+    headers = {"Idempotency-Key": "k-1"}
+
+    first = client.post("/notify", json={"message": "hello"}, headers=headers)
+    again = client.post("/notify", json={"message": "hello"}, headers=headers)
+
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert delivered == ["hello"]
+
+
+def test_token_replay_is_scoped_to_credentials(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("BASIC_USER", "demo")
+    monkeypatch.setenv("BASIC_PASS", "secret")
+    monkeypatch.setenv("JWT_SECRET", "secret")
+    headers = {"Idempotency-Key": "login-1"}
+
+    ok = client.post("/token", auth=("demo", "secret"), headers=headers)
+    assert ok.status_code == 200
+    assert client.post("/token", auth=("demo", "secret"), headers=headers).json() == ok.json()
+
+    # Same key, other caller: runs on its own and is not handed the token above.
+    assert client.post("/token", auth=("demo", "wrong"), headers=headers).status_code == 401
+
+
+def test_token_replay_does_not_outlive_the_token(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("BASIC_USER", "demo")
+    monkeypatch.setenv("BASIC_PASS", "secret")
+    monkeypatch.setenv("JWT_SECRET", "secret")
+    monkeypatch.setenv("JWT_TTL_SECONDS", "60")
+    headers = {"Idempotency-Key": "login-2"}
+    assert client.post("/token", auth=("demo", "secret"), headers=headers).status_code == 200
+
+    clock = time.monotonic() + 61
+    monkeypatch.setattr(cache_mod, "time", SimpleNamespace(monotonic=lambda: clock))
+    r = client.post("/token", auth=("demo", "secret"), headers=headers)
+    assert r.status_code == 200
+    assert "idempotent-replayed" not in r.headers
+
+
+def test_key_reused_with_other_body_is_422(client: TestClient):
+    headers = {"Idempotency-Key": "k-2"}
+    assert client.post("/notify", json={"message": "a"}, headers=headers).status_code == 200
+    r = client.post("/notify", json={"message": "b"}, headers=headers)
+    assert r.status_code == 422
+
+
+def test_key_reused_with_other_query_is_422(client: TestClient):
+    headers = {"Idempotency-Key": "k-3"}
+    assert client.post("/notify?a=1", json={"message": "a"}, headers=headers).status_code == 200
+    r = client.post("/notify?a=2", json={"message": "a"}, headers=headers)
+    assert r.status_code == 422
+
+
+def test_overlong_key_is_400(client: TestClient):
+    r = client.post("/notify", json={"message": "a"}, headers={"Idempotency-Key": "x" * 256})
+    assert r.status_code == 400
+
+
+def test_disabled_store_runs_every_request(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("IDEMPOTENCY_STORE_SIZE", "0")
+    for _ in range(2):
+        r = client.post("/notify", json={"message": "a"}, headers={"Idempotency-Key": "k"})
+        assert "idempotent-replayed" not in r.headers
+
+
+def test_concurrent_duplicates_wait_for_the_first(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    app, calls = _counting_app()
+
+    async def run() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await asyncio.gather(
+                *(
+                    c.post("/slow", json={"v": "x"}, headers={"Idempotency-Key": "same"})
+                    for _ in range(5)
+                )
+            )
+
+    responses = asyncio.run(run())
+    assert calls == ["x"]
+    assert {r.json()["n"] for r in responses} == {1}
+    body = metrics.render_prometheus()
+    assert 'idempotency_requests_total{outcome="coalesced"} 4' in body
+
+
+def test_server_errors_are_not_stored():
+    app, calls = _counting_app()
+    with TestClient(app) as c:
+        headers = {"Idempotency-Key": "retry-me"}
+        assert c.post("/flaky", headers=headers).status_code == 503
+        assert c.post("/flaky", headers=headers).status_code == 200
+        assert c.post("/flaky", headers=headers).headers["idempotent-replayed"] == "true"
+    assert calls == ["flaky", "flaky"]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import TTLCache
+from app.notification import (
+    create_notification,
+    delete_notification,
+    get_notification_cache,
+    get_notification_cached,
+    update_notification,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache: TTLCache[int, str] = TTLCache("t", maxsize=2, ttl_s=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"  # 2 becomes least recently used
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+
+
+def test_ttl_cache_expires_entries():
+    cache: TTLCache[int, str] = TTLCache("t", maxsize=10, ttl_s=0.01)
+    cache.set(1, "a")
+    time.sleep(0.02)
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_drops_fills_that_raced_an_invalidation():
+    cache: TTLCache[int, str] = TTLCache("t", maxsize=2, ttl_s=60)
+    before = cache.generation()
+    cache.invalidate(1)
+    cache.set(1, "stale", generation=before)
+    cache.set(2, "other key", generation=before)
+    assert cache.get(1) is None
+    assert cache.get(2) == "other key"
+
+    cache.set(1, "fresh", generation=cache.generation())
+    assert cache.get(1) == "fresh"
+
+    # Once the invalidation record is evicted, older fills are dropped for every key.
+    cache.invalidate(3)
+    cache.invalidate(4)
+    cache.set(5, "unsure", generation=before)
+    assert cache.get(5) is None
+
+
+def test_fill_racing_an_update_is_not_cached(db_session_factory):
+    with db_session_factory() as db:
+        notification_id = create_notification(db, message="old").id
+
+    class UpdatedMidRead:
+        def __init__(self, db) -> None:
+            self._db = db
+
+        def execute(self, *args, **kwargs):
+            row = self._db.execute(*args, **kwargs).first()
+            with db_session_factory() as writer:
+                update_notification(writer, notification_id, message="new")
+            return SimpleNamespace(first=lambda: row)
+
+    with db_session_factory() as db:
+        raced = get_notification_cached(UpdatedMidRead(db), notification_id)  # type: ignore[arg-type]
+        assert raced is not None and raced.message == "old"
+        assert get_notification_cache().get(notification_id) is None
+        assert get_notification_cached(db, notification_id).message == "new"
+
+
+def test_cached_lookup_hits_without_db(db_session_factory):
+    with db_session_factory() as db:
+        obj = create_notification(db, message="hello")
+        first = get_notification_cached(db, obj.id)
+
+    class NoDB:
+        def execute(self, *args, **kwargs):
+            raise AssertionError("cache hit must not touch the DB")
+
+    again = get_notification_cached(NoDB(), obj.id)  # type: ignore[arg-type]
+    assert again == first
+    assert again is not None and again.message == "hello"
+    assert get_notification_cache().hit_ratio() == 0.5
+
+
+def test_update_and_delete_invalidate(db_session_factory):
+    with db_session_factory() as db:
+        obj = create_notification(db, message="old")
+        assert get_notification_cached(db, obj.id).message == "old"  # type: ignore[union-attr]
+
+        update_notification(db, obj.id, message="new")
+        assert get_notification_cached(db, obj.id).message == "new"  # type: ignore[union-attr]
+
+        assert delete_notification(db, obj.id)
+        assert get_notification_cached(db, obj.id) is None
+
+
+def test_get_endpoint(client: TestClient, db_session_factory):
+    with db_session_factory() as db:
+        obj = create_notification(db, message="hi")
+
+    r = client.get(f"/notifications/{obj.id}")
+    assert r.status_code == 200
+    assert r.json()["message"] == "hi"
+    assert r.json()["id"] == obj.id
+
+    assert client.get("/notifications/999999").status_code == 404
+
+
+def test_hit_ratio_exported(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    with db_session_factory() as db:
+        obj = create_notification(db, message="hi")
+    client.get(f"/notifications/{obj.id}")
+    client.get(f"/notifications/{obj.id}")
+
+    body = client.get("/metrics").text
+    assert 'cache_hit_ratio{cache="notification"} 0.5' in body
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.models import Notification
+from app.notification import bulk_create_notifications
+
+
+def _count(factory) -> int:
+    with factory() as db:
+        return db.scalar(select(func.count()).select_from(Notification))
+
+
+def test_bulk_endpoint_inserts_and_returns_ids(client: TestClient, db_session_factory):
+    r = client.post("/notifications/bulk", json={"messages": ["a", "b", "c"]})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["count"] == 3
+    assert body["ids"] == sorted(body["ids"])
+
+    with db_session_factory() as db:
+        rows = db.execute(select(Notification.id, Notification.message)).all()
+    assert dict(rows) == dict(zip(body["ids"], ["a", "b", "c"]))
+
+
+@pytest.mark.parametrize("bad", ["", "x" * 201])
+def test_bulk_endpoint_rejects_invalid_message(client: TestClient, db_session_factory, bad: str):
+    r = client.post("/notifications/bulk", json={"messages": ["ok", bad]})
+    assert r.status_code == 422
+    assert [err["loc"] for err in r.json()["detail"]] == [["body", "messages", 1]]
+    assert _count(db_session_factory) == 0
+
+
+def test_bulk_endpoint_enforces_max_items(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_BULK_MAX_ITEMS", "2")
+    r = client.post("/notifications/bulk", json={"messages": ["a", "b", "c"]})
+    assert r.status_code == 413
+    assert _count(db_session_factory) == 0
+    # Counted before any item is validated: invalid items don't turn it into a 422.
+    r = client.post("/notifications/bulk", json={"messages": ["", "", ""]})
+    assert r.status_code == 413
+
+
+def test_bulk_endpoint_requires_auth(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("AUTH_MODE", "basic")
+    monkeypatch.setenv("BASIC_USER", "demo")
+    monkeypatch.setenv("BASIC_PASS", "secret")
+
+    r = client.post("/notifications/bulk", json={"messages": ["a"]})
+    assert r.status_code == 401
+    assert r.headers.get("www-authenticate") == "Basic"
+
+
+def test_bulk_create_batches_preserve_order(db_session_factory):
+    messages = [f"m{i}" for i in range(7)]
+    with db_session_factory() as db:
+        ids = bulk_create_notifications(db, messages, batch_size=3)
+
+    assert len(ids) == 7
+    with db_session_factory() as db:
+        by_id = dict(db.execute(select(Notification.id, Notification.message)).all())
+    assert [by_id[i] for i in ids] == messages
+
+
+def test_bulk_create_validates_before_writing(db_session_factory):
+    with db_session_factory() as db, pytest.raises(ValueError):
+        bulk_create_notifications(db, ["fine", ""], batch_size=1)
+    assert _count(db_session_factory) == 0
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.notifications as notifications_api
+from app.models import Notification
+from app.notification import iter_notification_rows
+
+
+def _seed(factory, messages: list[str]) -> list[int]:
+    with factory() as db:
+        objs = [Notification(message=m) for m in messages]
+        db.add_all(objs)
+        db.commit()
+        return [o.id for o in objs]
+
+
+def test_export_ndjson(client: TestClient, db_session_factory):
+    ids = _seed(db_session_factory, ["a", "b", 'c "quoted"'])
+
+    r = client.get("/notifications/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in lines] == ids
+    assert lines[2]["message"] == 'c "quoted"'
+
+
+def test_export_csv_gzip(client: TestClient, db_session_factory):
+    _seed(db_session_factory, ["a", "b,with comma"])
+
+    r = client.get("/notifications/export", params={"format": "csv", "gzip": True})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/gzip"
+    assert 'filename="notifications.csv.gz"' in r.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(r.content).decode("utf-8"))))
+    assert rows[0] == ["id", "message", "created_at"]
+    assert [row[1] for row in rows[1:]] == ["a", "b,with comma"]
+
+
+def test_export_resume_after_id(client: TestClient, db_session_factory):
+    ids = _seed(db_session_factory, ["a", "b", "c"])
+
+    r = client.get("/notifications/export", params={"after_id": ids[0]})
+    assert [json.loads(line)["id"] for line in r.text.splitlines()] == ids[1:]
+
+
+def test_export_is_not_truncated_by_request_budget(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    ids = _seed(db_session_factory, ["a", "b", "c"])
+    monkeypatch.setenv("REQUEST_BUDGET_MS", "50")
+
+    def slow_rows(db, **kwargs):
+        for chunk in iter_notification_rows(db, chunk_size=1, **kwargs):
+            time.sleep(0.03)
+            yield chunk
+
+    monkeypatch.setattr(notifications_api, "iter_notification_rows", slow_rows)
+    r = client.get("/notifications/export")
+    assert r.status_code == 200
+    assert [json.loads(line)["id"] for line in r.text.splitlines()] == ids
+
+
+def test_export_rejects_unknown_format(client: TestClient, db_session_factory):
+    r = client.get("/notifications/export", params={"format": "xml"})
+    assert r.status_code == 422
+
+
+def test_iter_rows_chunks_and_filters(db_session_factory):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with db_session_factory() as db:
+        db.add_all(
+            [Notification(message=f"m{i}", created_at=now - timedelta(days=i)) for i in range(5)]
+        )
+        db.commit()
+
+        chunks = list(iter_notification_rows(db, chunk_size=2))
+        assert [len(c) for c in chunks] == [2, 2, 1]
+        assert not isinstance(chunks[0][0], Notification)
+
+        recent = [
+            r
+            for c in iter_notification_rows(db, created_after=now - timedelta(days=1.5))
+            for r in c
+        ]
+        assert [r.message for r in recent] == ["m0", "m1"]
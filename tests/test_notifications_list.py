@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.models import Notification
+from app.notification import (
+    NotificationRecord,
+    list_notification_records,
+    list_notifications,
+    list_notifications_page,
+)
+from app.schemas import NotificationOut, NotificationPage
+
+
+def _seed(factory, count: int) -> list[int]:
+    with factory() as db:
+        objs = [Notification(message=f"m{i}") for i in range(count)]
+        db.add_all(objs)
+        db.commit()
+        return [o.id for o in objs]
+
+
+def test_cursor_walks_all_pages_newest_first(client: TestClient, db_session_factory):
+    ids = _seed(db_session_factory, 7)
+
+    seen: list[int] = []
+    params: dict[str, object] = {"limit": 3}
+    pages = 0
+    while True:
+        r = client.get("/notifications", params=params)
+        assert r.status_code == 200
+        page = NotificationPage.model_validate(r.json())
+        seen.extend(item.id for item in page.items)
+        pages += 1
+        if page.next_cursor is None:
+            break
+        params["cursor"] = page.next_cursor
+
+    assert pages == 3
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_exact_page_boundary_has_no_next_cursor(db_session_factory):
+    _seed(db_session_factory, 3)
+    with db_session_factory() as db:
+        items, next_before_id = list_notifications_page(db, limit=3)
+    assert len(items) == 3
+    assert next_before_id is None
+
+
+def test_created_at_filters(db_session_factory):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with db_session_factory() as db:
+        db.add_all(
+            [
+                Notification(message="old", created_at=now - timedelta(days=2)),
+                Notification(message="new", created_at=now),
+            ]
+        )
+        db.commit()
+
+        items, _ = list_notifications_page(db, created_after=now - timedelta(days=1))
+        assert [n.message for n in items] == ["new"]
+
+        # Aware datetimes are normalized to UTC before comparing.
+        cutoff = (now - timedelta(days=1)).replace(tzinfo=timezone.utc)
+        items, _ = list_notifications_page(db, created_before=cutoff.astimezone())
+        assert [n.message for n in items] == ["old"]
+
+
+def test_invalid_cursor_is_400(client: TestClient, db_session_factory):
+    r = client.get("/notifications", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+    assert r.json() == {"detail": "Invalid cursor"}
+
+
+def test_records_serialize_like_the_response_model(client: TestClient, db_session_factory):
+    _seed(db_session_factory, 2)
+    with db_session_factory() as db:
+        orm_items = list_notifications(db, limit=2)
+        records = list_notification_records(db, limit=2)
+
+    assert [tuple(r) for r in records] == [(o.id, o.message, o.created_at) for o in orm_items]
+    assert all(isinstance(r, NotificationRecord) for r in records)
+
+    r = client.get("/notifications", params={"limit": 2})
+    expected = NotificationPage(
+        items=[NotificationOut.model_validate(o) for o in orm_items], next_cursor=None
+    )
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == expected.model_dump(mode="json")
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.notifications as notifications_api
+from app.notification import bulk_create_notifications, delete_notification, update_notification
+from app.search import SearchNotSupported, fts5_match, search_notifications
+
+
+def _seed(factory, messages: list[str]) -> list[int]:
+    with factory() as db:
+        return bulk_create_notifications(db, messages)
+
+
+def test_fts5_match_quotes_user_input():
+    assert fts5_match('deploy "failed" OR *') == '"deploy" """failed""" "OR" "*"'
+    assert fts5_match("   ") == ""
+
+
+def test_search_ranks_and_highlights(db_session_factory):
+    _seed(
+        db_session_factory,
+        [
+            "disk almost full on db-1",
+            "deploy finished",
+            "disk full, disk full, disk full",
+            "unrelated <b>disk</b> note",
+        ],
+    )
+    with db_session_factory() as db:
+        hits, after = search_notifications(db, "disk full")
+
+    assert after is None
+    assert [h.message for h in hits][:2] == [
+        "disk full, disk full, disk full",
+        "disk almost full on db-1",
+    ]
+    assert "<mark>disk</mark>" in hits[0].snippet
+    # Message text is escaped; only our markers are markup.
+    with db_session_factory() as db:
+        hits, _ = search_notifications(db, "note")
+    assert hits[0].snippet == "unrelated &lt;b&gt;disk&lt;/b&gt; <mark>note</mark>"
+
+
+def test_index_follows_updates_and_deletes(db_session_factory):
+    (nid,) = _seed(db_session_factory, ["alpha"])
+    with db_session_factory() as db:
+        update_notification(db, nid, message="beta")
+        assert search_notifications(db, "alpha")[0] == []
+        assert [h.id for h in search_notifications(db, "beta")[0]] == [nid]
+
+        delete_notification(db, nid)
+        assert search_notifications(db, "beta")[0] == []
+
+
+def test_search_endpoint_paginates(client: TestClient, db_session_factory):
+    ids = _seed(db_session_factory, [f"release {i} shipped" for i in range(7)] + ["other"])
+
+    seen: list[int] = []
+    params: dict[str, object] = {"q": "shipped", "limit": 3}
+    while True:
+        r = client.get("/notifications/search", params=params)
+        assert r.status_code == 200
+        body = r.json()
+        seen.extend(item["id"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    assert sorted(seen) == sorted(ids[:7])
+    assert len(seen) == len(set(seen))
+
+
+def test_search_endpoint_rejects_bad_cursor(client: TestClient, db_session_factory):
+    r = client.get("/notifications/search", params={"q": "x", "cursor": "nope"})
+    assert r.status_code == 400
+
+
+def test_unsupported_database_is_a_domain_error_mapped_to_501(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    mysql = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+    with pytest.raises(SearchNotSupported):
+        search_notifications(mysql, "x")  # type: ignore[arg-type]
+
+    def unsupported(*args, **kwargs):
+        raise SearchNotSupported("mysql")
+
+    monkeypatch.setattr(notifications_api, "search_notifications", unsupported)
+    r = client.get("/notifications/search", params={"q": "x"})
+    assert (r.status_code, r.json()) == (
+        501,
+        {"detail": "Search is not supported on this database"},
+    )
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+from starlette.websockets import WebSocketDisconnect
+
+import app.api.notifications as notifications_api
+import app.main as main_mod
+from app.broadcast import NotificationHub, Subscription, start_hub, stop_hub
+from app.notification import NotificationRecord, bulk_create_notifications, create_notification
+
+
+async def _sse(path: str, headers: list[tuple[bytes, bytes]], until):
+    """
+    Drive the SSE endpoint over raw ASGI (TestClient buffers whole bodies, and this
+    one never ends): run `until(body_so_far)` until it returns True, then disconnect.
+    """
+    body: list[str] = []
+    disconnect = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            body.append(f"status={message['status']}\n")
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b"").decode())
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    task = asyncio.create_task(main_mod.app(scope, receive, send))
+    for _ in range(200):
+        if await until("".join(body)):
+            break
+        await asyncio.sleep(0.01)
+    disconnect.set()
+    await asyncio.wait_for(task, 2)
+    return "".join(body)
+
+
+def _ids(body: str) -> list[int]:
+    return [int(line[4:]) for line in body.splitlines() if line.startswith("id: ")]
+
+
+def test_hub_cuts_off_slow_subscribers(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+
+    async def run():
+        hub = NotificationHub(buffer=2)
+        hub.start()
+        slow, fast = hub.subscribe(), hub.subscribe()
+        hub.publish([(1, "a", None), (2, "b", None)])
+        fast.queue.get_nowait(), fast.queue.get_nowait()
+        hub.publish([(3, "c", None)])
+
+        assert slow.queue.get_nowait() is None
+        assert fast.queue.get_nowait()[0] == 3
+        assert hub.subscriber_count() == 1
+
+        # From a worker thread: handed to the loop, not touched in place.
+        await asyncio.to_thread(hub.publish, [(4, "d", None)])
+        event = await asyncio.wait_for(fast.queue.get(), 1)
+        assert json.loads(event[1]) == {"id": 4, "message": "d", "created_at": None}
+
+    asyncio.run(run())
+
+
+def test_sse_backfills_from_last_event_id_then_goes_live(db_session_factory):
+    with db_session_factory() as db:
+        ids = bulk_create_notifications(db, ["one", "two", "three"])
+
+    async def run():
+        await start_hub()
+        try:
+
+            async def until(body: str) -> bool:
+                if len(_ids(body)) == 2 and not live:
+                    live.append(await asyncio.to_thread(_create, "four"))
+                return len(_ids(body)) == 3
+
+            live: list[int] = []
+            body = await _sse(
+                "/notifications/stream", [(b"last-event-id", str(ids[0]).encode())], until
+            )
+        finally:
+            await stop_hub()
+        return body, live
+
+    def _create(message: str) -> int:
+        with db_session_factory() as db:
+            return create_notification(db, message=message).id
+
+    body, live = asyncio.run(run())
+    assert body.startswith("status=200")
+    assert _ids(body) == [ids[1], ids[2], live[0]]
+    assert "event: notification" in body
+    assert '"message":"four"' in body
+
+
+def test_live_row_committed_behind_the_backfill_is_not_dropped(monkeypatch: pytest.MonkeyPatch):
+    # Ids 3 and 5 were committed before the backfill read; id 4 was allocated first but
+    # committed after it. All three reach the hub after the subscription was taken.
+    monkeypatch.setattr(
+        notifications_api,
+        "_backfill_page",
+        lambda after_id: [NotificationRecord(i, str(i), None) for i in (3, 5) if i > after_id],
+    )
+
+    async def run() -> list[int]:
+        sub = Subscription(buffer=10)
+        for i in (3, 5, 4, 6):
+            sub.queue.put_nowait((i, str(i)))
+        sub.queue.put_nowait(None)
+        return [e[0] async for e in notifications_api._stream_events(sub, 2) if e is not None]
+
+    assert asyncio.run(run()) == [3, 5, 4, 6]
+
+
+def test_sse_lagging_client_is_told_and_disconnected(
+    db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_STREAM_BUFFER", "1")
+
+    async def run():
+        hub = await start_hub()
+        try:
+
+            async def until(body: str) -> bool:
+                if hub.subscriber_count() and "lagged" not in body:
+                    hub.publish([(1, "a", None), (2, "b", None)])
+                return "event: lagged" in body
+
+            return await _sse("/notifications/stream", [], until)
+        finally:
+            await stop_hub()
+
+    assert "event: lagged" in asyncio.run(run())
+
+
+def test_sse_outlives_the_request_budget(db_session_factory, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("REQUEST_BUDGET_MS", "20")
+
+    async def run():
+        hub = await start_hub()
+        started = asyncio.get_running_loop().time()
+        try:
+
+            async def until(body: str) -> bool:
+                late = asyncio.get_running_loop().time() - started > 0.1
+                if late and hub.subscriber_count() and not _ids(body):
+                    hub.publish([(7, "late", None)])
+                return bool(_ids(body))
+
+            return await _sse("/notifications/stream", [], until)
+        finally:
+            await stop_hub()
+
+    body = asyncio.run(run())
+    assert body.startswith("status=200")
+    assert _ids(body) == [7]
+
+
+def test_sse_subscription_released_when_client_is_gone_before_the_body(db_session_factory):
+    async def gone(message):
+        raise OSError("client went away")
+
+    async def run() -> int:
+        hub = await start_hub()
+        try:
+            response = await notifications_api.stream(None, None, None)
+            assert hub.subscriber_count() == 1
+            scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}}
+            with pytest.raises(ClientDisconnect):
+                await response(scope, None, gone)
+            return hub.subscriber_count()
+        finally:
+            await stop_hub()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_sse_unavailable_without_hub(client: TestClient, db_session_factory):
+    assert client.get("/notifications/stream").status_code == 503
+    r = client.get("/notifications/stream", headers={"Last-Event-ID": "x"})
+    assert r.status_code == 400
+
+
+def test_websocket_backfill_and_live(db_session_factory):
+    with db_session_factory() as db:
+        (first,) = bulk_create_notifications(db, ["old"])
+
+    with TestClient(main_mod.app) as c:
+        with c.websocket_connect(f"/notifications/ws?last_event_id={first - 1}") as ws:
+            assert ws.receive_json()["message"] == "old"
+            created = c.post("/notifications", json={"message": "new"}).json()
+            event = ws.receive_json()
+    assert (event["id"], event["message"]) == (created["id"], "new")
+
+
+def test_websocket_requires_auth(db_session_factory, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("AUTH_MODE", "jwt")
+    monkeypatch.setenv("JWT_SECRET", "secret")
+    with TestClient(main_mod.app) as c:
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with c.websocket_connect("/notifications/ws"):
+                pass
+    assert exc.value.code == 1008
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import app.api.routes as routes_mod
+from app.models import OutboxMessage
+from app.notification import validate_messages
+
+
+def test_validate_messages_rejects_only_bad_items():
+    accepted, errors = validate_messages(["a", "", "b", 3, "x" * 201])
+    assert accepted == ["a", "b"]
+    assert sorted(errors) == [1, 3, 4]
+
+
+def test_mixed_batch_returns_validated_values_only():
+    too_long = "x" * 201
+    accepted, errors = validate_messages([b"raw bytes", too_long, "ok", {"nested": 1}])
+    assert accepted == ["raw bytes", "ok"]
+    assert all(type(m) is str for m in accepted)
+    assert sorted(errors) == [1, 3]
+    assert all(too_long not in e and "nested" not in e for e in errors.values())
+
+
+def test_notify_batch_schedules_one_job_with_request_id(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    calls: list[tuple[list[str], str | None]] = []
+    monkeypatch.setattr(
+        routes_mod,
+        "deliver_notification_batch",
+        lambda messages, request_id: calls.append((list(messages), request_id)),
+    )
+
+    r = client.post(
+        "/notify/batch",
+        json={"messages": ["a", "", "b"]},
+        headers={"x-request-id": "rid-batch"},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["accepted"] == 2
+    assert body["rejected"] == 1
+    assert [item["accepted"] for item in body["items"]] == [True, False, True]
+    assert body["items"][1]["error"]
+    assert calls == [(["a", "b"], "rid-batch")]
+
+
+def test_notify_batch_enforces_max_items(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("NOTIFY_BATCH_MAX_ITEMS", "2")
+    r = client.post("/notify/batch", json={"messages": ["a", "b", "c"]})
+    assert r.status_code == 413
+
+
+def test_notify_batch_requires_messages(client: TestClient):
+    r = client.post("/notify/batch", json={"messages": []})
+    assert r.status_code == 422
+
+
+def test_notify_batch_outbox_mode_enqueues_in_one_transaction(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "outbox")
+    r = client.post(
+        "/notify/batch",
+        json={"messages": ["a", "b", ""]},
+        headers={"x-request-id": "rid-outbox"},
+    )
+    assert r.status_code == 200
+
+    with db_session_factory() as db:
+        rows = db.execute(select(OutboxMessage.message, OutboxMessage.request_id)).all()
+    assert sorted(rows) == [("a", "rid-outbox"), ("b", "rid-outbox")]
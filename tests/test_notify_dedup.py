@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+import app.main as main_mod
+from app import rollups
+from app.core import db as db_mod
+from app.dedup import clear_dedup_cache, dedup_key, get_dedup_cache
+from app.models import Notification, OutboxMessage
+from app.notification import delete_notification, update_notification
+from app.outbox import enqueue_notification_once
+from app.retention import prune_notifications
+
+
+def _count(factory, model) -> int:
+    with factory() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.fixture()
+def dedup_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("NOTIFY_DELIVERY", "outbox")
+    monkeypatch.setenv("NOTIFY_DEDUP_WINDOW_S", "60")
+    monkeypatch.setenv("OBS_ENABLED", "1")
+
+
+def test_dedup_key_buckets_by_window():
+    assert dedup_key("hi", 60, now=120.0) == dedup_key("hi", 60, now=179.9)
+    assert dedup_key("hi", 60, now=120.0) != dedup_key("hi", 60, now=180.0)
+    assert dedup_key("hi", 60, now=120.0) != dedup_key("ho", 60, now=120.0)
+
+
+def test_repeats_return_original_id(client: TestClient, db_session_factory, dedup_env):
+    first = client.post("/notify", json={"message": "hello"}).json()
+    assert first["duplicate"] is False
+
+    for _ in range(3):
+        assert client.post("/notify", json={"message": "hello"}).json() == {
+            "ok": True,
+            "id": first["id"],
+            "duplicate": True,
+        }
+    other = client.post("/notify", json={"message": "other"}).json()
+    assert other["duplicate"] is False
+
+    assert _count(db_session_factory, Notification) == 2
+    assert _count(db_session_factory, OutboxMessage) == 2
+    body = client.get("/metrics").text
+    assert 'notify_duplicates_total{source="cache"} 3' in body
+
+
+def test_index_catches_repeats_the_cache_missed(db_session_factory):
+    key = dedup_key("hello", 60)
+    with db_session_factory() as db:
+        original, duplicate = enqueue_notification_once(
+            db, message="hello", request_id=None, key=key
+        )
+        assert not duplicate
+
+        # Another worker process: cold cache, same database.
+        clear_dedup_cache()
+        assert enqueue_notification_once(db, message="hello", request_id=None, key=key) == (
+            original,
+            True,
+        )
+        assert rollups.check(db) == []
+    assert _count(db_session_factory, Notification) == 1
+
+
+def test_deleted_original_frees_the_key(db_session_factory):
+    key = dedup_key("hello", 60)
+    with db_session_factory() as db:
+        original, _ = enqueue_notification_once(db, message="hello", request_id=None, key=key)
+        delete_notification(db, original)
+
+        _, duplicate = enqueue_notification_once(db, message="hello", request_id=None, key=key)
+    assert not duplicate
+    assert _count(db_session_factory, Notification) == 1
+
+
+def test_edited_original_frees_the_key(db_session_factory):
+    key = dedup_key("hello", 60)
+    with db_session_factory() as db:
+        original, _ = enqueue_notification_once(db, message="hello", request_id=None, key=key)
+        assert get_dedup_cache().get(key) == original
+        update_notification(db, original, message="goodbye")
+        assert get_dedup_cache().get(key) is None
+
+        repeat, duplicate = enqueue_notification_once(db, message="hello", request_id=None, key=key)
+    assert not duplicate and repeat != original
+    assert _count(db_session_factory, Notification) == 2
+
+
+def test_pruned_original_leaves_the_cache(db_session_factory, tmp_path: Path, dedup_env):
+    key = dedup_key("hello", 60)
+    with db_session_factory() as db:
+        enqueue_notification_once(db, message="hello", request_id=None, key=key)
+        db.execute(update(OutboxMessage).values(status="done"))
+        db.execute(update(Notification).values(created_at=datetime(2020, 1, 1)))
+        db.commit()
+    assert get_dedup_cache().get(key) is not None
+
+    prune_notifications(
+        db_session_factory,
+        older_than=datetime.now(timezone.utc) - timedelta(days=30),
+        archive_dir=tmp_path,
+    )
+    assert get_dedup_cache().get(key) is None
+
+
+def test_unsupported_dialect_fails_at_startup(monkeypatch: pytest.MonkeyPatch, dedup_env):
+    monkeypatch.setattr(db_mod, "engine", SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+    with pytest.raises(RuntimeError, match="NOTIFY_DEDUP_WINDOW_S"):
+        with TestClient(main_mod.app):
+            pass
+
+
+def test_dedup_off_keeps_plain_response(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "outbox")
+    for _ in range(2):
+        assert client.post("/notify", json={"message": "hello"}).json() == {"ok": True}
+    assert _count(db_session_factory, Notification) == 2
@@ -85,3 +85,28 @@ def test_request_id_and_metrics_on_unhandled_exception_when_enabled():
     metrics_response = client.get("/metrics")
     assert metrics_response.status_code == 200
     assert 'http_requests_total{method="GET",path="/boom",status="500"}' in metrics_response.text
+
+
+def test_generic_metrics_render(monkeypatch):
+    from app.observability import Metrics
+
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    m = Metrics()
+    m.describe("jobs_total", "counter", "Jobs processed.")
+    m.describe("queue_depth", "gauge", "Items waiting.")
+    m.describe("batch_size", "histogram", "Rows per batch.", buckets=(1, 10, 100))
+
+    m.inc("jobs_total", labels={"kind": "a"})
+    m.inc("jobs_total", 2, labels={"kind": "a"})
+    m.set_gauge("queue_depth", 7)
+    for size in (1, 5, 50, 500):
+        m.observe("batch_size", size)
+
+    body = m.render_prometheus()
+    assert 'jobs_total{kind="a"} 3.0' in body
+    assert "queue_depth 7" in body
+    assert 'batch_size_bucket{le="1"} 1.0' in body
+    assert 'batch_size_bucket{le="10"} 2.0' in body
+    assert 'batch_size_bucket{le="+Inf"} 4.0' in body
+    assert "batch_size_sum 556.0" in body
+    assert "batch_size_count 4.0" in body
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import select
+
+import app.main as main_mod
+from app.core import db as db_mod
+from app.core.settings import Settings
+from app.models import Notification, OutboxMessage
+from app.outbox import OutboxWorkerPool, claim_batch, enqueue_notification
+
+
+def _outbox(factory) -> list[OutboxMessage]:
+    with factory() as db:
+        return list(db.scalars(select(OutboxMessage).order_by(OutboxMessage.id)))
+
+
+def test_notify_outbox_mode_writes_row_and_job(
+    client: TestClient, db_session_factory, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "outbox")
+
+    import app.api.routes as routes_mod
+
+    monkeypatch.setattr(
+        routes_mod, "deliver_notification", lambda *_: pytest.fail("must not run in-process")
+    )
+
+    r = client.post("/notify", json={"message": "hello"}, headers={"x-request-id": "rid-1"})
+    assert r.status_code == 200
+    assert r.json() == {"ok": True}
+
+    [job] = _outbox(db_session_factory)
+    assert (job.message, job.request_id, job.status) == ("hello", "rid-1", "pending")
+    with db_session_factory() as db:
+        assert db.get(Notification, job.notification_id).message == "hello"
+
+
+@pytest.mark.parametrize("mode", ["background", "async"])
+def test_only_outbox_mode_opens_a_session(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, mode: str
+):
+    monkeypatch.setenv("NOTIFY_DELIVERY", mode)
+    monkeypatch.setattr(db_mod, "SessionLocal", lambda: pytest.fail("no DB in this mode"))
+
+    assert client.post("/notify", json={"message": "hi"}).status_code == 200
+    assert client.post("/notify/batch", json={"messages": ["a", "b"]}).status_code == 200
+
+
+def test_delivery_mode_is_validated_at_startup(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "carrier-pigeon")
+    with pytest.raises(ValidationError):
+        Settings()
+    monkeypatch.setenv("NOTIFY_DELIVERY", " Outbox ")
+    assert Settings().notify_delivery == "outbox"
+
+
+def test_worker_delivers_and_marks_done(db_session_factory):
+    with db_session_factory() as db:
+        enqueue_notification(db, message="a", request_id="r1")
+        enqueue_notification(db, message="b", request_id=None)
+
+    sent: list[tuple[str, str | None]] = []
+    pool = OutboxWorkerPool(db_session_factory, send=lambda m, rid: sent.append((m, rid)))
+
+    assert asyncio.run(pool.run_once()) == 2
+    assert sorted(sent, key=lambda x: x[0]) == [("a", "r1"), ("b", None)]
+    assert [job.status for job in _outbox(db_session_factory)] == ["done", "done"]
+    assert asyncio.run(pool.run_once()) == 0
+
+
+def test_failed_delivery_retries_with_backoff_then_dies(db_session_factory):
+    with db_session_factory() as db:
+        enqueue_notification(db, message="a", request_id=None)
+
+    def broken(message: str, request_id: str | None) -> None:
+        raise ConnectionError("upstream down")
+
+    pool = OutboxWorkerPool(
+        db_session_factory, send=broken, max_attempts=2, backoff_base_s=60, backoff_max_s=60
+    )
+    assert asyncio.run(pool.run_once()) == 1
+
+    [job] = _outbox(db_session_factory)
+    assert job.status == "pending"
+    assert job.attempts == 1
+    assert "upstream down" in job.last_error
+    assert job.available_at > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+        seconds=25
+    )
+    # Not due yet.
+    assert asyncio.run(pool.run_once()) == 0
+
+    with db_session_factory() as db:
+        db.get(OutboxMessage, job.id).available_at = datetime.now(timezone.utc)
+        db.commit()
+    assert asyncio.run(pool.run_once()) == 1
+    [job] = _outbox(db_session_factory)
+    assert (job.status, job.attempts) == ("dead", 2)
+
+
+def test_expired_lease_is_reclaimed(db_session_factory):
+    with db_session_factory() as db:
+        enqueue_notification(db, message="a", request_id=None)
+        assert len(claim_batch(db, limit=10, lease_s=30)) == 1
+        # Still leased by the first worker.
+        assert claim_batch(db, limit=10, lease_s=30) == []
+
+        db.get(OutboxMessage, 1).locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+        [again] = claim_batch(db, limit=10, lease_s=30)
+        assert again.attempts == 2
+
+
+def test_in_process_workers_started_by_lifespan(db_session_factory, monkeypatch):
+    monkeypatch.setenv("NOTIFY_DELIVERY", "OUTBOX")  # case-insensitive, like the routes
+    monkeypatch.setenv("OUTBOX_POLL_INTERVAL_S", "0.01")
+
+    with TestClient(main_mod.app) as client:
+        assert client.post("/notify", json={"message": "hi"}).status_code == 200
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if [j.status for j in _outbox(db_session_factory)] == ["done"]:
+                break
+            time.sleep(0.02)
+
+    assert [j.status for j in _outbox(db_session_factory)] == ["done"]
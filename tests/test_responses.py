@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+import app.core.responses as responses_mod
+from app.core.responses import FastJSONResponse, dumps, trusted
+from app.schemas import ResultResponse
+
+CONTENT = {"result": 5.0, "items": [1, None, True], "text": "héllo"}
+
+
+def test_stdlib_fallback_matches_starlette_output(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(responses_mod, "orjson", None)
+    assert dumps(CONTENT) == JSONResponse(CONTENT).body
+    with pytest.raises(ValueError):
+        dumps({"x": float("nan")})
+
+
+def test_orjson_branch_differences_are_pinned(monkeypatch: pytest.MonkeyPatch):
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr(responses_mod, "orjson", orjson)
+    assert dumps(CONTENT) == JSONResponse(CONTENT).body
+    # Non-finite floats become null instead of raising.
+    assert dumps({"x": float("nan"), "y": float("inf")}) == b'{"x":null,"y":null}'
+    assert dumps({"x": 1e-7}) == b'{"x":1e-7}'
+
+    monkeypatch.setattr(responses_mod, "orjson", None)
+    assert dumps({"x": 1e-7}) == b'{"x":1e-07}'
+
+
+def test_add_is_encoded_directly_and_still_documented(client: TestClient):
+    r = client.get("/add", params={"a": 2, "b": 3})
+    assert r.status_code == 200
+    assert r.content == b'{"result":5.0}'
+    assert r.headers["content-type"] == "application/json"
+
+    schema = client.get("/openapi.json").json()["paths"]["/add"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["$ref"].endswith("/ResultResponse")
+
+
+def test_errors_keep_detail_shape_and_headers(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    r = client.get("/div", params={"a": 1, "b": 0})
+    assert (r.status_code, r.json()) == (400, {"detail": "Division by zero"})
+
+    monkeypatch.setenv("BASIC_USER", "demo")
+    monkeypatch.setenv("BASIC_PASS", "secret")
+    r = client.post("/token")
+    assert (r.status_code, r.json()) == (401, {"detail": "Not authenticated"})
+    assert r.headers["www-authenticate"] == "Basic"
+
+
+def test_trusted_output_is_not_revalidated():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/sync", response_model=ResultResponse)
+    @trusted
+    def sync_route():
+        return {"result": 1.0, "extra": "kept"}
+
+    @app.get("/async", response_model=ResultResponse)
+    @trusted
+    async def async_route():
+        return {"result": 2.0}
+
+    with TestClient(app) as c:
+        # The handler is trusted: response_model would have dropped "extra".
+        assert c.get("/sync").json() == {"result": 1.0, "extra": "kept"}
+        assert c.get("/async").json() == {"result": 2.0}
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+import app.main as main_mod
+from app.models import Notification, OutboxMessage
+from app.notification import bulk_create_notifications
+from app.outbox import enqueue_notification
+from app.retention import main, prune_notifications
+
+
+def _seed(factory, *, old: int, new: int) -> None:
+    with factory() as db:
+        ids = bulk_create_notifications(db, [f"m{i}" for i in range(old + new)])
+        db.execute(
+            update(Notification)
+            .where(Notification.id.in_(ids[:old]))
+            .values(created_at=datetime(2020, 1, 1))
+        )
+        db.commit()
+
+
+def _remaining(factory) -> int:
+    with factory() as db:
+        return db.scalar(select(func.count()).select_from(Notification))
+
+
+def _archived(path: Path) -> list[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_prune_archives_then_deletes_in_batches(db_session_factory, tmp_path: Path):
+    _seed(db_session_factory, old=25, new=5)
+
+    result = prune_notifications(
+        db_session_factory,
+        older_than=datetime.now(timezone.utc) - timedelta(days=30),
+        archive_dir=tmp_path / "archive",
+        batch_size=10,
+    )
+
+    assert result.rows == 25
+    assert _remaining(db_session_factory) == 5
+    assert result.segment is not None
+    archived = _archived(result.segment)
+    assert [row["message"] for row in archived] == [f"m{i}" for i in range(25)]
+
+
+def test_prune_keeps_notifications_still_owed_a_delivery(db_session_factory, tmp_path: Path):
+    with db_session_factory() as db:
+        pending = enqueue_notification(db, message="pending", request_id=None).id
+        done = enqueue_notification(db, message="done", request_id=None).id
+        db.execute(
+            update(OutboxMessage).where(OutboxMessage.notification_id == done).values(status="done")
+        )
+        db.execute(update(Notification).values(created_at=datetime(2020, 1, 1)))
+        db.commit()
+
+    result = prune_notifications(
+        db_session_factory,
+        older_than=datetime.now(timezone.utc) - timedelta(days=30),
+        archive_dir=tmp_path / "archive",
+    )
+
+    assert result.rows == 1
+    with db_session_factory() as db:
+        assert db.scalars(select(Notification.message)).all() == ["pending"]
+        assert db.scalars(select(OutboxMessage.notification_id)).all() == [pending]
+
+
+def test_prune_nothing_old_writes_no_segment(db_session_factory, tmp_path: Path):
+    _seed(db_session_factory, old=0, new=3)
+    result = prune_notifications(
+        db_session_factory,
+        older_than=datetime.now(timezone.utc) - timedelta(days=30),
+        archive_dir=tmp_path / "archive",
+    )
+    assert result.rows == 0
+    assert result.segment is None
+    assert not (tmp_path / "archive").exists()
+
+
+def test_prune_respects_throttle(db_session_factory, tmp_path: Path):
+    _seed(db_session_factory, old=20, new=0)
+    result = prune_notifications(
+        db_session_factory,
+        older_than=datetime.now(timezone.utc),
+        archive_dir=tmp_path,
+        batch_size=5,
+        max_rows_per_s=200,
+    )
+    assert result.rows == 20
+    assert result.seconds >= 0.1 - 0.01
+    assert result.rows_per_s <= 200 * 1.1
+
+
+def test_cli_runs_once(db_session_factory, tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    _seed(db_session_factory, old=3, new=1)
+    main(["--days", "30", "--archive-dir", str(tmp_path)])
+
+    assert _remaining(db_session_factory) == 1
+    assert "archived=3" in capsys.readouterr().out
+    assert len(list(tmp_path.glob("notifications-*.ndjson.gz"))) == 1
+
+
+def test_cli_requires_days(db_session_factory):
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_lifespan_job_prunes_and_stops(
+    db_session_factory, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("RETENTION_DAYS", "30")
+    monkeypatch.setenv("RETENTION_ARCHIVE_DIR", str(tmp_path))
+    _seed(db_session_factory, old=4, new=1)
+
+    with TestClient(main_mod.app):
+        for _ in range(100):
+            if _remaining(db_session_factory) == 1:
+                break
+            time.sleep(0.01)
+    assert _remaining(db_session_factory) == 1
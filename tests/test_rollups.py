@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+
+import app.main as main_mod
+from app import rollups
+from app.core import db as db_mod
+from app.models import Notification, NotificationRollup
+from app.notification import (
+    bulk_create_notifications,
+    create_notification,
+    delete_notification,
+)
+from app.outbox import enqueue_notifications
+
+
+def test_write_paths_keep_rollups_consistent(db_session_factory):
+    with db_session_factory() as db:
+        one = create_notification(db, message="single")
+        bulk_create_notifications(db, [f"bulk {i}" for i in range(25)], batch_size=10)
+        enqueue_notifications(db, messages=["a", "b"], request_id="r1")
+        db.commit()
+        delete_notification(db, one.id)
+
+        assert rollups.check(db) == []
+        now = datetime.now(timezone.utc)
+        stats = rollups.read_stats(db, start=now - timedelta(hours=1), end=now + timedelta(hours=1))
+        assert sum(n for _, n in stats) == 27
+
+
+def test_read_stats_rolls_minutes_up(db_session_factory):
+    with db_session_factory() as db:
+        rollups.record(
+            db,
+            [
+                datetime(2026, 1, 1, 10, 5, 30),
+                datetime(2026, 1, 1, 10, 59, 59),
+                datetime(2026, 1, 1, 11, 0, 0),
+                datetime(2026, 1, 2, 0, 1, 0),
+            ],
+        )
+        db.commit()
+
+        start, end = datetime(2026, 1, 1), datetime(2026, 1, 3)
+        assert rollups.read_stats(db, start=start, end=end, granularity="hour") == [
+            (datetime(2026, 1, 1, 10), 2),
+            (datetime(2026, 1, 1, 11), 1),
+            (datetime(2026, 1, 2, 0), 1),
+        ]
+        assert rollups.read_stats(db, start=start, end=end, granularity="day") == [
+            (datetime(2026, 1, 1), 3),
+            (datetime(2026, 1, 2), 1),
+        ]
+        # end is exclusive
+        assert rollups.read_stats(db, start=start, end=datetime(2026, 1, 1, 11)) == [
+            (datetime(2026, 1, 1, 10), 2),
+        ]
+
+
+def test_rebuild_repairs_drift(db_session_factory):
+    with db_session_factory() as db:
+        ids = bulk_create_notifications(db, ["x", "y", "z"])
+        # Writes that bypass the app leave the rollups stale.
+        db.execute(
+            update(Notification)
+            .where(Notification.id == ids[0])
+            .values(created_at=datetime(2020, 1, 1, 12, 0))
+        )
+        db.execute(update(NotificationRollup).values(count=NotificationRollup.count + 5))
+        db.commit()
+        assert rollups.check(db) != []
+
+        rollups.rebuild(db)
+        assert rollups.check(db) == []
+
+
+def test_cli_check_and_rebuild(db_session_factory, capsys: pytest.CaptureFixture[str]):
+    with db_session_factory() as db:
+        bulk_create_notifications(db, ["x", "y"])
+        db.execute(update(NotificationRollup).values(count=0))
+        db.commit()
+
+    assert rollups.main(["check"]) == 1
+    assert "mismatches=1" in capsys.readouterr().out
+    assert rollups.main(["rebuild"]) == 0
+    assert "mismatches=0" in capsys.readouterr().out
+
+
+def test_stats_endpoint(client: TestClient, db_session_factory):
+    with db_session_factory() as db:
+        bulk_create_notifications(db, ["a", "b", "c"])
+
+    r = client.get("/notifications/stats", params={"granularity": "day"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["granularity"] == "day"
+    assert body["total"] == 3
+    assert sum(b["count"] for b in body["buckets"]) == 3
+
+
+def test_stats_endpoint_validates_range(client: TestClient, db_session_factory):
+    r = client.get(
+        "/notifications/stats",
+        params={"start": "2026-01-02T00:00:00Z", "end": "2026-01-01T00:00:00Z"},
+    )
+    assert r.status_code == 400
+    assert client.get("/notifications/stats", params={"granularity": "week"}).status_code == 422
+
+
+def test_unsupported_dialect_fails_at_startup(monkeypatch: pytest.MonkeyPatch):
+    rollups.check_rollup_dialect("sqlite")
+    monkeypatch.setattr(db_mod, "engine", SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+    with pytest.raises(RuntimeError, match="rollups are not supported on 'mysql'"):
+        with TestClient(main_mod.app):
+            pass
+
+
+def test_postgres_buckets_are_bound_as_utc():
+    bucket = datetime(2026, 1, 1, 12, 30)
+    params = rollups._upsert("postgresql", {bucket: 1}).compile(dialect=postgresql.dialect()).params
+    [bound] = [v for v in params.values() if isinstance(v, datetime)]
+    assert bound == bucket.replace(tzinfo=timezone.utc)
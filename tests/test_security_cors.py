@@ -35,3 +35,28 @@ def test_cors_enabled_allows_origin(monkeypatch):
 
     r = client.get("/health", headers={"Origin": "https://example.com"})
     assert r.headers.get("access-control-allow-origin") == "https://example.com"
+
+
+def test_cors_preflight_answered_outside_request_middleware(monkeypatch):
+    monkeypatch.setenv("CORS_ALLOW_ORIGINS", "https://example.com")
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    _reset_settings_cache()
+
+    import importlib
+
+    import app.main as reloaded
+
+    importlib.reload(reloaded)
+
+    client = TestClient(reloaded.app)
+    r = client.options(
+        "/notify",
+        headers={"Origin": "https://example.com", "Access-Control-Request-Method": "POST"},
+    )
+    assert r.status_code == 200
+    assert r.headers["access-control-allow-origin"] == "https://example.com"
+    # Answered before request_id_and_timing: no request id, no route latency sample.
+    assert "x-request-id" not in r.headers
+    body = reloaded.metrics.render_prometheus()
+    assert 'method="OPTIONS"' not in body
+    assert 'cors_preflight_total{outcome="allowed"}' in body
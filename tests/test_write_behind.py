@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy import select
+
+import app.main as main_mod
+from app.core.db import get_db
+from app.models import Notification
+from app.observability import metrics
+from app.write_behind import NotificationWriteBehind, get_write_behind
+
+
+def test_concurrent_submits_are_group_committed(db_session_factory, monkeypatch):
+    monkeypatch.setenv("OBS_ENABLED", "1")
+    flushes: list[int] = []
+
+    async def run() -> list[int]:
+        writer = NotificationWriteBehind(db_session_factory, max_batch=100, max_delay_s=0.05)
+        real_write = writer._write
+
+        def counting_write(messages: list[str]) -> list[int]:
+            flushes.append(len(messages))
+            return real_write(messages)
+
+        writer._write = counting_write  # type: ignore[method-assign]
+        writer.start()
+        try:
+            return await asyncio.gather(*(writer.submit(f"m{i}") for i in range(50)))
+        finally:
+            await writer.stop()
+
+    ids = asyncio.run(run())
+
+    assert len(set(ids)) == 50
+    assert sum(flushes) == 50
+    assert len(flushes) < 50
+    with db_session_factory() as db:
+        by_id = dict(db.execute(select(Notification.id, Notification.message)).all())
+    assert [by_id[i] for i in ids] == [f"m{i}" for i in range(50)]
+    assert "notify_write_behind_batch_size_count" in metrics.render_prometheus()
+
+
+def test_bounded_queue_applies_backpressure(db_session_factory):
+    async def run() -> None:
+        writer = NotificationWriteBehind(db_session_factory, max_queue=1)
+        # Writer not started: first row fills the queue, second must wait for room.
+        first = asyncio.create_task(writer.submit("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(writer.submit("b"), timeout=0.05)
+
+        writer.start()
+        assert isinstance(await first, int)
+        await writer.stop()
+
+    asyncio.run(run())
+
+
+def test_invalid_message_rejected_before_enqueue(db_session_factory):
+    async def run() -> None:
+        writer = NotificationWriteBehind(db_session_factory)
+        with pytest.raises(ValidationError):
+            await writer.submit("")
+        assert writer.queue_depth() == 0
+
+    asyncio.run(run())
+
+
+def test_flush_failure_propagates_to_callers(db_session_factory):
+    async def run() -> None:
+        writer = NotificationWriteBehind(db_session_factory)
+
+        def broken_write(messages: list[str]) -> list[int]:
+            raise RuntimeError("disk full")
+
+        writer._write = broken_write  # type: ignore[method-assign]
+        writer.start()
+        with pytest.raises(RuntimeError, match="disk full"):
+            await writer.submit("a")
+        await writer.stop()
+
+    asyncio.run(run())
+
+
+def test_create_endpoint_direct_mode(client: TestClient, db_session_factory):
+    r = client.post("/notifications", json={"message": "hello"})
+    assert r.status_code == 201
+    with db_session_factory() as db:
+        assert db.get(Notification, r.json()["id"]).message == "hello"
+
+
+def test_create_endpoint_write_behind_mode(db_session_factory, monkeypatch):
+    monkeypatch.setenv("NOTIFY_WRITE_BEHIND", "1")
+
+    with TestClient(main_mod.app) as client:
+        assert get_write_behind() is not None
+        r = client.post("/notifications", json={"message": "buffered"})
+        assert r.status_code == 201
+
+    assert get_write_behind() is None
+    with db_session_factory() as db:
+        assert db.get(Notification, r.json()["id"]).message == "buffered"
+
+
+def test_create_endpoint_opens_no_request_session():
+    # Write-behind and sharded creates never touch it; the direct path opens its own.
+    [route] = [
+        r
+        for r in main_mod.app.routes
+        if getattr(r, "path", None) == "/notifications" and "POST" in r.methods
+    ]
+    assert get_db not in [dep.call for dep in route.dependant.dependencies]